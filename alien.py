@@ -4,7 +4,6 @@ Manages an alien in the game.
 :class: Alien(Sprite)
 """
 
-import pygame
 from pygame.sprite import Sprite
 
 
@@ -13,8 +12,9 @@ class Alien(Sprite):
     Manage an alien.
 
     :method: __init__(self, game)
-    :mehtod: update(self)
+    :mehtod: update(self, dt)
     :method: check_edges(self)
+    :method: interpolated_rect(self, alpha)
     """
 
     def __init__(self, game):
@@ -22,9 +22,11 @@ class Alien(Sprite):
         Initialize the alien and set its starting position.
 
         :var screen Surface: The screen object.
-        :var image Surface: The image of the alien.
+        :var image Surface: The image of the alien, shared by the whole fleet.
+        :var mask Mask: The pixels of the alien that collide, shared by the whole fleet.
         :var rect Rect: The rectangular position of the alien.
         :var x float: The horizontal position of the alien on the screen.
+        :var prev_x float: The horizontal position of the alien before the last update.
         :var settings Settings: The settings of the game.
         :retuns Alien: Instance of an alien object.
         """
@@ -34,8 +36,11 @@ class Alien(Sprite):
         # Load settings of the game.
         self.settings = game.settings
 
-        # load the alien image and set its rect attribute.
-        self.image = pygame.image.load('images/alien.bmp')
+        # Get the shared alien image and set its rect attribute.
+        self.image = game.assets.image('images/alien.bmp',
+                                       scale=game.settings.alien_scale)
+        self.mask = game.assets.mask('images/alien.bmp',
+                                     scale=game.settings.alien_scale)
         self.rect = self.image.get_rect()
 
         # Start each new alien near the top left of the screen
@@ -44,14 +49,18 @@ class Alien(Sprite):
 
         # Store the alien's exact horizontal position.
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
-    def update(self):
+    def update(self, dt):
         """
         Move the alien to the right.
 
+        :param dt float: The duration of the simulation tick in seconds.
         :returns: None.
         """
-        self.x += (self.settings.alien_speed * self.settings.fleet_direction)
+        self.prev_x = self.x
+        self.x += (self.settings.alien_speed *
+                   self.settings.fleet_direction * dt)
         self.rect.x = self.x
 
     def check_edges(self):
@@ -62,3 +71,15 @@ class Alien(Sprite):
         """
         screen_rect = self.screen.get_rect()
         return (self.rect.right >= screen_rect.right or self.rect.left <= 0)
+
+    def interpolated_rect(self, alpha):
+        """
+        Give the position of the alien between its previous and its current location.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :var rect Rect: The interpolated position of the alien.
+        :returns Rect: The position where the alien has to be drawn.
+        """
+        rect = self.rect.copy()
+        rect.x = self.prev_x + (self.x - self.prev_x) * alpha
+        return rect
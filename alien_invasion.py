@@ -1,74 +1,196 @@
 """
 Manages the entire Alien Invasion game.
 
+Run ``python alien_invasion.py --help`` for the options of the command line, such as
+the size of a swarm of aliens to stress the game with.
+
 :class: AlienInvasion
+:function: main(argv=None)
 """
 
+import argparse
 import sys
+import queue
+import threading
+from math import ceil
+from time import perf_counter, perf_counter_ns
 import pygame
-from time import sleep
 from settings import Settings
+from assets import AssetManager
 from ship import Ship
-from bullet import Bullet
-from alien import Alien
+from bullet import BulletPool
+from fleet import Fleet, ArrayFleet, formation
 from game_stats import GameStats
+from game_state import GameState
 from button import Button
 from scoreboard import Scoreboard
+from renderer import DirtyRenderer, ScaledPresenter, blit_all
+from profiler import Profiler, ProfilerOverlay
+import replay
+from snapshot import SnapshotBuffer
+from controls import ALLOWED_EVENTS, LatencyTracker
+from records import RecordStore
+from spectate import SpectatorServer
 
 
 class AlienInvasion:
     """
     Manages the game assets and its behavior.
 
-    :method: __init__(self)
+    :method: __init__(self, headless=False, settings=None)
     :method: run_game(self)
+    :method: _run_threaded(self)
+    :method: _simulate(self)
+    :method: reset(self)
+    :method: step(self, actions=())
+    :method: render(self, alpha=1.0)
+    :method: apply_command(self, command, x=0, y=0)
+    :method: _update_game(self, dt)
+    :method: _record_keyframe(self)
+    :method: _leave_state(self, state)
+    :method: _prep_banner(self)
     :method: _check_keydown_events(self, event)
     :method: _check_keyup_events(self, event)
     :method: _check_events(self)
+    :method: _command(self, command, x=0, y=0)
+    :method: _poll_keys(self)
     :method: _fire_bullet(self)
     :method: _update_bullets(self)
-    :method: _screen(self)
+    :method: _set_display_mode(self)
+    :method: _update_screen(self, alpha=1.0)
+    :method: _draw(self, sequence, tick)
+    :method: _present(self, rects=None)
+    :method: _blit_sequence(self, alpha=1.0)
     :method: _create_fleet(self)
     :method: _update_aliens(self)
     :method: _ship_hit(self)
+    :method: _end_session(self)
     :method: _check_aliens_bottom(self)
     :method: _check_bullet_alien_collisions(self)
+    :method: _save_high_score(self)
     :method: _check_fleet_edges(self)
     :method: _check_play_button(self, mouse_pos)
-    :method: _ship_hit(self)
+    :method: _start_game(self)
+    :method: _set_mouse_visible(self, visible)
+    :method: _end_profile_frame(self)
+    :method: _quit(self)
     """
 
-    def __init__(self):
+    def __init__(self, headless=False, settings=None):
         """
         Initialize the game and create game resources.
 
+        In headless mode no window is opened: the game is drawn, if ever, on an
+        offscreen surface and is driven through reset() and step() instead of run_game().
+
+        The game is always simulated and drawn at the size of its screen in the settings;
+        a window of another size or a fullscreen display only shows it scaled.
+
+        :param headless bool: True to run the game without a display, false if not.
+        :param settings Settings: The settings of the game, default settings if None.
+        :var headless bool: True if the game runs without a display, false if not.
         :var settings Settings: The settings of the game.
-        :var screen Surface: The screen of the game.
+        :var screen Surface: The screen of the game, at the size of the settings.
+        :var presenter ScaledPresenter: The scaling of the screen to the window, if the
+        screen is an offscreen canvas, else None.
+        :var assets AssetManager: The cache of the images shared by the sprites.
         :var ship Ship: The ship of the player.
-        :var bullets Group: The bullets of the ship of the player.
+        :var bullets BulletPool: The bullets of the ship of the player.
         :var bg_color (int, int, int): The background of the game.
         :var stats GameStats: The stats of the current game.
         :var play_button Button: The play button to trigger the beginning of the game.
         :var sb Scoreboard: The scoreboard of the current game.
-        :var aliens Group: The aliens in the game.
+        :var aliens Fleet: The aliens in the game, an ArrayFleet with the 'numpy' backend.
+        :var renderer DirtyRenderer: The renderer with the 'dirty' render mode, else None.
+        :var profiler Profiler: The time spent in each phase of the frames.
+        :var tick_profiler Profiler: The profiler of the phases of the ticks, the
+        profiler itself unless the simulation runs on its own thread.
+        :var tick_phases SimpleQueue: The phases of each tick of the simulation thread,
+        waiting to be merged in the frame, None if the simulation runs on the main thread.
+        :var overlay ProfilerOverlay: The averages of the profiler, shown with F3.
+        :var text_renders int: The number of texts rendered by the scoreboard so far.
+        :var tick int: The number of simulation ticks played.
+        :var replay Replay: The commands of the player, tagged with their tick.
+        :var commands SimpleQueue: The commands waiting for the simulation thread, None
+        if the simulation runs on the main thread.
+        :var snapshots SnapshotBuffer: The last states published by the simulation thread.
+        :var stopping Event: Set to stop the simulation thread.
+        :var simulation Thread: The simulation thread, None if it is not started.
+        :var mouse_visible bool: The visibility of the cursor asked by the simulation
+        thread, None if the main thread already applied it.
+        :var latency LatencyTracker: The delays between the inputs and their frames.
+        :var held (bool, bool): The left and right arrows last polled as held.
+        :var records RecordStore: The high score and the stats of the last games kept on
+        disk, None in headless mode or without records_path.
+        :var spectators SpectatorServer: The stream of the game to spectators, None
+        without spectate_address.
         :returns AlienInvasion: Generates an instance of AlienInvasion.
         """
-        pygame.init()
-        self.settings = Settings()
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
-        pygame.display.set_caption("Alien Invasion")
+        self.headless = headless
+        self.settings = settings or Settings()
+        self.presenter = None
+
+        # The simulation only depends on the ticks, the settings and the commands.
+        self.tick = 0
+        # Keyframes are a snapshot of the whole state, only taken for a replay file.
+        self.replay = replay.Replay(
+            self.settings.seed, self.settings.tick_rate,
+            keyframe_interval=(self.settings.replay_keyframe_interval
+                               if self.settings.replay_path else 0),
+            settings=replay.simulation_settings(self.settings))
+
+        # The simulation can run on its own thread, see _run_threaded().
+        self.commands = None
+        self.snapshots = SnapshotBuffer(self.settings.snapshot_buffers)
+        self.stopping = threading.Event()
+        self.simulation = None
+        self.mouse_visible = None
+
+        # Inputs are timestamped to measure how long they take to reach the screen.
+        self.latency = LatencyTracker()
+        self.held = (False, False)
+
+        # The state of every tick can be streamed to spectators.
+        self.spectators = None
+        if self.settings.spectate_address:
+            self.spectators = SpectatorServer(
+                self.settings.spectate_address,
+                self.settings.spectate_keyframe_interval)
+
+        if headless:
+            # Only the fonts are needed to build the scoreboard and the button.
+            pygame.font.init()
+            self.screen = pygame.Surface(
+                (self.settings.screen_width, self.settings.screen_height))
+        else:
+            pygame.init()
+            self._set_display_mode()
+            pygame.display.set_caption("Alien Invasion")
+
+            # Leave the events the game does not handle out of the queue.
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(ALLOWED_EVENTS)
 
-        # Create stats of the game.
+        # Images are loaded once and shared by every sprite.
+        self.assets = AssetManager()
+
+        # Create stats of the game, the high score is read once from the records.
         self.stats = GameStats(self)
+        self.records = None
+        if not headless and self.settings.records_path:
+            self.records = RecordStore(self.settings.records_path)
+            self.stats.high_score = self.records.high_score
 
         # Create a scoreboard.
         self.sb = Scoreboard(self)
 
         # Ship, bullets and aliens initialized.
         self.ship = Ship(self)
-        self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
+        self.bullets = BulletPool(self)
+        if self.settings.fleet_backend == 'numpy':
+            self.aliens = ArrayFleet(self)
+        else:
+            self.aliens = Fleet(self)
         self._create_fleet()
 
         # Set background color.
@@ -77,21 +199,278 @@ class AlienInvasion:
         # Make the play button.
         self.play_button = Button(self, "Play")
 
+        # Redraw only the regions that change if asked to.
+        self.renderer = None
+        if self.settings.render_mode == 'dirty':
+            self.renderer = DirtyRenderer(
+                self.screen, self.settings.bg_color,
+                self.settings.dirty_full_threshold)
+
+        # Measure the phases of the frames, and trace them if asked to.
+        self.profiler = Profiler(self.settings.profile_window,
+                                 self.settings.profile_trace_path is not None)
+        self.tick_profiler = self.profiler
+        self.tick_phases = None
+        self.overlay = ProfilerOverlay(self)
+        self.text_renders = 0
+
+        # The replay starts from the initial state.
+        self._record_keyframe()
+
     def run_game(self):
         """
         Start the main loop for the game and displays the game.
 
+        The simulation advances by fixed ticks of 1 / tick_rate seconds, as many as the
+        elapsed time allows, and the screen is drawn between the last two ticks.
+        With the threaded setting, the simulation runs on its own thread instead.
+
+        :var clock Clock: The clock capping the number of frames drawn per second.
+        :var tick float: The duration of a simulation tick in seconds.
+        :var lag float: The time elapsed and not simulated yet, in seconds.
+        :var elapsed float: The duration of the last frame in seconds.
         :returns: None.
         """
+        if self.settings.threaded:
+            self._run_threaded()
+        clock = pygame.time.Clock()
+        tick = 1 / self.settings.tick_rate
+        lag = 0.0
         while True:
+            # Waiting for the frame cap also leaves the CPU idle between frames.
+            elapsed = clock.tick(self.settings.max_fps) / 1000
+            lag += min(elapsed, self.settings.max_frame_time)
+
+            start = perf_counter_ns()
             self._check_events()
+            self.profiler.record('events', start)
 
-            if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
+            while lag >= tick:
+                if self.settings.low_latency:
+                    self._poll_keys()
+                self._update_game(tick)
+                lag -= tick
+
+            self._update_screen(lag / tick)
+            self._end_profile_frame()
+
+    def _run_threaded(self):
+        """
+        Run the simulation on its own thread and draw its latest snapshot on this one.
+
+        The main thread only handles the events and the display, so a slow flip delays
+        neither the simulation nor the commands, which are handed over in a queue.
+
+        :var clock Clock: The clock capping the number of frames drawn per second.
+        :var snapshot Snapshot: The latest state published by the simulation.
+        :returns: None.
+        """
+        self.commands = queue.SimpleQueue()
+        # The simulation times its phases apart, they are merged at the end of a frame.
+        self.tick_profiler = Profiler(1)
+        self.tick_phases = queue.SimpleQueue()
+        self.simulation = threading.Thread(target=self._simulate,
+                                           name='simulation', daemon=True)
+        self.simulation.start()
+
+        clock = pygame.time.Clock()
+        while True:
+            clock.tick(self.settings.max_fps)
+
+            start = perf_counter_ns()
+            self._check_events()
+            if self.settings.low_latency:
+                self._poll_keys()
+            if self.mouse_visible is not None:
+                pygame.mouse.set_visible(self.mouse_visible)
+                self.mouse_visible = None
+            self.profiler.record('events', start)
+
+            snapshot = self.snapshots.latest()
+            if snapshot:
+                self._draw(snapshot.sequence, snapshot.tick)
+            self._end_profile_frame()
+
+    def _simulate(self):
+        """
+        Play the ticks of the simulation on time and publish a snapshot after each one.
+
+        :var tick float: The duration of a simulation tick in seconds.
+        :var deadline float: The time the next tick is due, from perf_counter().
+        :var timed TimedInput: The timestamp of a command, or None.
+        :var delay float: The time left before the next tick.
+        :returns: None.
+        """
+        tick = 1 / self.settings.tick_rate
+        deadline = perf_counter()
+        while not self.stopping.is_set():
+            while not self.commands.empty():
+                command, x, y, timed = self.commands.get()
+                self.apply_command(command, x, y)
+                if timed:
+                    # The first snapshot showing the command follows the next tick.
+                    timed.shown_from = self.tick + 1
+            self._update_game(tick)
+            self.tick_phases.put(self.tick_profiler.take())
+            self.snapshots.publish(self.tick, self._blit_sequence())
+
+            deadline += tick
+            delay = deadline - perf_counter()
+            if delay > 0:
+                self.stopping.wait(delay)
+            elif delay < -self.settings.max_frame_time:
+                # Give up on the ticks too late to catch up with.
+                deadline = perf_counter()
+
+    def reset(self):
+        """
+        Start a new game without going through the play button.
+
+        :returns: None.
+        """
+        self.apply_command(replay.START)
+
+    def step(self, actions=()):
+        """
+        Advance the game by one simulation tick without drawing anything.
+
+        The actions are the keys held during the frame: 'left' and 'right' move the ship
+        and 'fire' shoots a bullet if one is allowed. They are turned into the commands a
+        player would give with the keyboard, so they are recorded in the replay.
+
+        :param actions iterable: The names of the actions of the player for this tick,
+        None to keep the keys held as they are.
+        :var actions set: The actions of the player as a set.
+        :returns bool: True if the game is still active, false if it is over.
+        """
+        if actions is not None:
+            actions = set(actions)
+            if ('left' in actions) != self.ship.moving_left:
+                self.apply_command(
+                    replay.LEFT_DOWN if 'left' in actions else replay.LEFT_UP)
+            if ('right' in actions) != self.ship.moving_right:
+                self.apply_command(
+                    replay.RIGHT_DOWN if 'right' in actions else replay.RIGHT_UP)
+            if 'fire' in actions:
+                self.apply_command(replay.FIRE)
+
+        self._update_game(1 / self.settings.tick_rate)
+        return self.stats.game_active
+
+    def render(self, alpha=1.0):
+        """
+        Draw the current frame, on the offscreen surface for a headless game.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :returns: None.
+        """
+        self._update_screen(alpha)
+
+    def apply_command(self, command, x=0, y=0):
+        """
+        Apply a command of the player and record it with the current tick.
+
+        Every input changing the simulation goes through this method, so that replaying
+        the recorded commands reproduces the game.
 
-            self._update_screen()
+        :param command int: The command, one of the commands of the replay module.
+        :param x int: The horizontal position of a click.
+        :param y int: The vertical position of a click.
+        :returns: None.
+        """
+        self.replay.record(self.tick, command, x, y)
+        if command == replay.LEFT_DOWN:
+            self.ship.moving_left = True
+        elif command == replay.LEFT_UP:
+            self.ship.moving_left = False
+        elif command == replay.RIGHT_DOWN:
+            self.ship.moving_right = True
+        elif command == replay.RIGHT_UP:
+            self.ship.moving_right = False
+        elif command == replay.FIRE:
+            self._fire_bullet()
+        elif command == replay.CLICK:
+            self._check_play_button((x, y))
+        elif command == replay.START:
+            self._start_game()
+
+    def _update_game(self, dt):
+        """
+        Advance the state of the game, then update the ship, the bullets and the aliens
+        for one simulation tick if the game is being played, and stream the tick to the
+        spectators.
+
+        :param dt float: The duration of the tick in seconds.
+        :var left str: The state the game left during the tick, or None.
+        :returns: None.
+        """
+        self.tick += 1
+        if self.stats.game_active:
+            self.stats.ticks += 1
+        left = self.stats.state.update(dt)
+        if left:
+            self._leave_state(left)
+        if self.stats.state.current == GameState.PLAYING:
+            start = perf_counter_ns()
+            self.ship.update(dt)
+            self.tick_profiler.record('ship', start)
+            self._update_bullets(dt)
+            if self.stats.state.current == GameState.PLAYING:
+                self._update_aliens(dt)
+        self._prep_banner()
+        if self.spectators:
+            self.spectators.publish(self)
+        self._record_keyframe()
+
+    def _record_keyframe(self):
+        """
+        Keep the whole state of the simulation in the replay every keyframe_interval ticks,
+        when the replay is written to a file.
+
+        :var interval int: The number of ticks between two keyframes, 0 for none.
+        :returns: None.
+        """
+        interval = self.replay.keyframe_interval
+        if interval and self.tick % interval == 0:
+            self.replay.record_keyframe(self.tick, replay.snapshot_state(self))
+
+    def _leave_state(self, state):
+        """
+        Finish a timed state whose time is up.
+
+        After a ship hit, the fleet and the ship are only reset at the end of the pause,
+        so the player sees what hit the ship.
+
+        :param state str: The state left.
+        :returns: None.
+        """
+        if state == GameState.RESPAWNING:
+            # Get rid of any remaining aliens and bullets.
+            self.aliens.empty()
+            self.bullets.empty()
+
+            # Create new fleet and center the ship.
+            self._create_fleet()
+            self.ship.center_ship()
+        elif state == GameState.GAME_OVER:
+            self._set_mouse_visible(True)
+
+    def _prep_banner(self):
+        """
+        Show the message of the current state in the middle of the screen.
+
+        :var state GameState: The state of the game.
+        :returns: None.
+        """
+        state = self.stats.state
+        if state.current == GameState.RESPAWNING:
+            self.sb.prep_banner(f"Ready in {ceil(state.remaining)}")
+        elif state.current == GameState.LEVEL_TRANSITION:
+            self.sb.prep_banner(f"Level {self.stats.level}")
+        elif state.current == GameState.GAME_OVER:
+            self.sb.prep_banner("Game Over")
+        else:
+            self.sb.prep_banner(None)
 
     def _check_events(self):
         """
@@ -103,67 +482,120 @@ class AlienInvasion:
         """
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                sys.exit()
+                self._quit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.VIDEORESIZE):
+                if self.presenter:
+                    self.presenter.resize(pygame.display.get_surface())
+                if self.renderer:
+                    self.renderer.invalidate()
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
+                mouse_pos = event.pos
+                if self.presenter:
+                    mouse_pos = self.presenter.to_canvas(mouse_pos)
+                self._command(replay.CLICK, *mouse_pos)
+
+    def _command(self, command, x=0, y=0):
+        """
+        Apply a command of the player, or hand it to the simulation thread if it runs.
+
+        :param command int: The command, one of the commands of the replay module.
+        :param x int: The horizontal position of a click.
+        :param y int: The vertical position of a click.
+        :var timed TimedInput: The timestamp of a key or button press, None for a release.
+        :returns: None.
+        """
+        timed = None
+        if command in replay.PRESSES:
+            timed = self.latency.received(perf_counter())
+        if self.commands is not None:
+            self.commands.put((command, x, y, timed))
+        else:
+            self.apply_command(command, x, y)
+            if timed:
+                # The first frame showing the command follows the next tick, as when
+                # the simulation runs on its own thread.
+                timed.shown_from = self.tick + 1
+
+    def _poll_keys(self):
+        """
+        Read the arrow keys held right now and give the commands of those that changed.
+
+        :var keys ScancodeWrapper: The keys held.
+        :var held (bool, bool): The left and right arrows held.
+        :returns: None.
+        """
+        pygame.event.pump()
+        keys = pygame.key.get_pressed()
+        held = (keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+        if held[0] != self.held[0]:
+            self._command(replay.LEFT_DOWN if held[0] else replay.LEFT_UP)
+        if held[1] != self.held[1]:
+            self._command(replay.RIGHT_DOWN if held[1] else replay.RIGHT_UP)
+        self.held = held
 
     def _check_keydown_events(self, event):
         """
         Respond to key presses. And if q is pressed then the game exits.
+        F3 shows or hides the performance overlay. The arrows are polled instead in
+        low latency mode.
 
         :param event Event: An event in the game.     
         :returns: None.
         """
+        if self.settings.low_latency and event.key in (pygame.K_LEFT,
+                                                       pygame.K_RIGHT):
+            return
         if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = True
+            self._command(replay.RIGHT_DOWN)
         elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = True
+            self._command(replay.LEFT_DOWN)
         elif event.key == pygame.K_q:
-            sys.exit()
+            self._quit()
         elif event.key == pygame.K_SPACE:
-            self._fire_bullet()
+            self._command(replay.FIRE)
+        elif event.key == pygame.K_F3:
+            self.overlay.toggle()
 
     def _fire_bullet(self):
         """
-        Create a new bullet and add it to the bullets group.
+        Fire a new bullet from the pool of bullets.
 
-        :var new_bullet Bullet: A new bullet shoot from the ship.
         :returns: None.
         """
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)
+        if (self.stats.state.current == GameState.PLAYING and
+                len(self.bullets) < self.settings.bullets_allowed):
+            self.bullets.fire(self.ship.rect.midtop)
+            self.stats.shots += 1
 
     def _check_keyup_events(self, event):
         """
-        Respond to key releases.
+        Respond to key releases, unless the arrows are polled.
 
         :param event Event: An event in the game.
         :returns: None.
         """
+        if self.settings.low_latency:
+            return
         if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
+            self._command(replay.RIGHT_UP)
         elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
+            self._command(replay.LEFT_UP)
 
-    def _update_bullets(self):
+    def _update_bullets(self, dt):
         """
         Update the position of the bullets and get rid of old bullets.
 
+        :param dt float: The duration of the simulation tick in seconds.
         :returns: None.
         """
-        # Udate bullet positions.
-        self.bullets.update()
-
-        # Get rid of bullets that have disappeared.
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        # Udate bullet positions and get rid of bullets that have disappeared.
+        start = perf_counter_ns()
+        self.bullets.update(dt)
+        self.tick_profiler.record('bullets', start)
 
         self._check_bullet_alien_collisions()
 
@@ -177,15 +609,18 @@ class AlienInvasion:
         :var collisions Sprite_dict: Dictionnary of the collisions between an alien and bullets.
         :returns: None.
         """
-        collisions = pygame.sprite.groupcollide(
-            self.bullets, self.aliens, True, True)
+        start = perf_counter_ns()
+        collisions = self.aliens.collide_bullets(self.bullets)
+        self.tick_profiler.record('collisions', start)
 
         # If a collision is detected then update score.
         if collisions:
+            self.stats.hits += len(collisions)
             for aliens in collisions.values():
                 self.stats.score += self.settings.alien_points * len(aliens)
             self.sb.prep_score()
             self.sb.check_high_score()
+            self._save_high_score()
 
         if not self.aliens:
             # Destroy existing bullets and create new fleet.
@@ -197,155 +632,233 @@ class AlienInvasion:
             self.stats.level += 1
             self.sb.prep_level()
 
-    def _update_screen(self):
+            # Pause before the new level starts.
+            self.stats.state.set(GameState.LEVEL_TRANSITION,
+                                 self.settings.level_transition_time,
+                                 GameState.PLAYING)
+
+    def _save_high_score(self):
+        """
+        Save the high score once the current game beats the one of the records.
+
+        :returns: None.
+        """
+        if self.records and self.stats.high_score > self.records.high_score:
+            self.records.high_score = self.stats.high_score
+            self.records.save()
+
+    def _set_display_mode(self):
+        """
+        Open the window, and an offscreen canvas if the window is scaled.
+
+        :var size (int, int): The size of the screen of the game.
+        :var flags int: The flags of the display mode.
+        :var window Surface: The surface of the window.
+        :raises ValueError: If a display size is asked to SDL, which sizes the window
+        itself.
+        :returns: None.
+        """
+        size = (self.settings.screen_width, self.settings.screen_height)
+        fullscreen = pygame.FULLSCREEN if self.settings.fullscreen else 0
+        if self.settings.scale_mode == 'sdl':
+            if self.settings.display_size:
+                raise ValueError("display_size needs scale_mode 'transform': with "
+                                 "'sdl' the window is sized by SDL")
+            # SDL scales the window and the positions of the mouse itself.
+            self.screen = pygame.display.set_mode(size, pygame.SCALED | fullscreen)
+        elif self.settings.display_size or self.settings.fullscreen:
+            flags = fullscreen or pygame.RESIZABLE
+            window = pygame.display.set_mode(self.settings.display_size or (0, 0),
+                                             flags)
+            self.screen = pygame.Surface(size).convert()
+            self.presenter = ScaledPresenter(window, self.screen)
+        else:
+            self.screen = pygame.display.set_mode(size)
+
+    def _update_screen(self, alpha=1.0):
         """
         Update images on the screen and flip to the new screen.
 
+        The ship, the bullets, the aliens, the scoreboard, the overlay and the play
+        button are gathered in one sequence, drawn at once or by the dirty renderer.
+
+        :param alpha float: The fraction of the tick elapsed since the last update,
+        used to draw the moving sprites between their last two positions.
         :returns: None.
         """
-        self.screen.fill(self.settings.bg_color)
-        self.ship.blitme()
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-        self.aliens.draw(self.screen)
+        self._draw(self._blit_sequence(alpha), self.tick)
 
-        # Draw the score information.
-        self.sb.show_score()
+    def _draw(self, sequence, tick):
+        """
+        Draw the images of a frame and show them on the display.
 
-        # Draw the play button if the game is inactive.
-        if not self.stats.game_active:
-            self.play_button.draw_button()
+        The overlay of the profiler is added here, on the main thread, as it reads the
+        profiler while the frames are measured.
+
+        :param sequence list: The (image, rect or (x, y)) of the frame, in drawing order.
+        :param tick int: The simulation tick of the state drawn.
+        :var overlay list: The (image, rect) of the lines of the overlay.
+        :var rects list: The regions of the screen redrawn by the dirty renderer.
+        :returns: None.
+        """
+        start = perf_counter_ns()
+        overlay = self.overlay.blit_sequence()
+        if overlay:
+            # A snapshot may be drawn again: add to a copy of its sequence.
+            sequence = list(sequence) + overlay
+        rects = None
+        if self.renderer:
+            rects = self.renderer.render(sequence)
+        else:
+            # Every image of the frame is drawn in one call.
+            self.screen.fill(self.settings.bg_color)
+            blit_all(self.screen, sequence)
+        self.profiler.record('draw', start)
 
-        pygame.display.flip()
+        # A headless game only draws on its offscreen surface.
+        if not self.headless:
+            start = perf_counter_ns()
+            self._present(rects)
+            self.profiler.record('flip', start)
+            self.latency.presented(tick, perf_counter())
 
-    def _create_fleet(self):
+    def _present(self, rects=None):
         """
-        Create a fleet of aliens.
+        Show the screen of the game on the display.
 
-        :var alien Alien: An alien of the fleet.
-        :var alien_width int: The width of an alien.
-        :var available_space_x int: The available horizontal space on the screen for the fleet.
-        :var number_aliens_x int: The number of aliens in a row.
-        :var alien_number int: The number of the alien in the fleet.
-        :var ship_height int: The height of an alien.
-        :var available_space_y int: Vertical available space between aliens.
-        :var available_space_x int: Horizontal available space between aliens.
-        :var number_rows int: Number of rows of aliens.
+        A scaled canvas is scaled entirely, so the regions redrawn only matter when the
+        screen is the display itself.
+
+        :param rects list: The regions redrawn, None if the whole screen was redrawn.
         :returns: None.
         """
-        # Making an alien and finding the number of aliens in a row.
-        # Spacing between each alien is equal to one alien width.
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        available_space_x = self.settings.screen_width - (2 * alien_width)
-        number_aliens_x = available_space_x // (2 * alien_width)
+        if self.presenter:
+            self.presenter.present()
+            pygame.display.flip()
+        elif rects is not None:
+            pygame.display.update(rects)
+        else:
+            pygame.display.flip()
 
-        # Determine the number of rows of aliens that fit on the screen.
-        ship_height = self.ship.rect.height
-        available_space_y = (self.settings.screen_height -
-                             (3 * alien_height) - ship_height)
-        number_rows = available_space_y // (2 * alien_height)
+    def _blit_sequence(self, alpha=1.0):
+        """
+        Give every image of the state of the game and where to draw it, in drawing order.
 
-        # Create the full fleet of aliens.
-        for row_number in range(number_rows):
-            for alien_number in range(number_aliens_x):
-                self._create_alien(alien_number, row_number)
+        The overlay of the profiler is left out, _draw() adds it.
 
-    def _create_alien(self, alien_number, row_number):
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :var sequence list: The (image, rect or (x, y)) of the frame.
+        :returns list: The (image, rect or (x, y)) of the frame.
         """
-        Create an alien and place it on the row.
+        sequence = [(self.ship.image, self.ship.interpolated_rect(alpha))]
+        sequence += self.bullets.blit_sequence(alpha)
+        sequence += self.aliens.blit_sequence(alpha)
+        sequence += self.sb.blit_sequence()
+        if self.stats.state.current == GameState.MENU:
+            sequence.append((self.play_button.image, self.play_button.rect))
+        return sequence
+
+    def _create_fleet(self):
+        """
+        Create a fleet of aliens from the formation of the screen, or of the rows and
+        columns of the settings.
+
+        The formation is only computed for the first fleet, and the fleet reuses the
+        aliens of the previous fleets.
 
-        :parma alien_number int: The number of the alien in the fleet.    
-        :param row_number int: The row number of the alien fleet.
-        :var alien Alien: The alien to be created.
-        :var alien_width int: The width of an alien.
-        :var alien_height int: The height of an alien.      
         :returns: None.
         """
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.rect.x = alien.x
-        alien.rect.y = alien.rect.height + 2 * alien.rect.height * row_number
-        self.aliens.add(alien)
+        self.aliens.fill(formation(
+            (self.settings.screen_width, self.settings.screen_height),
+            self.aliens.alien_size, self.ship.rect.height,
+            self.settings.fleet_rows, self.settings.fleet_columns))
 
-    def _update_aliens(self):
+    def _update_aliens(self, dt):
         """
         Check if the fleet is at an edge and updates the positions of all aliens in the fleet.
 
+        :param dt float: The duration of the simulation tick in seconds.
         :returns: None.
         """
+        start = perf_counter_ns()
         self._check_fleet_edges()
-        self.aliens.update()
+        self.aliens.update(dt)
 
         # Look for alien-ship collision
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.aliens.collide_ship(self.ship):
             self._ship_hit()
 
         # Look for aliens hitting the bottom of the screen.
         self._check_aliens_bottom()
+        self.tick_profiler.record('aliens', start)
 
     def _check_fleet_edges(self):
         """
         Manage the appropriate respond if any aliens have reached an edge.
 
-        :var alien Alien: An alien in the sprite of the fleet.
         :returns: None.
         """
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.check_edges():
+            self._change_fleet_direction()
 
     def _change_fleet_direction(self):
         """
         Change the entire fleet's direction.
 
-        :var alien Alien: An alien in the sprite.
         :returns: None.
         """
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        self.aliens.drop(self.settings.fleet_drop_speed)
         self.settings.fleet_direction *= -1
 
     def _ship_hit(self):
         """
         Manage the response of the ship to an alien ship.
 
+        The game keeps running during the pause that follows: the fleet is reset when
+        the pause is over.
+
         :returns: None.
         """
+        if self.stats.state.current != GameState.PLAYING:
+            # The ship was already hit during this tick.
+            return
+
         if self.stats.ships_left > 0:
             # Decrement the number of ships left and update scoreboard.
             self.stats.ships_left -= 1
             self.sb.prep_ships()
 
-            # Get rid of any remaining aliens and bullets.
-            self.aliens.empty()
-            self.bullets.empty()
-
-            # Create new fleet and center the ship.
-            self._create_fleet()
-            self.ship.center_ship()
-
             # Pause the game for the player to recover.
-            sleep(1)
+            self.stats.state.set(GameState.RESPAWNING,
+                                 self.settings.respawn_time,
+                                 GameState.PLAYING)
         else:
-            self.stats.game_active = False
-            pygame.mouse.set_visible(True)
+            self.stats.state.set(GameState.GAME_OVER,
+                                 self.settings.game_over_time,
+                                 GameState.MENU)
+            self._end_session()
+
+    def _end_session(self):
+        """
+        Keep the stats of the game that just ended in the records.
+
+        The records are only handed to their writer thread, the disk is never touched
+        during a frame.
+
+        :returns: None.
+        """
+        if self.records:
+            self.records.add_session(self.stats.session())
 
     def _check_aliens_bottom(self):
         """
         Check if an alien hits the bottom of the screen.
 
-        :var screen_rect Rect: Rectangular dimensions of the screen.
         :returns: None.
         """
-        screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= screen_rect.bottom:
-                # Treat this action the same as if the ship got hit.
-                self._ship_hit()
-                break
+        if self.aliens.reached_bottom():
+            # Treat this action the same as if the ship got hit.
+            self._ship_hit()
 
     def _check_play_button(self, mouse_pos):
         """
@@ -356,28 +869,142 @@ class AlienInvasion:
         :returns: None.
         """
         button_clicked = self.play_button.rect.collidepoint(mouse_pos)
-        if button_clicked and not self.stats.game_active:
-            # Reset the game statistics.
-            self.settings.initialize_dynamic_settings()
-            self.stats.reset_stats()
-            self.stats.game_active = True
-            self.sb.prep_score()
-            self.sb.prep_level()
-            self.sb.prep_ships()
+        if button_clicked and self.stats.state.current == GameState.MENU:
+            self._start_game()
 
-            # Get rid of any remaining aliens and bullets.
-            self.aliens.empty()
-            self.bullets.empty()
+    def _start_game(self):
+        """
+        Reset the statistics, the fleet and the ship and make the game active.
 
-            # Create a new fleet and center the ship.
-            self._create_fleet()
-            self.ship.center_ship()
+        :returns: None.
+        """
+        # Reset the game statistics.
+        self.settings.initialize_dynamic_settings()
+        self.stats.reset_stats()
+        self.stats.state.set(GameState.PLAYING)
+        self.sb.prep_score()
+        self.sb.prep_level()
+        self.sb.prep_ships()
 
-            # Hide the mouse cursor.
-            pygame.mouse.set_visible(False)
+        # Get rid of any remaining aliens and bullets.
+        self.aliens.empty()
+        self.bullets.empty()
 
+        # Create a new fleet and center the ship.
+        self._create_fleet()
+        self.ship.center_ship()
+
+        # Hide the mouse cursor.
+        self._set_mouse_visible(False)
+
+    def _set_mouse_visible(self, visible):
+        """
+        Show or hide the mouse cursor when the game has a display.
+
+        The simulation thread leaves the cursor to the main thread, which owns the display.
+
+        :param visible bool: True to show the cursor, false to hide it.
+        :returns: None.
+        """
+        if self.headless:
+            return
+        if threading.current_thread() is self.simulation:
+            self.mouse_visible = visible
+        else:
+            pygame.mouse.set_visible(visible)
+
+    def _end_profile_frame(self):
+        """
+        Close the frame of the profiler with the entity and text render counters.
+
+        :var text_renders int: The number of texts rendered by the scoreboard so far.
+        :returns: None.
+        """
+        if self.tick_phases is not None:
+            while not self.tick_phases.empty():
+                self.profiler.merge(self.tick_phases.get())
+        text_renders = self.sb.atlas.renders + self.sb.atlas.compositions
+        self.profiler.end_frame(bullet_count=len(self.bullets),
+                                alien_count=len(self.aliens),
+                                text_renders=text_renders - self.text_renders)
+        self.text_renders = text_renders
+
+    def _quit(self):
+        """
+        Stop the simulation thread and the stream, write the records, the trace of the
+        profiler, the latency report and the replay if asked to and exit the game.
+
+        :returns: None.
+        """
+        if self.simulation:
+            self.stopping.set()
+            self.simulation.join()
+        if self.spectators:
+            self.spectators.close()
+        if self.records:
+            if self.stats.game_active:
+                # Keep the game left in progress too.
+                self._end_session()
+            self.records.close()
+        if self.settings.profile_trace_path:
+            self.profiler.export(self.settings.profile_trace_path)
+        if self.settings.latency_report_path:
+            self.latency.export(self.settings.latency_report_path)
+        if self.settings.replay_path:
+            self.replay.save(self.settings.replay_path, self.tick,
+                             replay.state_digest(self))
+        sys.exit()
+
+
+def main(argv=None):
+    """
+    Play the game, or stress a headless game, with the settings of the command line.
+
+    :param argv list: The command line arguments, sys.argv if None.
+    :var settings Settings: The settings of the game.
+    :var game AlienInvasion: The game played.
+    :returns int: The exit status.
+    """
+    parser = argparse.ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument('--rows', type=int, help="rows of aliens of the fleet")
+    parser.add_argument('--columns', type=int, help="aliens in a row of the fleet")
+    parser.add_argument('--alien-scale', type=float, help="scale of the aliens")
+    parser.add_argument('--bullets', type=int, help="bullets allowed at once")
+    parser.add_argument('--drop-speed', type=int,
+                        help="pixels the fleet drops at each edge")
+    parser.add_argument('--fleet-backend', choices=('sprite', 'numpy'),
+                        help="backend of the fleet, numpy by default with --stress")
+    parser.add_argument('--collisions', choices=('rect', 'mask'),
+                        help="collide the rectangles or the pixels of the sprites")
+    parser.add_argument('--stress', type=float, metavar='SECONDS',
+                        help="play headless for this time and report the throughput")
+    args = parser.parse_args(argv)
+
+    settings = Settings()
+    for name, value in (('fleet_rows', args.rows),
+                        ('fleet_columns', args.columns),
+                        ('alien_scale', args.alien_scale),
+                        ('bullets_allowed', args.bullets),
+                        ('fleet_drop_speed', args.drop_speed),
+                        ('fleet_backend', args.fleet_backend),
+                        ('collision_mode', args.collisions)):
+        if value is not None:
+            setattr(settings, name, value)
+
+    if args.stress:
+        # Imported here as the benchmarks import this module.
+        from benchmarks.swarm import run_swarm, print_report
+
+        if args.fleet_backend is None:
+            settings.fleet_backend = 'numpy'
+        print_report(run_swarm(settings, args.stress))
+        return 0
 
-if __name__ == '__main__':
     # Create a game instance and run it.
-    game = AlienInvasion()
+    game = AlienInvasion(settings=settings)
     game.run_game()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
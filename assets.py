@@ -0,0 +1,173 @@
+"""
+Manage the images shared by the sprites of the Alien Invasion game.
+
+:class: AssetManager()
+"""
+
+import pygame
+
+
+class AssetManager:
+    """
+    Load each image of the game once and hand out the shared surface.
+
+    The collision masks are computed once per image as well, and shared by every sprite
+    using the image.
+
+    :method: __init__(self)
+    :method: image(self, path, alpha=False, scale=1.0)
+    :method: solid(self, size, color)
+    :method: mask(self, path, scale=1.0)
+    :method: solid_mask(self, size)
+    :method: stats(self)
+    :method: clear(self)
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty cache of images.
+
+        :var images dict: The loaded surfaces indexed by (path, alpha), the scaled ones by
+        (path, alpha, scale), and the solid surfaces indexed by ('solid', size, color).
+        :var masks dict: The collision masks indexed by (path, scale), and the masks of
+        the solid surfaces indexed by ('solid', size).
+        :var hits int: The number of requests served from the cache.
+        :var misses int: The number of requests that had to create their surface or mask.
+        A scaled image or a mask missing also requests the image it is made from.
+        :returns AssetManager: Generates an instance of AssetManager class.
+        """
+        self.images = {}
+        self.masks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def image(self, path, alpha=False, scale=1.0):
+        """
+        Return the surface of an image, loading it from the disk only the first time.
+
+        The surface is converted to the pixel format of the display when a display
+        exists, so blitting it does not need a conversion on every frame.
+        The surface returned is shared: callers must not draw on it.
+
+        :param path str: The path of the image file.
+        :param alpha bool: True to keep the per-pixel alpha of the image, false if not.
+        :param scale float: The scale of the image, scaled once from the image loaded.
+        :var key tuple: The key of the image in the cache.
+        :var surface Surface: The image loaded from the disk.
+        :var size (int, int): The size of the scaled image, at least one pixel.
+        :returns Surface: The shared surface of the image.
+        """
+        key = (path, alpha) if scale == 1.0 else (path, alpha, scale)
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if scale != 1.0:
+            surface = self.image(path, alpha)
+            size = (max(1, round(surface.get_width() * scale)),
+                    max(1, round(surface.get_height() * scale)))
+            surface = pygame.transform.scale(surface, size)
+            self.images[key] = surface
+            return surface
+
+        surface = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        self.images[key] = surface
+        return surface
+
+    def solid(self, size, color):
+        """
+        Return a surface filled with a color, creating it only the first time.
+
+        :param size (int, int): The width and the height of the surface.
+        :param color (int, int, int): The color of the surface in RGB.
+        :var key (str, (int, int), (int, int, int)): The key of the surface in the cache.
+        :var surface Surface: The surface filled with the color.
+        :returns Surface: The shared surface.
+        """
+        key = ('solid', tuple(size), tuple(color))
+        surface = self.images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(color)
+        self.images[key] = surface
+        return surface
+
+    def mask(self, path, scale=1.0):
+        """
+        Return the collision mask of an image, computing it only the first time.
+
+        The images of the game have no transparency: the pixels of the color of their
+        top left corner, or of their colorkey if they have one, are left out of the mask.
+
+        :param path str: The path of the image file.
+        :param scale float: The scale of the image, as given to image().
+        :var key (str, float): The key of the mask in the cache.
+        :var surface Surface: The shared surface of the image.
+        :var mask Mask: The pixels of the image that can collide.
+        :returns Mask: The shared mask of the image.
+        """
+        key = (path, scale)
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            return mask
+
+        self.misses += 1
+        surface = self.image(path, scale=scale)
+        if surface.get_colorkey() is not None or surface.get_flags() & pygame.SRCALPHA:
+            mask = pygame.mask.from_surface(surface)
+        else:
+            # Select the pixels of the background exactly, then keep the others.
+            mask = pygame.mask.from_threshold(surface, surface.get_at((0, 0)),
+                                              (1, 1, 1, 255))
+            mask.invert()
+        self.masks[key] = mask
+        return mask
+
+    def solid_mask(self, size):
+        """
+        Return a full mask of a size, for the sprites drawn as solid rectangles.
+
+        :param size (int, int): The width and the height of the mask.
+        :var key (str, (int, int)): The key of the mask in the cache.
+        :var mask Mask: The mask with every bit set.
+        :returns Mask: The shared mask.
+        """
+        key = ('solid', tuple(size))
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            return mask
+
+        self.misses += 1
+        mask = pygame.mask.Mask(size, fill=True)
+        self.masks[key] = mask
+        return mask
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        :returns dict: The number of hits, misses, cached images and cached masks.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'cached': len(self.images), 'masks': len(self.masks)}
+
+    def clear(self):
+        """
+        Forget every cached image and mask, for instance after the display format changed.
+
+        :returns: None.
+        """
+        self.images.clear()
+        self.masks.clear()
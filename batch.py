@@ -0,0 +1,361 @@
+"""
+Play many headless games in parallel to tune the balance of the settings.
+
+Each game is a job: settings to change, a policy playing the game and a seed. The jobs
+are spread across a pool of processes and their stats are gathered into one report,
+grouped by settings and policy.
+
+Run ``python batch.py --help`` for the options, for instance:
+``python batch.py --set speedup_scale=1.1,1.3 --set bullets_allowed=3,5 --seeds 8``
+
+:class: IdlePolicy()
+:class: RandomPolicy(IdlePolicy)
+:class: TrackingPolicy(IdlePolicy)
+:function: make_jobs(overrides, policies, seeds, max_ticks, fleet_backend='sprite')
+:function: play_game(job)
+:function: aggregate(results)
+:function: run_batch(jobs, workers=None)
+:function: parse_override(text)
+:function: main(argv=None)
+"""
+
+import argparse
+import ast
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from settings import Settings
+
+
+class IdlePolicy:
+    """
+    Play a game without doing anything.
+
+    The base of the policies of the batch and of the players of the benchmarks.
+
+    :method: __init__(self, rng)
+    :method: __call__(self, game, tick)
+    """
+
+    def __init__(self, rng):
+        """
+        Initialize the policy.
+
+        :param rng Random: The seeded random generator of the policy.
+        :returns IdlePolicy: Generates an instance of IdlePolicy class.
+        """
+        self.rng = rng
+
+    def __call__(self, game, tick):
+        """
+        Give the actions of a tick.
+
+        :param game AlienInvasion: The headless game.
+        :param tick int: The number of the tick.
+        :returns tuple: No action.
+        """
+        return ()
+
+
+class RandomPolicy(IdlePolicy):
+    """
+    Move in a random direction for a random time and fire at random.
+
+    :method: __init__(self, rng)
+    :method: __call__(self, game, tick)
+    """
+
+    def __init__(self, rng):
+        """
+        Initialize the policy standing still.
+
+        :param rng Random: The seeded random generator of the policy.
+        :var direction str: The direction the ship is moving to, None to stand still.
+        :returns RandomPolicy: Generates an instance of RandomPolicy class.
+        """
+        super().__init__(rng)
+        self.direction = None
+
+    def __call__(self, game, tick):
+        """
+        Give the actions of a tick.
+
+        :param game AlienInvasion: The headless game.
+        :param tick int: The number of the tick.
+        :var actions list: The actions of the tick.
+        :returns list: The actions of the tick.
+        """
+        if self.rng.random() < 0.02:
+            self.direction = self.rng.choice(('left', 'right', None))
+        actions = [self.direction] if self.direction else []
+        if self.rng.random() < 0.2:
+            actions.append('fire')
+        return actions
+
+
+class TrackingPolicy(IdlePolicy):
+    """
+    Move under the nearest alien of the lowest row and fire when under it.
+
+    Like a player, the policy reacts after a random delay and aims a little off the
+    middle of the alien, so games of different seeds differ.
+
+    :method: __init__(self, rng, reaction=(6, 18), spread=0.25)
+    :method: __call__(self, game, tick)
+    """
+
+    def __init__(self, rng, reaction=(6, 18), spread=0.25):
+        """
+        Initialize the policy without any target.
+
+        :param rng Random: The seeded random generator of the policy.
+        :param reaction (int, int): The least and the most ticks between two choices of
+        a target.
+        :param spread float: The largest aiming error, as a fraction of the width of an
+        alien.
+        :var target float: The horizontal position the ship is moving to, or None.
+        :var next_choice int: The tick when the next target is chosen.
+        :returns TrackingPolicy: Generates an instance of TrackingPolicy class.
+        """
+        super().__init__(rng)
+        self.reaction = reaction
+        self.spread = spread
+        self.target = None
+        self.next_choice = 0
+
+    def __call__(self, game, tick):
+        """
+        Give the actions of a tick, choosing a new target after each reaction delay.
+
+        :param game AlienInvasion: The headless game.
+        :param tick int: The number of the tick.
+        :var positions list: The positions of the aliens.
+        :var offset float: The distance between the ship and the target.
+        :var actions list: The actions of the tick.
+        :returns list: The actions of the tick.
+        """
+        if tick >= self.next_choice:
+            self.next_choice = tick + self.rng.randint(*self.reaction)
+            positions = [position for _, position in game.aliens.blit_sequence()]
+            self.target = None
+            if positions:
+                # Aim near the middle of the nearest alien of the lowest row.
+                lowest = max(position[1] for position in positions)
+                width = game.aliens.alien_size[0]
+                self.target = min(
+                    (position[0] + width / 2 for position in positions
+                     if position[1] == lowest),
+                    key=lambda x: abs(x - game.ship.rect.centerx))
+                self.target += self.rng.uniform(-self.spread, self.spread) * width
+        if self.target is None:
+            return ()
+
+        offset = self.target - game.ship.rect.centerx
+        actions = []
+        if offset > 4:
+            actions.append('right')
+        elif offset < -4:
+            actions.append('left')
+        if abs(offset) < game.aliens.alien_size[0] / 2:
+            actions.append('fire')
+        return actions
+
+
+# The policies a job can use.
+POLICIES = {
+    'idle': IdlePolicy,
+    'random': RandomPolicy,
+    'tracking': TrackingPolicy,
+}
+
+
+def make_jobs(overrides, policies, seeds, max_ticks, fleet_backend='sprite'):
+    """
+    Give a job for every combination of settings, policy and seed.
+
+    :param overrides dict: The values to try for each setting, as lists.
+    :param policies list: The names of the policies.
+    :param seeds int: The number of games of each combination.
+    :param max_ticks int: The longest a game is played, in simulation ticks.
+    :param fleet_backend str: The backend of the fleet of every game.
+    :var names list: The names of the settings changed.
+    :returns list: The jobs, as dictionaries.
+    """
+    names = sorted(overrides)
+    jobs = []
+    for values in itertools.product(*(overrides[name] for name in names)):
+        for policy in policies:
+            for seed in range(seeds):
+                jobs.append({'settings': dict(zip(names, values)),
+                             'policy': policy,
+                             'seed': seed,
+                             'max_ticks': max_ticks,
+                             'fleet_backend': fleet_backend})
+    return jobs
+
+
+def play_game(job):
+    """
+    Play a headless game until it is lost or runs out of ticks.
+
+    This runs in the processes of the pool, so it only takes and gives plain data.
+
+    :param job dict: The settings changed, the policy, the seed and the number of ticks.
+    :var settings Settings: The settings of the game.
+    :var game AlienInvasion: The headless game.
+    :var policy IdlePolicy: The policy playing the game.
+    :var lost bool: True if the game was lost, false if it ran out of ticks.
+    :returns dict: The job and the stats of the game.
+    """
+    # Imported here so that the main process does not need pygame.
+    from alien_invasion import AlienInvasion
+
+    settings = Settings()
+    settings.seed = job['seed']
+    settings.fleet_backend = job['fleet_backend']
+    for name, value in job['settings'].items():
+        setattr(settings, name, value)
+
+    start = time.perf_counter()
+    game = AlienInvasion(headless=True, settings=settings)
+    policy = POLICIES[job['policy']](random.Random(job['seed']))
+    game.reset()
+    lost = False
+    for tick in range(job['max_ticks']):
+        if not game.step(policy(game, tick)):
+            lost = True
+            break
+
+    stats = game.stats
+    return dict(job,
+                score=stats.score,
+                level=stats.level,
+                ships_lost=settings.ship_limit - stats.ships_left + lost,
+                ticks=game.tick,
+                lost=lost,
+                seconds=time.perf_counter() - start)
+
+
+def aggregate(results):
+    """
+    Group the stats of the games by settings and policy.
+
+    :param results list: The results of play_game().
+    :var groups dict: The results of each group, by settings and policy.
+    :returns list: The mean, minimum and maximum stats of each group.
+    """
+    groups = {}
+    for result in results:
+        key = (json.dumps(result['settings'], sort_keys=True), result['policy'])
+        groups.setdefault(key, []).append(result)
+
+    report = []
+    for (settings, policy), games in sorted(groups.items()):
+        scores = [game['score'] for game in games]
+        report.append({
+            'settings': json.loads(settings),
+            'policy': policy,
+            'games': len(games),
+            'score_mean': sum(scores) / len(games),
+            'score_min': min(scores),
+            'score_max': max(scores),
+            'level_mean': sum(game['level'] for game in games) / len(games),
+            'level_max': max(game['level'] for game in games),
+            'ships_lost_mean':
+                sum(game['ships_lost'] for game in games) / len(games),
+            'ticks_mean': sum(game['ticks'] for game in games) / len(games),
+            'lost': sum(game['lost'] for game in games),
+        })
+    return report
+
+
+def run_batch(jobs, workers=None):
+    """
+    Play every job in a pool of processes.
+
+    :param jobs list: The jobs of make_jobs().
+    :param workers int: The number of processes, one per core if None.
+    :var chunksize int: The number of jobs sent to a process at once.
+    :returns list: The results of the games, in the order of the jobs.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(play_game, jobs, chunksize=chunksize))
+
+
+def parse_override(text):
+    """
+    Read a setting and the values to try from a name=value,value option.
+
+    :param text str: The option, such as 'bullets_allowed=3,5'.
+    :var name str: The name of the setting.
+    :var values list: The values to try, as Python literals.
+    :raises ArgumentTypeError: If the setting does not exist.
+    :returns (str, list): The name of the setting and its values.
+    """
+    name, _, values = text.partition('=')
+    if not hasattr(Settings(), name) or not values:
+        raise argparse.ArgumentTypeError(f"expected setting=value[,value...]: {text}")
+    return name, [ast.literal_eval(value) for value in values.split(',')]
+
+
+def main(argv=None):
+    """
+    Play the games asked on the command line and print the aggregated report.
+
+    :param argv list: The command line arguments, sys.argv if None.
+    :var jobs list: The games to play.
+    :var report list: The stats of each group of games.
+    :returns int: The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        description="Play headless Alien Invasion games in parallel.")
+    parser.add_argument('--set', type=parse_override, action='append',
+                        default=[], metavar='SETTING=VALUE[,VALUE...]',
+                        help="values of a setting to try, every combination is played")
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                        help="policy playing the games, tracking by default")
+    parser.add_argument('--seeds', type=int, default=4,
+                        help="games played for each combination")
+    parser.add_argument('--max-ticks', type=int, default=120 * 300,
+                        help="longest game in simulation ticks")
+    parser.add_argument('--fleet-backend', choices=['sprite', 'numpy'],
+                        default='sprite')
+    parser.add_argument('--workers', type=int,
+                        help="processes of the pool, one per core by default")
+    parser.add_argument('--output', help="file to write the JSON report to")
+    args = parser.parse_args(argv)
+
+    jobs = make_jobs(dict(args.set), args.policy or ['tracking'], args.seeds,
+                     args.max_ticks, args.fleet_backend)
+    start = time.perf_counter()
+    results = run_batch(jobs, args.workers)
+    seconds = time.perf_counter() - start
+    report = aggregate(results)
+
+    print(f"{'settings':<40} {'policy':<9} {'games':>5} {'score':>9} "
+          f"{'level':>6} {'ships':>5} {'ticks':>8}")
+    for group in report:
+        settings = ' '.join(f"{name}={value}"
+                            for name, value in group['settings'].items())
+        print(f"{settings or 'defaults':<40} {group['policy']:<9} "
+              f"{group['games']:>5} {group['score_mean']:>9.0f} "
+              f"{group['level_mean']:>6.1f} {group['ships_lost_mean']:>5.1f} "
+              f"{group['ticks_mean']:>8.0f}")
+    busy = sum(result['seconds'] for result in results)
+    print(f"{len(jobs)} games in {seconds:.1f} s, "
+          f"{busy / seconds:.1f} games played at once on average")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'report': report, 'games': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
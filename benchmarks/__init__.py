@@ -0,0 +1,3 @@
+"""
+Benchmarks of the Alien Invasion game, run headless from the root of the project.
+"""
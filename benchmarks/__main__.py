@@ -0,0 +1,127 @@
+"""
+Run the benchmark scenarios and compare the results with a baseline.
+
+Run from the root of the project with: python -m benchmarks --help
+
+:function: parse_args(argv=None)
+:function: compare(results, baseline, tolerance)
+:function: main(argv=None)
+"""
+
+import argparse
+import json
+import platform
+import sys
+import pygame
+from settings import Settings
+from benchmarks.scenarios import SCENARIOS, run_scenario
+
+# The statistics compared with the baseline.
+COMPARED = [('frame', 'p95'), ('frame', 'p99'), ('update', 'mean'),
+            ('render', 'mean')]
+
+
+def parse_args(argv=None):
+    """
+    Read the options of the command line.
+
+    :param argv list: The arguments, the ones of the command line if None.
+    :var parser ArgumentParser: The parser of the options.
+    :returns Namespace: The options.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description="Time headless Alien Invasion scenarios.")
+    parser.add_argument('--scenario', action='append',
+                        choices=sorted(SCENARIOS),
+                        help="scenario to run, every scenario by default")
+    parser.add_argument('--frames', type=int, default=600,
+                        help="frames measured per scenario")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the scripted players")
+    parser.add_argument('--fleet-backend', choices=['sprite', 'numpy'],
+                        default='sprite')
+    parser.add_argument('--render-mode', choices=['full', 'dirty'],
+                        default='full')
+    parser.add_argument('--output', help="file to write the JSON results to")
+    parser.add_argument('--baseline', help="JSON results to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="allowed slowdown compared with the baseline")
+    return parser.parse_args(argv)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Find the statistics slower than the baseline by more than the tolerance.
+
+    :param results dict: The results of the run.
+    :param baseline dict: The results of the baseline.
+    :param tolerance float: The allowed slowdown, 0.15 for 15 percent.
+    :var regressions list: The description of each regression.
+    :returns list: The description of each regression.
+    """
+    regressions = []
+    for name, result in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(name)
+        if reference is None:
+            continue
+        for phase, statistic in COMPARED:
+            value = result[phase][statistic]
+            limit = reference[phase][statistic] * (1 + tolerance)
+            if value > limit:
+                regressions.append(
+                    f"{name} {phase} {statistic}: {value:.3f} ms > "
+                    f"{reference[phase][statistic]:.3f} ms + "
+                    f"{tolerance:.0%}")
+    return regressions
+
+
+def main(argv=None):
+    """
+    Run the scenarios, print their statistics and check them against the baseline.
+
+    :param argv list: The arguments, the ones of the command line if None.
+    :var results dict: The results of the run, as written in JSON.
+    :returns int: 1 if a statistic regressed, 0 if not.
+    """
+    args = parse_args(argv)
+    results = {'version': 1,
+               'python': platform.python_version(),
+               'pygame': pygame.version.ver,
+               'frames': args.frames,
+               'seed': args.seed,
+               'fleet_backend': args.fleet_backend,
+               'render_mode': args.render_mode,
+               'scenarios': {}}
+
+    print(f"{'scenario':<24} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'update':>7} {'render':>7}  (ms)")
+    for name in args.scenario or SCENARIOS:
+        settings = Settings()
+        settings.fleet_backend = args.fleet_backend
+        settings.render_mode = args.render_mode
+        result = run_scenario(name, args.frames, args.seed, settings)
+        results['scenarios'][name] = result
+        frame = result['frame']
+        print(f"{name:<24} {frame['mean']:>7.3f} {frame['p50']:>7.3f} "
+              f"{frame['p95']:>7.3f} {frame['p99']:>7.3f} "
+              f"{result['update']['mean']:>7.3f} "
+              f"{result['render']['mean']:>7.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            return 1
+        print("No regression against", args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Compare the broadphase collisions of the fleets with pygame.sprite.groupcollide.
+
+Each size is measured in both collision modes. In the mask mode the fleets compare the
+shared masks only for the pairs whose rectangles overlap, while groupcollide and
+spritecollideany with pygame.sprite.collide_mask compare the masks of every pair.
+
+Each measure starts from a fresh fleet, so the times of ArrayFleet include sorting
+its grid, which the game only does when a new fleet is created.
+
+Run from the root of the project with: python -m benchmarks.collisions --help
+
+:function: parse_args(argv=None)
+:function: build_fleet(fleet, aliens)
+:function: build_bullets(game, bullets, rng, area)
+:function: as_sprites(items, mask=None)
+:function: time_call(setup, call, repeat)
+:function: main(argv=None)
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import time
+import pygame
+from alien_invasion import AlienInvasion
+from bullet import BulletPool
+from fleet import Fleet, ArrayFleet
+
+# (aliens, bullets) in each round of the benchmark.
+SIZES = [(50, 3), (500, 30), (2000, 100), (10000, 300)]
+
+# The values of Settings.collision_mode measured.
+MODES = ['rect', 'mask']
+
+
+def parse_args(argv=None):
+    """
+    Read the options of the command line.
+
+    :param argv list: The arguments, the ones of the command line if None.
+    :var parser ArgumentParser: The parser of the options.
+    :var args Namespace: The options read.
+    :returns Namespace: The options.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.collisions',
+        description="Time the collision checks of the fleets and of pygame.")
+    parser.add_argument('--size', action='append', nargs=2, type=int,
+                        metavar=('ALIENS', 'BULLETS'), dest='sizes',
+                        help="aliens and bullets of a round, "
+                             f"{' '.join(f'{a}x{b}' for a, b in SIZES)} by default")
+    parser.add_argument('--mode', action='append', choices=MODES,
+                        dest='modes', help="collision mode, both by default")
+    parser.add_argument('--repeat', type=int,
+                        help="measures kept the best of, "
+                             "5 above 1000 aliens and 20 below by default")
+    args = parser.parse_args(argv)
+    if any(count < 1 for size in args.sizes or () for count in size):
+        parser.error("--size needs at least one alien and one bullet")
+    if args.repeat is not None and args.repeat < 1:
+        parser.error("--repeat needs at least one measure")
+    return args
+
+
+def build_fleet(fleet, aliens):
+    """
+    Fill a fleet with rows of aliens spaced by one alien, like the game does.
+
+    :param fleet Fleet: The fleet to fill.
+    :param aliens int: The number of aliens.
+    :var columns int: The number of aliens in a row.
+    :returns Rect: The area covered by the fleet.
+    """
+    width, height = fleet.alien_size
+    columns = 40
+    for number in range(aliens):
+        fleet.add_alien(width + 2 * width * (number % columns),
+                        height + 2 * height * (number // columns))
+    return pygame.Rect(0, 0, 2 * width * (columns + 1),
+                       2 * height * (aliens // columns + 2))
+
+
+def build_bullets(game, bullets, rng, area):
+    """
+    Create bullets at random positions of an area.
+
+    :param game AlienInvasion: The headless game.
+    :param bullets int: The number of bullets.
+    :param rng Random: The seeded random generator.
+    :param area Rect: The area where bullets are placed.
+    :var pool BulletPool: The bullets created.
+    :returns BulletPool: The bullets created.
+    """
+    pool = BulletPool(game)
+    for _ in range(bullets):
+        pool.fire((rng.randrange(area.width), rng.randrange(area.height)))
+    return pool
+
+
+def as_sprites(items, mask=None):
+    """
+    Copy the rects of aliens or bullets into a group of plain sprites.
+
+    :param items list: The objects with a rect attribute.
+    :param mask Mask: The mask shared by the sprites, for pygame.sprite.collide_mask.
+    :var group Group: The sprites created.
+    :returns Group: The sprites, for pygame.sprite.groupcollide.
+    """
+    group = pygame.sprite.Group()
+    for item in items:
+        sprite = pygame.sprite.Sprite()
+        sprite.rect = item.rect.copy()
+        sprite.mask = mask
+        group.add(sprite)
+    return group
+
+
+def time_call(setup, call, repeat):
+    """
+    Time a call on fresh arguments, leaving the setup out of the measure.
+
+    :param setup function: Builds the arguments of the call.
+    :param call function: The call to time.
+    :param repeat int: The number of measures.
+    :returns float: The best time of the call in milliseconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        call(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    """
+    Print the time of each collision check at growing numbers of entities, in each
+    collision mode.
+
+    :param argv list: The arguments, the ones of the command line if None.
+    :var args Namespace: The options of the command line.
+    :returns int: 0 once every round is printed.
+    """
+    args = parse_args(argv)
+    game = AlienInvasion(headless=True)
+    print(f"{'aliens':>7} {'bullets':>7} {'mode':>4} | {'groupcollide':>12} "
+          f"{'Fleet':>8} {'ArrayFleet':>10} | {'anyship':>8} "
+          f"{'Fleet':>8} {'ArrayFleet':>10}  (ms)")
+    for (aliens, bullets), mode in itertools.product(args.sizes or SIZES,
+                                                     args.modes or MODES):
+        repeat = args.repeat or (5 if aliens > 1000 else 20)
+        game.settings.collision_mode = mode
+        collided = pygame.sprite.collide_mask if mode == 'mask' else None
+
+        def setup(fleet_class):
+            fleet = fleet_class(game)
+            area = build_fleet(fleet, aliens)
+            group = build_bullets(game, bullets, random.Random(aliens), area)
+            game.ship.rect.center = area.center
+            return fleet, group
+
+        def setup_group():
+            fleet, group = setup(Fleet)
+            return (as_sprites(fleet.sprites(), fleet.sprites()[0].mask),
+                    as_sprites(group.sprites(), group.mask))
+
+        bullet_times = [
+            time_call(setup_group, lambda aliens_group, group:
+                      pygame.sprite.groupcollide(group, aliens_group,
+                                                 True, True, collided), repeat),
+            time_call(lambda: setup(Fleet), lambda fleet, group:
+                      fleet.collide_bullets(group), repeat),
+            time_call(lambda: setup(ArrayFleet), lambda fleet, group:
+                      fleet.collide_bullets(group), repeat),
+        ]
+        ship_times = [
+            time_call(setup_group, lambda aliens_group, group:
+                      pygame.sprite.spritecollideany(game.ship, aliens_group,
+                                                     collided),
+                      repeat),
+            time_call(lambda: setup(Fleet), lambda fleet, group:
+                      fleet.collide_ship(game.ship), repeat),
+            time_call(lambda: setup(ArrayFleet), lambda fleet, group:
+                      fleet.collide_ship(game.ship), repeat),
+        ]
+        print(f"{aliens:>7} {bullets:>7} {mode:>4} | {bullet_times[0]:>12.3f} "
+              f"{bullet_times[1]:>8.3f} {bullet_times[2]:>10.3f} | "
+              f"{ship_times[0]:>8.3f} {ship_times[1]:>8.3f} "
+              f"{ship_times[2]:>10.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
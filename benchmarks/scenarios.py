@@ -0,0 +1,209 @@
+"""
+Scripted and seeded scenarios driving a headless game for the benchmarks.
+
+Each scenario has a setup, preparing a headless game, and a player, giving the actions
+of each frame from a seeded random generator.
+
+:function: setup_menu(game)
+:function: setup_game(game)
+:function: setup_dense_fleet(game)
+:function: setup_late_levels(game)
+:class: FiringPlayer(IdlePolicy)
+:class: StormPlayer(FiringPlayer)
+:function: percentile(values, fraction)
+:function: summarize(values)
+:function: run_scenario(name, frames, seed, settings=None, warmup=60)
+"""
+
+import math
+import random
+import time
+from alien_invasion import AlienInvasion
+from batch import IdlePolicy
+
+
+def setup_menu(game):
+    """
+    Leave the game on the menu, waiting for the play button.
+
+    :param game AlienInvasion: The headless game.
+    :returns: None.
+    """
+
+
+def setup_game(game):
+    """
+    Start a new game.
+
+    :param game AlienInvasion: The headless game.
+    :returns: None.
+    """
+    game.reset()
+
+
+def setup_dense_fleet(game):
+    """
+    Start a new game with a fleet packed four times denser and more bullets allowed.
+
+    :param game AlienInvasion: The headless game.
+    :var width int: The width of an alien.
+    :var height int: The height of an alien.
+    :returns: None.
+    """
+    game.reset()
+    game.settings.bullets_allowed = 30
+    game.aliens.empty()
+    width, height = game.aliens.alien_size
+    for y in range(height, game.settings.screen_height // 2, height // 2):
+        for x in range(width, game.settings.screen_width - 2 * width,
+                       width // 2):
+            game.aliens.add_alien(x, y)
+
+
+def setup_late_levels(game):
+    """
+    Start a new game with the speeds of the twentieth level.
+
+    :param game AlienInvasion: The headless game.
+    :returns: None.
+    """
+    game.reset()
+    for _ in range(19):
+        game.settings.increase_speed()
+
+
+class FiringPlayer(IdlePolicy):
+    """
+    Fire continuously while moving and randomly changing direction.
+
+    :method: __init__(self, rng)
+    :method: __call__(self, game, frame)
+    """
+
+    def __init__(self, rng):
+        """
+        Initialize the player moving right.
+
+        :param rng Random: The seeded random generator of the scenario.
+        :var direction str: The direction the ship is moving to.
+        :returns FiringPlayer: Generates an instance of FiringPlayer class.
+        """
+        super().__init__(rng)
+        self.direction = 'right'
+
+    def __call__(self, game, frame):
+        """
+        Give the actions of a frame.
+
+        :param game AlienInvasion: The headless game.
+        :param frame int: The number of the frame.
+        :returns tuple: The actions of the frame.
+        """
+        if self.rng.random() < 0.01:
+            self.direction = 'left' if self.direction == 'right' else 'right'
+        return ('fire', self.direction)
+
+
+class StormPlayer(FiringPlayer):
+    """
+    Destroy the whole fleet on each frame so that every tick starts a new level.
+
+    The speeds are reset regularly so the fleet does not leave the screen at once, and
+    the pause between two levels is skipped.
+
+    :method: __call__(self, game, frame)
+    """
+
+    def __call__(self, game, frame):
+        """
+        Give the actions of a frame, after destroying the fleet.
+
+        :param game AlienInvasion: The headless game.
+        :param frame int: The number of the frame.
+        :returns tuple: The actions of the frame.
+        """
+        game.settings.level_transition_time = 0.0
+        game.aliens.empty()
+        if frame % 30 == 0:
+            game.settings.initialize_dynamic_settings()
+        return super().__call__(game, frame)
+
+
+# The setup and the player of each scenario.
+SCENARIOS = {
+    'idle_menu': (setup_menu, IdlePolicy),
+    'steady_firing': (setup_game, FiringPlayer),
+    'dense_fleet': (setup_dense_fleet, FiringPlayer),
+    'level_transition_storm': (setup_game, StormPlayer),
+    'late_levels': (setup_late_levels, FiringPlayer),
+}
+
+
+def percentile(values, fraction):
+    """
+    Give the nearest-rank percentile of sorted values.
+
+    :param values list: The sorted values.
+    :param fraction float: The percentile between 0 and 1.
+    :returns float: The percentile of the values.
+    """
+    rank = math.ceil(fraction * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def summarize(values):
+    """
+    Give the mean and the percentiles of durations.
+
+    :param values list: The durations in nanoseconds.
+    :var ordered list: The durations in milliseconds, sorted.
+    :returns dict: The mean, p50, p95, p99 and max in milliseconds.
+    """
+    ordered = sorted(value / 1e6 for value in values)
+    return {'mean': sum(ordered) / len(ordered),
+            'p50': percentile(ordered, 0.50),
+            'p95': percentile(ordered, 0.95),
+            'p99': percentile(ordered, 0.99),
+            'max': ordered[-1]}
+
+
+def run_scenario(name, frames, seed, settings=None, warmup=60):
+    """
+    Run a scenario on a headless game and time the update and the render of each frame.
+
+    A game lost during the scenario is set up again, out of the measures.
+
+    :param name str: The name of the scenario.
+    :param frames int: The number of frames measured.
+    :param seed int: The seed of the random generator of the player.
+    :param settings Settings: The settings of the game, default settings if None.
+    :param warmup int: The number of frames run before measuring.
+    :var updates list: The duration of the update of each frame in nanoseconds.
+    :var renders list: The duration of the render of each frame in nanoseconds.
+    :returns dict: The summaries of the frame, update and render durations.
+    """
+    setup, player_class = SCENARIOS[name]
+    game = AlienInvasion(headless=True, settings=settings)
+    setup(game)
+    player = player_class(random.Random(seed))
+    clock = time.perf_counter_ns
+    updates = []
+    renders = []
+    for frame in range(warmup + frames):
+        actions = player(game, frame)
+        start = clock()
+        active = game.step(actions)
+        middle = clock()
+        game.render()
+        end = clock()
+        if frame >= warmup:
+            updates.append(middle - start)
+            renders.append(end - middle)
+        if not active and setup is not setup_menu:
+            setup(game)
+
+    return {'frames': frames,
+            'frame': summarize([update + render for update, render
+                                in zip(updates, renders)]),
+            'update': summarize(updates),
+            'render': summarize(renders)}
@@ -0,0 +1,116 @@
+"""
+Stress a headless game with a swarm of aliens and report its sustained throughput.
+
+The size of the swarm comes from the settings: fleet_rows, fleet_columns, alien_scale,
+bullets_allowed and fleet_drop_speed. Run it from the command line of the game, for
+instance ``python alien_invasion.py --rows 200 --columns 500 --stress 10``.
+
+:function: run_swarm(settings, seconds, seed=0)
+:function: print_report(report)
+"""
+
+import random
+import time
+from alien_invasion import AlienInvasion
+from profiler import Profiler
+from benchmarks.scenarios import FiringPlayer, summarize
+
+
+def run_swarm(settings, seconds, seed=0):
+    """
+    Play a headless game with the settings for some time, timing each update and render.
+
+    The pauses are skipped so the fleet keeps moving during the whole run, and a game
+    lost is started again, out of the measures.
+
+    :param settings Settings: The settings of the swarm.
+    :param seconds float: The time spent updating and rendering the game.
+    :param seed int: The seed of the random generator of the player.
+    :var game AlienInvasion: The headless game.
+    :var player FiringPlayer: The player firing continuously.
+    :var updates list: The duration of each update in nanoseconds.
+    :var renders list: The duration of each render in nanoseconds.
+    :var aliens int: The number of aliens updated, summed over the updates.
+    :var phases dict: The nanoseconds spent in each phase of the profiler.
+    :var load float: The fraction of a second spent updating tick_rate ticks and
+    rendering max_fps frames.
+    :returns dict: The size of the swarm, the throughput of the updates, the renders and
+    each phase, and the load of the game at its tick rate and frame rate.
+    """
+    settings.respawn_time = 0.0
+    settings.level_transition_time = 0.0
+
+    start = time.perf_counter()
+    game = AlienInvasion(headless=True, settings=settings)
+    game.reset()
+    setup = time.perf_counter() - start
+    fleet = len(game.aliens)
+
+    player = FiringPlayer(random.Random(seed))
+    clock = time.perf_counter_ns
+    updates = []
+    renders = []
+    aliens = 0
+    phases = dict.fromkeys(Profiler.PHASES, 0)
+    deadline = clock() + seconds * 1e9
+    while clock() < deadline:
+        actions = player(game, len(updates))
+        aliens += len(game.aliens)
+        start = clock()
+        active = game.step(actions)
+        middle = clock()
+        game.render()
+        end = clock()
+        updates.append(middle - start)
+        renders.append(end - middle)
+        for phase, duration in game.profiler.current.items():
+            phases[phase] += duration
+        game.profiler.end_frame()
+        if not active:
+            game.reset()
+
+    update_time = sum(updates) / 1e9
+    render_time = sum(renders) / 1e9
+    load = (settings.tick_rate * update_time / len(updates) +
+            (settings.max_fps or settings.tick_rate) * render_time / len(renders))
+    return {'aliens': fleet,
+            'alien_size': game.aliens.alien_size,
+            'backend': settings.fleet_backend,
+            'collisions': settings.collision_mode,
+            'setup': setup,
+            'ticks': len(updates),
+            'alien_mean': aliens / len(updates),
+            'ticks_per_second': len(updates) / update_time,
+            'aliens_per_second': aliens / update_time,
+            'frames_per_second': len(renders) / render_time,
+            'update': summarize(updates),
+            'render': summarize(renders),
+            'phases': {phase: duration / 1e6 / len(updates)
+                       for phase, duration in phases.items() if duration},
+            'tick_rate': settings.tick_rate,
+            'max_fps': settings.max_fps or settings.tick_rate,
+            'load': load}
+
+
+def print_report(report):
+    """
+    Print the throughput of a swarm, and whether it keeps up with the tick rate.
+
+    :param report dict: The report of run_swarm().
+    :returns: None.
+    """
+    print(f"{report['aliens']} aliens of {report['alien_size'][0]}x"
+          f"{report['alien_size'][1]} pixels, {report['backend']} backend, "
+          f"{report['collisions']} collisions, fleet created in {report['setup']:.2f} s")
+    print(f"{report['ticks']} ticks, {report['alien_mean']:.0f} aliens alive on average")
+    for name, rate, unit in (('update', report['ticks_per_second'], 'ticks'),
+                             ('render', report['frames_per_second'], 'frames')):
+        stats = report[name]
+        print(f"{name:<7} {rate:>9.1f} {unit}/s   mean {stats['mean']:.3f} ms   "
+              f"p95 {stats['p95']:.3f} ms   max {stats['max']:.3f} ms")
+    print(f"aliens updated: {report['aliens_per_second']:,.0f} per second")
+    print("per tick: " + ", ".join(f"{phase} {ms:.3f} ms"
+                                   for phase, ms in report['phases'].items()))
+    print(f"load at {report['tick_rate']} ticks/s and {report['max_fps']} fps: "
+          f"{report['load']:.0%} of a second, "
+          f"{'keeps up' if report['load'] <= 1 else 'falls behind'}")
@@ -1,63 +1,246 @@
 """
 Manage the bullets of the ship of the player.
 
-:class: Bullet(Sprite)
+:class: Bullet()
+:class: BulletPool()
 """
 
 import pygame
-from pygame.sprite import Sprite
 
 
-class Bullet(Sprite):
+class Bullet:
     """
-    Manage the bullets of the player.
+    Store a bullet of the player as a compact record reused by the pool.
+
+    :method: __init__(self, pool)
+    :method: kill(self)
+    :method: interpolated_rect(self, alpha)
+    """
+
+    __slots__ = ('pool', 'rect', 'y', 'prev_y', 'alive')
+
+    def __init__(self, pool):
+        """
+        Initialize a bullet object, placed by the pool when it is fired.
+
+        :param pool BulletPool: The pool the bullet belongs to.
+        :var rect Rect: The rectangular dimension of the bullet.
+        :var y float: The vertical coordinate of the bullet on the screen.
+        :var prev_y float: The vertical coordinate of the bullet before the last update.
+        :var alive bool: True while the bullet is in flight, false once it was killed.
+        :returns Bullet: Generates an instance of the Bullet class.
+        """
+        self.pool = pool
+        self.rect = pygame.Rect(0, 0, *pool.size)
+        self.y = 0.0
+        self.prev_y = 0.0
+        self.alive = False
+
+    def kill(self):
+        """
+        Remove the bullet from the bullets in flight.
+
+        :returns: None.
+        """
+        self.pool.remove(self)
+
+    def interpolated_rect(self, alpha):
+        """
+        Give the position of the bullet between its previous and its current location.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :var rect Rect: The interpolated position of the bullet.
+        :returns Rect: The position where the bullet has to be drawn.
+        """
+        rect = self.rect.copy()
+        rect.y = self.prev_y + (self.y - self.prev_y) * alpha
+        return rect
+
+
+class BulletPool:
+    """
+    Manage the bullets of the player in a preallocated pool.
+
+    The bullets in flight are the first count records of the pool, in the order they
+    were fired. Records of dead bullets are kept at the end of the pool and reused.
+    A bullet killed is only marked dead: the records are compacted in place once, by the
+    next update or the next look at the bullets in flight.
 
     :method: __init__(self, game)
-    :method: update(self)
-    :method: draw_bullet(self)
+    :method: __len__(self)
+    :method: __bool__(self)
+    :method: sprites(self)
+    :method: fire(self, midtop)
+    :method: update(self, dt)
+    :method: remove(self, bullet)
+    :method: empty(self)
+    :method: draw(self, surface, alpha=1.0)
+    :method: blit_sequence(self, alpha=1.0)
+    :method: _compact(self)
     """
 
     def __init__(self, game):
         """
-        Initialize a bullet object at the ship's current position.
+        Initialize the pool with a record for each bullet allowed.
 
         :param game AlienInvasion: The current game of Alien Invasion.
-        :var screen Surface: The screen of the game.
         :var settings Settings: The current settings of the game.
-        :var color (int, int, int): Color of the bullet.
-        :var rect Rect: The rectangular dimension of the bullet.
-        :var y int: The vertical coordinate of the bullet on the screen.
-        :returns Bullet: Generates an instance of the Bullet class.
+        :var size (int, int): The width and the height of a bullet.
+        :var image Surface: The surface of the bullet, shared by all the bullets.
+        :var mask Mask: The full mask of a bullet, shared by all the bullets.
+        :var items list: The records of the pool, bullets in flight first.
+        :var count int: The number of records in use, bullets in flight and bullets
+        killed since the last compaction.
+        :var dead int: The number of bullets killed since the last compaction.
+        :returns BulletPool: Generates an instance of the BulletPool class.
         """
-        super().__init__()
-        self.screen = game.screen
         self.settings = game.settings
-        self.color = self.settings.bullet_color
+        self.size = (self.settings.bullet_width, self.settings.bullet_height)
+        self.image = game.assets.solid(self.size, self.settings.bullet_color)
+        self.mask = game.assets.solid_mask(self.size)
+        self.items = [Bullet(self)
+                      for _ in range(self.settings.bullets_allowed)]
+        self.count = 0
+        self.dead = 0
+
+    def __len__(self):
+        """
+        Give the number of bullets in flight.
+
+        :returns int: The number of bullets in flight.
+        """
+        return self.count - self.dead
+
+    def __bool__(self):
+        """
+        Tell if any bullet is in flight.
+
+        :returns bool: True if a bullet is in flight, false if not.
+        """
+        return self.count > self.dead
+
+    def sprites(self):
+        """
+        Give the bullets in flight, in the order they were fired.
+
+        :returns list: The bullets in flight.
+        """
+        self._compact()
+        return self.items[:self.count]
 
-        # Create a bullet rectangle at (0,0) and then set correct position.
-        self.rect = pygame.Rect(
-            0, 0, self.settings.bullet_width, self.settings.bullet_height)
-        self.rect.midtop = game.ship.rect.midtop
+    def fire(self, midtop):
+        """
+        Take a free record of the pool and place it at a position.
 
-        # Store the bullet's position as a decimal value.
-        self.y = float(self.rect.y)
+        :param midtop (int, int): The middle of the top side of the new bullet.
+        :var bullet Bullet: The bullet fired.
+        :returns Bullet: The bullet fired.
+        """
+        if self.count == len(self.items):
+            # Reuse the records of the bullets killed before growing the pool.
+            self._compact()
+            if self.count == len(self.items):
+                self.items.append(Bullet(self))
+        bullet = self.items[self.count]
+        bullet.rect.midtop = midtop
+        bullet.y = float(bullet.rect.y)
+        bullet.prev_y = bullet.y
+        bullet.alive = True
+        self.count += 1
+        return bullet
+
+    def update(self, dt):
+        """
+        Move the bullets up the screen and get rid of the ones that have disappeared.
+
+        Bullets still in flight are compacted in place at the start of the pool, leaving
+        out the ones killed since the last update.
+
+        :param dt float: The duration of the simulation tick in seconds.
+        :var distance float: The distance covered by the bullets during the tick.
+        :var live int: The number of bullets kept so far.
+        :returns: None.
+        """
+        distance = self.settings.bullet_speed * dt
+        items = self.items
+        live = 0
+        for index in range(self.count):
+            bullet = items[index]
+            if not bullet.alive:
+                continue
+            bullet.prev_y = bullet.y
+            bullet.y -= distance
+            bullet.rect.y = bullet.y
+            if bullet.rect.bottom > 0:
+                items[live], items[index] = bullet, items[live]
+                live += 1
+            else:
+                bullet.alive = False
+        self.count = live
+        self.dead = 0
 
-    def update(self):
+    def remove(self, bullet):
         """
-        Move the bullet up the screen.
+        Mark a bullet in flight as dead, its record is reclaimed by the next compaction.
 
-        :var y float: The y coordinates of the bullet.
+        :param bullet Bullet: The bullet to remove.
         :returns: None.
         """
-        # Update the decimal position of the bullet
-        self.y -= self.settings.bullet_speed
-        # Update the rec position of the bullet.
-        self.rect.y = self.y
+        if bullet.alive:
+            bullet.alive = False
+            self.dead += 1
+
+    def empty(self):
+        """
+        Remove every bullet in flight.
+
+        :returns: None.
+        """
+        for index in range(self.count):
+            self.items[index].alive = False
+        self.count = 0
+        self.dead = 0
+
+    def draw(self, surface, alpha=1.0):
+        """
+        Draw every bullet between its previous and its current location in one call.
+
+        :param surface Surface: The surface to draw on.
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :returns: None.
+        """
+        surface.blits(self.blit_sequence(alpha), False)
+
+    def blit_sequence(self, alpha=1.0):
+        """
+        Give the image of the bullets and where to draw each of them.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :var image Surface: The surface shared by all the bullets.
+        :returns list: The (image, rect) of each bullet.
+        """
+        self._compact()
+        image = self.image
+        return [(image, self.items[index].interpolated_rect(alpha))
+                for index in range(self.count)]
 
-    def draw_bullet(self):
+    def _compact(self):
         """
-        Draw the bullet to the screen.
+        Move the bullets in flight to the start of the pool in one pass, keeping their
+        order, if any bullet was killed since the last compaction.
 
+        :var items list: The records of the pool.
+        :var live int: The number of bullets kept so far.
         :returns: None.
         """
-        pygame.draw.rect(self.screen, self.color, self.rect)
+        if not self.dead:
+            return
+        items = self.items
+        live = 0
+        for index in range(self.count):
+            bullet = items[index]
+            if bullet.alive:
+                items[live], items[index] = bullet, items[live]
+                live += 1
+        self.count = live
+        self.dead = 0
@@ -55,6 +55,7 @@ class Button:
         :param msg str: String of text in the button.
         :var msg_image Surface: The message rendered into an image.
         :var msg_image_rect Rect: The rectangular dimensions of msg_image.
+        :var image Surface: The whole button with its message, drawn in one blit.
         :returns: None.
         """
         self.msg_image = self.font.render(
@@ -62,6 +63,11 @@ class Button:
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
+        self.image = pygame.Surface(self.rect.size)
+        self.image.fill(self.button_color)
+        self.image.blit(self.msg_image, self.msg_image_rect.move(
+            -self.rect.x, -self.rect.y))
+
     def draw_button(self):
         """
         Draw a blank button and draw the message in it.
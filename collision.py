@@ -0,0 +1,220 @@
+"""
+Broadphase structures finding which entities may collide without testing every pair.
+
+:class: SpatialHash()
+:class: ArrayGrid()
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SpatialHash:
+    """
+    Uniform grid mapping each cell to the items whose rectangle overlaps it.
+
+    :method: __init__(self, cell_size)
+    :method: __len__(self)
+    :method: clear(self)
+    :method: insert(self, item, rect)
+    :method: remove(self, item)
+    :method: query(self, rect)
+    :method: _cells(self, rect)
+    """
+
+    def __init__(self, cell_size):
+        """
+        Initialize an empty grid.
+
+        :param cell_size int: The width and the height of a cell in pixels.
+        :var cell_size int: The width and the height of a cell in pixels.
+        :var cells dict: The items in each cell, indexed by (column, row).
+        :var items dict: The cells of each item.
+        :returns SpatialHash: Generates an instance of SpatialHash class.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.items = {}
+
+    def __len__(self):
+        """
+        Give the number of items in the grid.
+
+        :returns int: The number of items.
+        """
+        return len(self.items)
+
+    def clear(self):
+        """
+        Remove every item from the grid.
+
+        :returns: None.
+        """
+        self.cells.clear()
+        self.items.clear()
+
+    def insert(self, item, rect):
+        """
+        Add an item to every cell its rectangle overlaps.
+
+        :param item object: The item to add.
+        :param rect Rect: The rectangle of the item.
+        :var cells list: The cells overlapped by the rectangle.
+        :returns: None.
+        """
+        cells = self._cells(rect)
+        self.items[item] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(item)
+
+    def remove(self, item):
+        """
+        Remove an item from the grid if it is in it.
+
+        :param item object: The item to remove.
+        :var bucket list: The items of a cell.
+        :returns: None.
+        """
+        for cell in self.items.pop(item, ()):
+            bucket = self.cells[cell]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def query(self, rect):
+        """
+        Give the items sharing a cell with a rectangle.
+
+        The items found may not overlap the rectangle: they still have to be tested.
+
+        :param rect Rect: The rectangle to look around.
+        :var found set: The items found in the cells.
+        :returns set: The items that may overlap the rectangle.
+        """
+        found = set()
+        for cell in self._cells(rect):
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def _cells(self, rect):
+        """
+        Give the cells overlapped by a rectangle.
+
+        :param rect Rect: The rectangle.
+        :returns list: The (column, row) of each cell.
+        """
+        size = self.cell_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return [(column, row) for column in columns for row in rows]
+
+
+class ArrayGrid:
+    """
+    Uniform grid over NumPy arrays of same-sized items, built by sorting their cells.
+
+    Items must not be larger than a cell, so an item only overlaps the cell of its top
+    left corner and the cells to the right and below it.
+
+    :method: __init__(self, cell_size)
+    :method: build(self, x, y)
+    :method: query(self, rect)
+    :method: query_many(self, left, top, right, bottom)
+    """
+
+    # Distance between two rows of cells in the keys, and offset of the columns.
+    ROW_STRIDE = 1 << 20
+    COLUMN_OFFSET = 1 << 19
+
+    def __init__(self, cell_size):
+        """
+        Initialize an empty grid.
+
+        :param cell_size int: The width and the height of a cell in pixels.
+        :var cell_size int: The width and the height of a cell in pixels.
+        :var keys ndarray: The sorted cell keys of the items.
+        :var order ndarray: The indices of the items in the order of keys.
+        :returns ArrayGrid: Generates an instance of ArrayGrid class.
+        """
+        if np is None:
+            raise ImportError("ArrayGrid requires NumPy.")
+        self.cell_size = cell_size
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+
+    def build(self, x, y):
+        """
+        Index the items from the positions of their top left corners.
+
+        :param x ndarray: The horizontal positions of the items.
+        :param y ndarray: The vertical positions of the items.
+        :var keys ndarray: The cell key of each item.
+        :returns: None.
+        """
+        columns = np.floor_divide(x, self.cell_size).astype(np.int64)
+        rows = np.floor_divide(y, self.cell_size).astype(np.int64)
+        keys = rows * self.ROW_STRIDE + columns + self.COLUMN_OFFSET
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def query(self, rect):
+        """
+        Give the indices of the items sharing a cell with a rectangle.
+
+        The items found may not overlap the rectangle: they still have to be tested.
+
+        :param rect Rect: The rectangle to look around.
+        :returns ndarray: The indices of the items that may overlap the rectangle.
+        """
+        return self.query_many(np.array([rect.left]), np.array([rect.top]),
+                               np.array([rect.right]),
+                               np.array([rect.bottom]))[1]
+
+    def query_many(self, left, top, right, bottom):
+        """
+        Give the items sharing a cell with each of several rectangles in one search.
+
+        Each rectangle looks in the row of cells above its own and in the column of
+        cells to the left of its own, where the items overlapping it may start. The pairs
+        are sorted by rectangle, then by cell, then by item.
+
+        :param left ndarray: The left sides of the rectangles.
+        :param top ndarray: The top sides of the rectangles.
+        :param right ndarray: The right sides of the rectangles.
+        :param bottom ndarray: The bottom sides of the rectangles.
+        :var rows ndarray: The number of rows of cells each rectangle looks in.
+        :var owners ndarray: The rectangle of each row of cells, then of each pair.
+        :var lengths ndarray: The number of items found in each row of cells.
+        :var steps ndarray: The distance between consecutive positions in order.
+        :returns (ndarray, ndarray): The index of the rectangle and of the item of each
+        pair that may overlap.
+        """
+        size = self.cell_size
+        first_row = top // size - 1
+        rows = (bottom - 1) // size + 1 - first_row
+        owners = np.repeat(np.arange(len(left)), rows)
+        # Number the rows of cells of each rectangle from its first one.
+        row = first_row[owners] + np.arange(len(owners)) - np.repeat(
+            np.cumsum(rows) - rows, rows)
+        base = row * self.ROW_STRIDE + self.COLUMN_OFFSET
+        start = np.searchsorted(
+            self.keys, base + (left // size - 1)[owners], 'left')
+        stop = np.searchsorted(
+            self.keys, base + ((right - 1) // size)[owners], 'right')
+        lengths = np.maximum(stop - start, 0)
+        total = int(lengths.sum())
+        if not total:
+            return owners[:0], self.order[:0]
+        # Walk the runs of order one after the other: each run starts at its own start.
+        nonempty = lengths > 0
+        start, lengths = start[nonempty], lengths[nonempty]
+        steps = np.ones(total, dtype=np.int64)
+        ends = np.cumsum(lengths)
+        steps[0] = start[0]
+        steps[ends[:-1]] = start[1:] - (start[:-1] + lengths[:-1]) + 1
+        return (np.repeat(owners[nonempty], lengths),
+                self.order[np.cumsum(steps)])
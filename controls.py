@@ -0,0 +1,154 @@
+"""
+Timestamp the inputs of the player and measure how long they take to reach the screen.
+
+:class: TimedInput()
+:class: LatencyTracker()
+"""
+
+import json
+import pygame
+
+# The only events the game handles, the others are dropped by SDL.
+ALLOWED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP,
+                  pygame.MOUSEBUTTONDOWN, pygame.VIDEOEXPOSE,
+                  pygame.VIDEORESIZE]
+
+
+class TimedInput:
+    """
+    Keep when an input was received and from which tick the game shows its effect.
+
+    :method: __init__(self, received)
+    """
+
+    __slots__ = ('received', 'shown_from')
+
+    def __init__(self, received):
+        """
+        Initialize an input not applied yet.
+
+        :param received float: The value of perf_counter() when the input was received.
+        :var shown_from int: The first simulation tick whose state includes the input,
+        None until the input is applied.
+        :returns TimedInput: Generates an instance of TimedInput class.
+        """
+        self.received = received
+        self.shown_from = None
+
+
+class LatencyTracker:
+    """
+    Measure the delay between receiving an input and flipping the first frame showing it.
+
+    The delays are counted in a histogram of buckets of one millisecond, so a session of
+    any length takes the same memory.
+
+    :method: __init__(self, buckets=100)
+    :method: received(self, now)
+    :method: presented(self, tick, now)
+    :method: record(self, delay)
+    :method: percentile(self, fraction)
+    :method: summary(self)
+    :method: export(self, path)
+    """
+
+    def __init__(self, buckets=100):
+        """
+        Initialize an empty histogram.
+
+        :param buckets int: The number of buckets, the last one counting longer delays.
+        :var histogram list: The number of delays of each millisecond.
+        :var pending list: The inputs received and not shown yet.
+        :var count int: The number of delays measured.
+        :var total float: The sum of the delays in milliseconds.
+        :var longest float: The longest delay in milliseconds.
+        :returns LatencyTracker: Generates an instance of LatencyTracker class.
+        """
+        self.histogram = [0] * buckets
+        self.pending = []
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    def received(self, now):
+        """
+        Start measuring an input.
+
+        :param now float: The value of perf_counter() when the input was received.
+        :var timed TimedInput: The input measured.
+        :returns TimedInput: The input measured, to mark when it is applied.
+        """
+        timed = TimedInput(now)
+        self.pending.append(timed)
+        return timed
+
+    def presented(self, tick, now):
+        """
+        Measure the inputs shown by a frame that was just flipped.
+
+        :param tick int: The simulation tick of the state shown by the frame.
+        :param now float: The value of perf_counter() after the flip.
+        :var waiting list: The inputs not shown yet.
+        :returns: None.
+        """
+        waiting = []
+        for timed in self.pending:
+            if timed.shown_from is not None and timed.shown_from <= tick:
+                self.record((now - timed.received) * 1000)
+            else:
+                waiting.append(timed)
+        self.pending = waiting
+
+    def record(self, delay):
+        """
+        Count a delay in the histogram.
+
+        :param delay float: The delay in milliseconds.
+        :returns: None.
+        """
+        self.histogram[min(int(delay), len(self.histogram) - 1)] += 1
+        self.count += 1
+        self.total += delay
+        self.longest = max(self.longest, delay)
+
+    def percentile(self, fraction):
+        """
+        Give the upper bound of the bucket holding a percentile of the delays.
+
+        :param fraction float: The percentile between 0 and 1.
+        :var rank int: The number of delays up to the percentile.
+        :var seen int: The number of delays in the buckets looked at so far.
+        :returns float: The percentile in milliseconds, 0 if nothing was measured.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return float(bucket + 1)
+        return 0.0
+
+    def summary(self):
+        """
+        Give the statistics and the histogram of the delays.
+
+        :returns dict: The count, mean, p50, p95, p99 and max in milliseconds, and the
+        histogram.
+        """
+        return {'count': self.count,
+                'mean': self.total / self.count if self.count else 0.0,
+                'p50': self.percentile(0.50),
+                'p95': self.percentile(0.95),
+                'p99': self.percentile(0.99),
+                'max': self.longest,
+                'histogram': list(self.histogram)}
+
+    def export(self, path):
+        """
+        Write the statistics and the histogram of the delays to a JSON file.
+
+        :param path str: The path of the file.
+        :returns: None.
+        """
+        with open(path, 'w') as file:
+            json.dump(self.summary(), file)
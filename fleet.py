@@ -0,0 +1,892 @@
+"""
+Manage the fleet of aliens of the game.
+
+Both fleets offer the same methods so the game can use either of them.
+The fleet moves as one block, so both index their aliens in a broadphase grid using
+positions relative to the fleet: the grid only changes when aliens are added or destroyed.
+For the same reason, the leftmost, rightmost and lowest aliens stay so while the fleet
+moves: both fleets keep track of them to check the edges and the bottom of the screen,
+and only look for new ones when one of them is destroyed.
+
+:function: formation(screen_size, alien_size, ship_height, rows=None, columns=None)
+:class: Fleet(Group)
+:class: ArrayFleet()
+"""
+
+from itertools import chain, repeat
+import pygame
+from pygame.sprite import Group
+from alien import Alien
+from collision import SpatialHash, ArrayGrid
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# The formations already computed, indexed by (screen size, alien size, ship height,
+# rows, columns).
+_formations = {}
+
+
+def formation(screen_size, alien_size, ship_height, rows=None, columns=None):
+    """
+    Give the positions of the aliens of a new fleet, computing them only the first time.
+
+    By default, the aliens fill rows spaced by one alien, leaving room above the ship.
+    A number of rows or columns can be asked for instead, to stress the game with
+    larger fleets: the aliens are then brought closer, and even overlap, to fit the
+    same room.
+
+    :param screen_size (int, int): The width and the height of the screen.
+    :param alien_size (int, int): The width and the height of an alien.
+    :param ship_height int: The height of the ship.
+    :param rows int: The number of rows of aliens, as many as fit if None.
+    :param columns int: The number of aliens in a row, as many as fit if None.
+    :var key tuple: The key of the formation.
+    :var positions tuple: The (x, y) of each alien, row by row.
+    :var width int: The width of the room of the fleet.
+    :var height int: The height of the room of the fleet.
+    :var step_x int: The distance between two aliens of a row.
+    :var step_y int: The distance between two rows.
+    :returns tuple: The (x, y) of each alien, row by row.
+    """
+    key = (tuple(screen_size), tuple(alien_size), ship_height, rows, columns)
+    positions = _formations.get(key)
+    if positions is None:
+        screen_width, screen_height = screen_size
+        alien_width, alien_height = alien_size
+        width = screen_width - 2 * alien_width
+        height = screen_height - 3 * alien_height - ship_height
+
+        # Spacing between each alien is equal to one alien width.
+        step_x = 2 * alien_width
+        step_y = 2 * alien_height
+        if columns is None:
+            columns = width // step_x
+        else:
+            step_x = max(1, min(step_x, width // max(columns, 1)))
+        if rows is None:
+            rows = height // step_y
+        else:
+            step_y = max(1, min(step_y, height // max(rows, 1)))
+
+        positions = tuple(
+            (alien_width + step_x * alien_number,
+             alien_height + step_y * row_number)
+            for row_number in range(rows)
+            for alien_number in range(columns))
+        _formations[key] = positions
+    return positions
+
+
+class Fleet(Group):
+    """
+    Manage the fleet as a group of Alien sprites.
+
+    Aliens destroyed or removed are kept in a pool and reused by the next fleets.
+
+    :method: __init__(self, game)
+    :method: add_alien(self, x, y)
+    :method: fill(self, positions)
+    :method: empty(self)
+    :method: update(self, dt)
+    :method: check_edges(self)
+    :method: drop(self, distance)
+    :method: reached_bottom(self)
+    :method: collide_bullets(self, bullets)
+    :method: collide_ship(self, ship)
+    :method: draw(self, surface, alpha=1.0)
+    :method: blit_sequence(self, alpha=1.0)
+    :method: snapshot(self)
+    :method: restore(self, offset, x, prev_x, y)
+    :method: _candidates(self, rect)
+    :method: _touching(self, aliens, rect, mask)
+    :method: _bounds(self)
+    """
+
+    def __init__(self, game):
+        """
+        Initialize an empty fleet.
+
+        :param game AlienInvasion: The current game.
+        :var game AlienInvasion: The current game as an attribute.
+        :var screen_rect Rect: The rectangular dimensions of the screen.
+        :var alien_size (int, int): The width and the height of an alien.
+        :var settings Settings: The settings of the game.
+        :var grid SpatialHash: The aliens indexed by their position in the fleet.
+        :var offset_x float: The horizontal distance covered by the fleet.
+        :var offset_y int: The vertical distance covered by the fleet.
+        :var pool list: The aliens out of the fleet, ready to be reused.
+        :var bounds tuple: The leftmost, rightmost and lowest aliens, None if unknown.
+        :returns Fleet: Generates an instance of Fleet class.
+        """
+        super().__init__()
+        self.game = game
+        self.screen_rect = game.screen.get_rect()
+        self.alien_size = game.assets.image(
+            'images/alien.bmp', scale=game.settings.alien_scale).get_size()
+        self.settings = game.settings
+        self.grid = SpatialHash(self.settings.collision_cell_size)
+        self.offset_x = 0.0
+        self.offset_y = 0
+        self.pool = []
+        self.bounds = None
+
+    def add_alien(self, x, y):
+        """
+        Place an alien at the given position and add it to the fleet.
+
+        The alien is taken from the pool, and only created if the pool is empty.
+
+        :param x int: The horizontal position of the alien.
+        :param y int: The vertical position of the alien.
+        :var alien Alien: The alien added.
+        :returns: None.
+        """
+        alien = self.pool.pop() if self.pool else Alien(self.game)
+        alien.x = float(x)
+        alien.prev_x = alien.x
+        alien.rect.x = x
+        alien.rect.y = y
+        self.add(alien)
+        self.grid.insert(alien, alien.rect.move(
+            -round(self.offset_x), -self.offset_y))
+        self.bounds = None
+
+    def fill(self, positions):
+        """
+        Add an alien at each position of a formation.
+
+        :param positions tuple: The (x, y) of each alien.
+        :returns: None.
+        """
+        for x, y in positions:
+            self.add_alien(x, y)
+
+    def empty(self):
+        """
+        Remove every alien from the fleet and from the grid, keeping them in the pool.
+
+        :returns: None.
+        """
+        self.pool.extend(self.sprites())
+        super().empty()
+        self.grid.clear()
+        self.bounds = None
+        self.offset_x = 0.0
+        self.offset_y = 0
+
+    def update(self, dt):
+        """
+        Move every alien of the fleet.
+
+        :param dt float: The duration of the simulation tick in seconds.
+        :returns: None.
+        """
+        self.offset_x += (self.settings.alien_speed *
+                          self.settings.fleet_direction * dt)
+        super().update(dt)
+
+    def check_edges(self):
+        """
+        Check if the leftmost or the rightmost alien touches an edge of the screen.
+
+        :var bounds tuple: The leftmost, rightmost and lowest aliens.
+        :returns bool: True if the fleet touches an edge, false if not.
+        """
+        bounds = self._bounds()
+        if bounds is None:
+            return False
+        return bounds[0].check_edges() or bounds[1].check_edges()
+
+    def drop(self, distance):
+        """
+        Move the entire fleet down.
+
+        :param distance int: The number of pixels the fleet goes down.
+        :returns: None.
+        """
+        self.offset_y += distance
+        for alien in self.sprites():
+            alien.rect.y += distance
+
+    def reached_bottom(self):
+        """
+        Check if the lowest alien hits the bottom of the screen.
+
+        :var bounds tuple: The leftmost, rightmost and lowest aliens.
+        :returns bool: True if an alien reached the bottom, false if not.
+        """
+        bounds = self._bounds()
+        if bounds is None:
+            return False
+        return bounds[2].rect.bottom >= self.screen_rect.bottom
+
+    def collide_bullets(self, bullets):
+        """
+        Destroy the bullets and the aliens that collide.
+
+        Bullets are checked in the order they were fired, like pygame.sprite.groupcollide,
+        so an alien destroyed by a bullet cannot be hit by the next ones.
+
+        :param bullets BulletPool: The bullets of the ship.
+        :var collisions dict: The aliens hit by each bullet.
+        :var precise bool: True if the masks of the aliens hit by a rectangle are checked.
+        :var hits list: The aliens hit by a bullet.
+        :returns dict: The aliens hit by each bullet.
+        """
+        collisions = {}
+        precise = self.settings.collision_mode == 'mask'
+        for bullet in bullets.sprites():
+            hits = [alien for alien in self._candidates(bullet.rect)
+                    if alien.rect.colliderect(bullet.rect)]
+            if hits and precise:
+                hits = self._touching(hits, bullet.rect, bullets.mask)
+            if hits:
+                for alien in hits:
+                    alien.kill()
+                    self.grid.remove(alien)
+                    self.pool.append(alien)
+                    if self.bounds and alien in self.bounds:
+                        self.bounds = None
+                collisions[bullet] = hits
+                bullet.kill()
+        return collisions
+
+    def collide_ship(self, ship):
+        """
+        Check if any alien hits the ship.
+
+        :param ship Ship: The ship of the player.
+        :var hits list: The aliens whose rectangle overlaps the ship.
+        :returns bool: True if an alien hits the ship, false if not.
+        """
+        hits = [alien for alien in self._candidates(ship.rect)
+                if alien.rect.colliderect(ship.rect)]
+        if hits and self.settings.collision_mode == 'mask':
+            hits = self._touching(hits, ship.rect, ship.mask)
+        return len(hits) > 0
+
+    def draw(self, surface, alpha=1.0):
+        """
+        Draw the aliens between their previous and their current location.
+
+        :param surface Surface: The surface to draw on.
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :returns: None.
+        """
+        surface.blits(self.blit_sequence(alpha), False)
+
+    def blit_sequence(self, alpha=1.0):
+        """
+        Give the images of the aliens and where to draw them.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :returns list: The (image, rect) of each alien.
+        """
+        return [(alien.image, alien.interpolated_rect(alpha))
+                for alien in self.sprites()]
+
+    def snapshot(self):
+        """
+        Give the exact state of the fleet, to restore it later.
+
+        :var aliens list: The aliens of the fleet.
+        :returns tuple: The (x, y) offset of the fleet, and the exact horizontal
+        positions, the previous horizontal positions and the vertical positions of the
+        aliens, in order.
+        """
+        aliens = self.sprites()
+        return ((self.offset_x, self.offset_y),
+                [alien.x for alien in aliens],
+                [alien.prev_x for alien in aliens],
+                [alien.rect.y for alien in aliens])
+
+    def restore(self, offset, x, prev_x, y):
+        """
+        Replace the fleet with the state given by snapshot().
+
+        The aliens are put back in the grid at their position in the fleet, which is
+        their exact position less the offset of the fleet.
+
+        :param offset (float, int): The horizontal and vertical offset of the fleet.
+        :param x list: The exact horizontal positions of the aliens.
+        :param prev_x list: The horizontal positions of the aliens before the last update.
+        :param y list: The vertical positions of the aliens.
+        :var alien Alien: An alien restored.
+        :returns: None.
+        """
+        self.empty()
+        self.offset_x, self.offset_y = offset
+        for alien_x, alien_prev_x, alien_y in zip(x, prev_x, y):
+            alien = self.pool.pop() if self.pool else Alien(self.game)
+            alien.x = alien_x
+            alien.prev_x = alien_prev_x
+            alien.rect.x = alien_x
+            alien.rect.y = alien_y
+            self.add(alien)
+            self.grid.insert(alien, alien.rect.move(
+                round(alien_x - self.offset_x) - alien.rect.x, -self.offset_y))
+
+    def _candidates(self, rect):
+        """
+        Give the aliens near a rectangle of the screen.
+
+        The rectangle is moved into the coordinates of the grid and grown by one pixel
+        on each side to cover the rounding of the positions of the aliens.
+
+        :param rect Rect: The rectangle on the screen.
+        :returns set: The aliens that may overlap the rectangle.
+        """
+        return self.grid.query(rect.move(
+            -round(self.offset_x), -self.offset_y).inflate(2, 2))
+
+    def _touching(self, aliens, rect, mask):
+        """
+        Keep the aliens whose pixels overlap those of a sprite.
+
+        Only the aliens whose rectangle already overlaps the sprite are given, so the
+        masks are compared for a handful of pairs at most.
+
+        :param aliens list: The aliens whose rectangle overlaps the sprite.
+        :param rect Rect: The rectangle of the sprite.
+        :param mask Mask: The mask of the sprite.
+        :returns list: The aliens touching the sprite.
+        """
+        return [alien for alien in aliens
+                if alien.mask.overlap(mask, (rect.x - alien.rect.x,
+                                             rect.y - alien.rect.y)) is not None]
+
+    def _bounds(self):
+        """
+        Give the leftmost, rightmost and lowest aliens, looking for them only if aliens
+        were added or one of them was destroyed.
+
+        :var aliens list: The aliens of the fleet.
+        :returns tuple: The leftmost, rightmost and lowest aliens, None if the fleet is empty.
+        """
+        if self.bounds is None:
+            aliens = self.sprites()
+            if not aliens:
+                return None
+            self.bounds = (min(aliens, key=lambda alien: alien.x),
+                           max(aliens, key=lambda alien: alien.x),
+                           max(aliens, key=lambda alien: alien.rect.y))
+        return self.bounds
+
+
+class ArrayFleet:
+    """
+    Manage the fleet with NumPy arrays of positions and alive flags.
+
+    Every alien shares the same image and size, so moving the fleet, checking its edges,
+    dropping it and checking the bottom are each a single operation on the arrays.
+
+    :method: __init__(self, game, capacity=64)
+    :method: __len__(self)
+    :method: __bool__(self)
+    :method: add_alien(self, x, y)
+    :method: fill(self, positions)
+    :method: empty(self)
+    :method: update(self, dt)
+    :method: check_edges(self)
+    :method: drop(self, distance)
+    :method: reached_bottom(self)
+    :method: collide_bullets(self, bullets)
+    :method: collide_ship(self, ship)
+    :method: draw(self, surface, alpha=1.0)
+    :method: blit_sequence(self, alpha=1.0)
+    :method: snapshot(self)
+    :method: restore(self, offset, x, prev_x, y)
+    :method: _reserve(self, size)
+    :method: _rect_x(self, x)
+    :method: _build_grid(self)
+    :method: _candidates(self, rect)
+    :method: _overlapping(self, rect)
+    :method: _touching(self, hits, rect, mask)
+    :method: _overlapping_many(self, rects)
+    :method: _touching_many(self, owners, hits, rects, mask)
+    :method: _bounds(self)
+    """
+
+    def __init__(self, game, capacity=64):
+        """
+        Initialize an empty fleet.
+
+        :param game AlienInvasion: The current game.
+        :param capacity int: The number of aliens the arrays can hold before growing.
+        :var settings Settings: The settings of the game.
+        :var screen_rect Rect: The rectangular dimensions of the screen.
+        :var image Surface: The image shared by all the aliens.
+        :var mask Mask: The pixels of the image that collide, shared by all the aliens.
+        :var alien_size (int, int): The width and the height of an alien.
+        :var x ndarray: The exact horizontal positions of the aliens.
+        :var prev_x ndarray: The horizontal positions of the aliens before the last update.
+        :var y ndarray: The vertical positions of the aliens.
+        :var alive ndarray: True for the aliens still in the fleet.
+        :var count int: The number of slots used in the arrays.
+        :var alive_count int: The number of aliens still in the fleet.
+        :var grid ArrayGrid: The aliens indexed by their position in the fleet.
+        :var grid_dirty bool: True if aliens were added since the grid was built.
+        :var offset_x float: The horizontal distance covered by the fleet.
+        :var offset_y int: The vertical distance covered by the fleet.
+        :var template tuple: The last formation added with fill().
+        :var template_x ndarray: The horizontal positions of the template.
+        :var template_y ndarray: The vertical positions of the template.
+        :var bounds ndarray: The indices of the leftmost, rightmost and lowest aliens,
+        None if unknown.
+        :returns ArrayFleet: Generates an instance of ArrayFleet class.
+        """
+        if np is None:
+            raise ImportError("The 'numpy' fleet backend requires NumPy.")
+        self.settings = game.settings
+        self.screen_rect = game.screen.get_rect()
+        self.image = game.assets.image('images/alien.bmp',
+                                       scale=game.settings.alien_scale)
+        self.mask = game.assets.mask('images/alien.bmp',
+                                     scale=game.settings.alien_scale)
+        self.alien_size = self.image.get_size()
+
+        self.x = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.y = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.count = 0
+        self.alive_count = 0
+
+        # A cell is as large as an alien, the smallest the grid allows: a search costs
+        # one lookup per row of cells, so small cells only trim the candidates.
+        self.grid = ArrayGrid(max(self.alien_size))
+        self.grid_dirty = True
+        self.offset_x = 0.0
+        self.offset_y = 0
+        self.template = None
+        self.template_x = None
+        self.template_y = None
+        self.bounds = None
+
+    def __len__(self):
+        """
+        Give the number of aliens still in the fleet.
+
+        :returns int: The number of aliens alive.
+        """
+        return self.alive_count
+
+    def __bool__(self):
+        """
+        Tell if any alien is still in the fleet.
+
+        :returns bool: True if an alien is alive, false if not.
+        """
+        return self.alive_count > 0
+
+    def add_alien(self, x, y):
+        """
+        Add an alien at the given position, growing the arrays if they are full.
+
+        :param x int: The horizontal position of the alien.
+        :param y int: The vertical position of the alien.
+        :returns: None.
+        """
+        self._reserve(self.count + 1)
+        self.x[self.count] = x
+        self.prev_x[self.count] = x
+        self.y[self.count] = y
+        self.alive[self.count] = True
+        self.count += 1
+        self.alive_count += 1
+        self.grid_dirty = True
+        self.bounds = None
+
+    def fill(self, positions):
+        """
+        Add an alien at each position of a formation in one operation per array.
+
+        The positions of the formation are turned into arrays only the first time, and
+        the slots of a fleet entirely destroyed are reused by the next one.
+
+        :param positions tuple: The (x, y) of each alien.
+        :var start int: The first slot of the aliens added.
+        :var end int: The slot after the last alien added.
+        :returns: None.
+        """
+        if not self.alive_count:
+            # Reclaim the slots of the dead aliens.
+            self.count = 0
+        if positions is not self.template:
+            self.template = positions
+            self.template_x = np.array([x for x, _ in positions], dtype=float)
+            self.template_y = np.array([y for _, y in positions],
+                                       dtype=np.int64)
+
+        start = self.count
+        end = start + len(positions)
+        self._reserve(end)
+        self.x[start:end] = self.template_x
+        self.prev_x[start:end] = self.template_x
+        self.y[start:end] = self.template_y
+        self.alive[start:end] = True
+        self.count = end
+        self.alive_count += len(positions)
+        self.grid_dirty = True
+        self.bounds = None
+
+    def empty(self):
+        """
+        Remove every alien from the fleet, keeping the arrays allocated.
+
+        :returns: None.
+        """
+        self.alive[:self.count] = False
+        self.count = 0
+        self.alive_count = 0
+        self.grid_dirty = True
+        self.bounds = None
+        self.offset_x = 0.0
+        self.offset_y = 0
+
+    def update(self, dt):
+        """
+        Move the whole fleet horizontally.
+
+        :param dt float: The duration of the simulation tick in seconds.
+        :var speed float: The distance covered by the fleet during the tick.
+        :returns: None.
+        """
+        n = self.count
+        speed = self.settings.alien_speed * self.settings.fleet_direction * dt
+        self.prev_x[:n] = self.x[:n]
+        self.x[:n] += speed
+        self.offset_x += speed
+
+    def check_edges(self):
+        """
+        Check if the leftmost or the rightmost alien touches an edge of the screen.
+
+        :var bounds ndarray: The indices of the leftmost, rightmost and lowest aliens.
+        :var left ndarray: The left sides of the leftmost and the rightmost aliens.
+        :returns bool: True if the fleet touches an edge, false if not.
+        """
+        bounds = self._bounds()
+        if bounds is None:
+            return False
+        left = self._rect_x(self.x[bounds[:2]])
+        return bool(left[1] + self.alien_size[0] >= self.screen_rect.right
+                    or left[0] <= 0)
+
+    def drop(self, distance):
+        """
+        Move the entire fleet down.
+
+        :param distance int: The number of pixels the fleet goes down.
+        :returns: None.
+        """
+        self.y[:self.count] += distance
+        self.offset_y += distance
+
+    def reached_bottom(self):
+        """
+        Check if the lowest alien hits the bottom of the screen.
+
+        :var bounds ndarray: The indices of the leftmost, rightmost and lowest aliens.
+        :returns bool: True if an alien reached the bottom, false if not.
+        """
+        bounds = self._bounds()
+        if bounds is None:
+            return False
+        return bool(self.y[bounds[2]] + self.alien_size[1] >=
+                    self.screen_rect.bottom)
+
+    def collide_bullets(self, bullets):
+        """
+        Destroy the bullets and the aliens that collide.
+
+        Bullets are checked in the order they were fired, like pygame.sprite.groupcollide,
+        so an alien destroyed by a bullet cannot be hit by the next ones: each alien goes
+        to the first bullet touching it. Every bullet is tested in the same array pass.
+
+        :param bullets BulletPool: The bullets of the ship.
+        :var sprites list: The bullets in flight, in the order they were fired.
+        :var rects ndarray: The left, top, width and height of each bullet.
+        :var owners ndarray: The bullet of each pair of a bullet and an alien.
+        :var hits ndarray: The alien of each pair of a bullet and an alien.
+        :var first ndarray: True for the pairs of the first bullet touching each alien.
+        :var starts ndarray: The positions in the pairs where each bullet starts.
+        :returns dict: The indices of the aliens hit by each bullet.
+        """
+        collisions = {}
+        sprites = bullets.sprites()
+        if not self.alive_count or not sprites:
+            return collisions
+        rects = np.fromiter(chain.from_iterable(bullet.rect for bullet in sprites),
+                            dtype=np.int64, count=4 * len(sprites)).reshape(-1, 4)
+        owners, hits = self._overlapping_many(rects)
+        if len(hits) and self.settings.collision_mode == 'mask':
+            touching = self._touching_many(owners, hits, rects, bullets.mask)
+            owners, hits = owners[touching], hits[touching]
+        if not len(hits):
+            return collisions
+        # The pairs are sorted by bullet, so a stable sort by alien puts the first
+        # bullet touching each alien ahead of the others.
+        order = np.argsort(hits, kind='stable')
+        sorted_hits = hits[order]
+        first = np.zeros(len(hits), dtype=bool)
+        first[order[np.concatenate(
+            ([True], sorted_hits[1:] != sorted_hits[:-1]))]] = True
+        owners, hits = owners[first], hits[first]
+        self.alive[hits] = False
+        self.alive_count -= len(hits)
+        if self.bounds is not None and not self.alive[self.bounds].all():
+            self.bounds = None
+        starts = np.flatnonzero(np.concatenate(
+            ([True], owners[1:] != owners[:-1])))
+        for owner, aliens in zip(owners[starts].tolist(),
+                                 np.split(hits, starts[1:])):
+            bullet = sprites[owner]
+            collisions[bullet] = list(aliens)
+            bullet.kill()
+        return collisions
+
+    def collide_ship(self, ship):
+        """
+        Check if any alien hits the ship.
+
+        :param ship Ship: The ship of the player.
+        :var hits ndarray: The indices of the aliens whose rectangle overlaps the ship.
+        :returns bool: True if an alien hits the ship, false if not.
+        """
+        hits = self._overlapping(ship.rect)
+        if len(hits) and self.settings.collision_mode == 'mask':
+            hits = self._touching(hits, ship.rect, ship.mask)
+        return len(hits) > 0
+
+    def draw(self, surface, alpha=1.0):
+        """
+        Draw the aliens between their previous and their current location.
+
+        :param surface Surface: The surface to draw on.
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :returns: None.
+        """
+        surface.blits(self.blit_sequence(alpha), False)
+
+    def blit_sequence(self, alpha=1.0):
+        """
+        Give the image of the aliens and where to draw each of them.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :var alive ndarray: The indices of the aliens alive.
+        :var x ndarray: The interpolated horizontal positions of the aliens alive.
+        :var width int: The width of an alien.
+        :var height int: The height of an alien.
+        :returns list: The (image, rect) of each alien.
+        """
+        alive = np.flatnonzero(self.alive[:self.count])
+        x = self.prev_x[alive]
+        x = self._rect_x(x + (self.x[alive] - x) * alpha)
+        width, height = self.alien_size
+        # Build the rectangles and their pairs in C: a Rect is not tracked by the
+        # garbage collector and is blitted faster than a tuple.
+        return list(zip(repeat(self.image),
+                        map(pygame.Rect, x.tolist(), self.y[alive].tolist(),
+                            repeat(width), repeat(height))))
+
+    def snapshot(self):
+        """
+        Give the exact state of the fleet, to restore it later.
+
+        :var alive ndarray: True for the aliens still in the fleet.
+        :returns tuple: The (x, y) offset of the fleet, and the exact horizontal
+        positions, the previous horizontal positions and the vertical positions of the
+        aliens alive, in order.
+        """
+        alive = self.alive[:self.count]
+        return ((self.offset_x, self.offset_y),
+                self.x[:self.count][alive].tolist(),
+                self.prev_x[:self.count][alive].tolist(),
+                self.y[:self.count][alive].tolist())
+
+    def restore(self, offset, x, prev_x, y):
+        """
+        Replace the fleet with the state given by snapshot(), the aliens alive first.
+
+        :param offset (float, int): The horizontal and vertical offset of the fleet.
+        :param x list: The exact horizontal positions of the aliens.
+        :param prev_x list: The horizontal positions of the aliens before the last update.
+        :param y list: The vertical positions of the aliens.
+        :var n int: The number of aliens restored.
+        :returns: None.
+        """
+        self.empty()
+        self.offset_x, self.offset_y = offset
+        n = len(x)
+        self._reserve(n)
+        self.x[:n] = x
+        self.prev_x[:n] = prev_x
+        self.y[:n] = y
+        self.alive[:n] = True
+        self.count = n
+        self.alive_count = n
+
+    def _reserve(self, size):
+        """
+        Grow the arrays, doubling their capacity, until they can hold a number of aliens.
+
+        :param size int: The number of aliens the arrays must hold.
+        :var capacity int: The new capacity of the arrays.
+        :returns: None.
+        """
+        if size <= len(self.x):
+            return
+        capacity = len(self.x)
+        while capacity < size:
+            capacity *= 2
+        self.x = np.resize(self.x, capacity)
+        self.prev_x = np.resize(self.prev_x, capacity)
+        self.y = np.resize(self.y, capacity)
+        self.alive = np.resize(self.alive, capacity)
+
+    def _rect_x(self, x):
+        """
+        Round exact positions the way a pygame Rect does, half away from zero.
+
+        :param x ndarray: The exact horizontal positions.
+        :returns ndarray: The positions as integers.
+        """
+        return np.trunc(x + np.copysign(0.5, x)).astype(np.int64)
+
+    def _build_grid(self):
+        """
+        Index the aliens in the grid again if aliens were added since it was built.
+
+        :returns: None.
+        """
+        if self.grid_dirty:
+            n = self.count
+            self.grid.build(self.x[:n] - self.offset_x,
+                            self.y[:n] - self.offset_y)
+            self.grid_dirty = False
+
+    def _candidates(self, rect):
+        """
+        Give the indices of the aliens near a rectangle of the screen.
+
+        The grid is rebuilt only when aliens were added. The rectangle is moved into the
+        coordinates of the grid and grown by one pixel on each side to cover the rounding
+        of the positions of the aliens.
+
+        :param rect Rect: The rectangle on the screen.
+        :returns ndarray: The indices of the aliens that may overlap the rectangle.
+        """
+        self._build_grid()
+        return self.grid.query(rect.move(
+            -round(self.offset_x), -self.offset_y).inflate(2, 2))
+
+    def _overlapping(self, rect):
+        """
+        Find the aliens alive that overlap a rectangle.
+
+        :param rect Rect: The rectangle to check.
+        :var candidates ndarray: The indices of the aliens near the rectangle.
+        :var left ndarray: The left sides of the candidates.
+        :var top ndarray: The top sides of the candidates.
+        :returns ndarray: The indices of the aliens overlapping the rectangle.
+        """
+        candidates = self._candidates(rect)
+        width, height = self.alien_size
+        left = self._rect_x(self.x[candidates])
+        top = self.y[candidates]
+        return candidates[self.alive[candidates] &
+                          (left < rect.right) & (left + width > rect.left) &
+                          (top < rect.bottom) & (top + height > rect.top)]
+
+    def _touching(self, hits, rect, mask):
+        """
+        Keep the aliens whose pixels overlap those of a sprite.
+
+        Only the aliens whose rectangle already overlaps the sprite are given, so the
+        shared mask of the aliens is compared for a handful of pairs at most.
+
+        :param hits ndarray: The indices of the aliens whose rectangle overlaps the sprite.
+        :param rect Rect: The rectangle of the sprite.
+        :param mask Mask: The mask of the sprite.
+        :var left ndarray: The left sides of the aliens.
+        :var top ndarray: The top sides of the aliens.
+        :returns ndarray: The indices of the aliens touching the sprite.
+        """
+        left = self._rect_x(self.x[hits])
+        top = self.y[hits]
+        return hits[[self.mask.overlap(mask, (rect.x - int(x), rect.y - int(y)))
+                     is not None for x, y in zip(left, top)]]
+
+    def _overlapping_many(self, rects):
+        """
+        Find the aliens alive that overlap each of several rectangles.
+
+        :param rects ndarray: The left, top, width and height of each rectangle.
+        :var left ndarray: The left sides of the rectangles.
+        :var top ndarray: The top sides of the rectangles.
+        :var right ndarray: The right sides of the rectangles.
+        :var bottom ndarray: The bottom sides of the rectangles.
+        :var owners ndarray: The rectangle of each candidate pair.
+        :var candidates ndarray: The alien of each candidate pair.
+        :var x ndarray: The left sides of the candidates.
+        :var y ndarray: The top sides of the candidates.
+        :returns (ndarray, ndarray): The rectangle and the alien of each overlapping pair,
+        sorted by rectangle.
+        """
+        left, top = rects[:, 0], rects[:, 1]
+        right, bottom = left + rects[:, 2], top + rects[:, 3]
+        self._build_grid()
+        # Same move and inflate as _candidates, on every rectangle at once.
+        shift_x, shift_y = round(self.offset_x), self.offset_y
+        owners, candidates = self.grid.query_many(
+            left - shift_x - 1, top - shift_y - 1,
+            right - shift_x + 1, bottom - shift_y + 1)
+        width, height = self.alien_size
+        x = self._rect_x(self.x[candidates])
+        y = self.y[candidates]
+        overlap = (self.alive[candidates] &
+                   (x < right[owners]) & (x + width > left[owners]) &
+                   (y < bottom[owners]) & (y + height > top[owners]))
+        return owners[overlap], candidates[overlap]
+
+    def _touching_many(self, owners, hits, rects, mask):
+        """
+        Tell which pairs of a rectangle and an alien whose rectangles overlap also have
+        pixels overlapping.
+
+        :param owners ndarray: The rectangle of each pair.
+        :param hits ndarray: The alien of each pair.
+        :param rects ndarray: The left, top, width and height of each rectangle.
+        :param mask Mask: The mask shared by the rectangles.
+        :var dx list: The horizontal offsets of the rectangles from the aliens.
+        :var dy list: The vertical offsets of the rectangles from the aliens.
+        :returns ndarray: True for the pairs touching.
+        """
+        dx = (rects[owners, 0] - self._rect_x(self.x[hits])).tolist()
+        dy = (rects[owners, 1] - self.y[hits]).tolist()
+        overlap = self.mask.overlap
+        return np.array([overlap(mask, offset) is not None
+                         for offset in zip(dx, dy)], dtype=bool)
+
+    def _bounds(self):
+        """
+        Give the leftmost, rightmost and lowest aliens, looking for them only if aliens
+        were added or one of them was destroyed.
+
+        :var alive ndarray: The indices of the aliens alive.
+        :returns ndarray: The indices of the leftmost, rightmost and lowest aliens, None
+        if the fleet is empty.
+        """
+        if self.bounds is None:
+            if not self.alive_count:
+                return None
+            alive = np.flatnonzero(self.alive[:self.count])
+            x = self.x[alive]
+            self.bounds = alive[[x.argmin(), x.argmax(),
+                                 self.y[alive].argmax()]]
+        return self.bounds
@@ -0,0 +1,69 @@
+"""
+Manage the states of the game and the timed transitions between them.
+
+:class: GameState()
+"""
+
+
+class GameState:
+    """
+    Track the current state of the game and the time left before its next state.
+
+    :method: __init__(self)
+    :method: set(self, state, duration=0.0, next_state=None)
+    :method: update(self, dt)
+    """
+
+    MENU = 'menu'
+    PLAYING = 'playing'
+    RESPAWNING = 'respawning'
+    LEVEL_TRANSITION = 'level_transition'
+    GAME_OVER = 'game_over'
+
+    # The states during which a game is in progress.
+    ACTIVE = (PLAYING, RESPAWNING, LEVEL_TRANSITION)
+
+    # Every state, by its number in the binary files and streams.
+    STATES = (MENU, PLAYING, RESPAWNING, LEVEL_TRANSITION, GAME_OVER)
+
+    def __init__(self):
+        """
+        Initialize the state machine on the menu.
+
+        :var current str: The current state.
+        :var remaining float: The seconds left before the next state, for a timed state.
+        :var next_state str: The state following the current one when its time is up.
+        :returns GameState: Generates an instance of GameState class.
+        """
+        self.current = self.MENU
+        self.remaining = 0.0
+        self.next_state = None
+
+    def set(self, state, duration=0.0, next_state=None):
+        """
+        Enter a state, for a given duration if a next state is given.
+
+        :param state str: The state to enter.
+        :param duration float: The seconds to spend in the state.
+        :param next_state str: The state entered when the duration is over, None to stay.
+        :returns: None.
+        """
+        self.current = state
+        self.remaining = duration
+        self.next_state = next_state
+
+    def update(self, dt):
+        """
+        Count down the time of a timed state and enter the next state when it is over.
+
+        :param dt float: The duration of the simulation tick in seconds.
+        :returns str: The state left if a transition happened, None if not.
+        """
+        if self.next_state is None:
+            return None
+        self.remaining -= dt
+        if self.remaining > 1e-9:
+            return None
+        left = self.current
+        self.set(self.next_state)
+        return left
@@ -4,6 +4,8 @@ Manage and tracks the statistics of the game.
 :class: GameStats()
 """
 
+from game_state import GameState
+
 
 class GameStats:
     """
@@ -11,6 +13,8 @@ class GameStats:
 
     :method: __init__(self, game)
     :method: reset_stats(self)
+    :method: game_active(self)
+    :method: session(self)
     """
 
     def __init__(self, game):
@@ -19,17 +23,26 @@ class GameStats:
 
         :param game AlienInvasion: The current game.
         :var settings Settings: The settings of the game.
-        :var game_active bool: True if the game is still active, false if not. 
-        By default, false because the game waits for the player to click the play button.
+        :var state GameState: The state of the game. By default, the menu because the
+        game waits for the player to click the play button.
         :var high_score int: The highest score of the Alien Invasion in this computer. 
         High score should never be reset.
         :returns GameStats: Generates an instance of GameStats class.
         """
         self.settings = game.settings
         self.reset_stats()
-        self.game_active = False
+        self.state = GameState()
         self.high_score = 0
 
+    @property
+    def game_active(self):
+        """
+        Tell if a game is in progress, including the pauses between lives and levels.
+
+        :returns bool: True if the game is still active, false if not.
+        """
+        return self.state.current in GameState.ACTIVE
+
     def reset_stats(self):
         """
         Reset all statistics when a new game is created.
@@ -37,8 +50,26 @@ class GameStats:
         :var ships_left int: The number of lives of the ship.
         :var score int: The score of the current game. Default is at 0 because we begin the game.
         :var level int: The level of the game. By default, it is at 1 (for the first level).
+        :var shots int: The number of bullets fired during the game.
+        :var hits int: The number of bullets that hit an alien during the game.
+        :var ticks int: The number of simulation ticks the game was active.
         :returns: None.
         """
         self.ships_left = self.settings.ship_limit
         self.score = 0
         self.level = 1
+        self.shots = 0
+        self.hits = 0
+        self.ticks = 0
+
+    def session(self):
+        """
+        Give the stats of the current game, to be kept once it is over.
+
+        :returns dict: The score, the level reached, the accuracy and the time played in
+        seconds.
+        """
+        return {'score': self.score,
+                'level': self.level,
+                'accuracy': self.hits / self.shots if self.shots else 0.0,
+                'time_played': self.ticks / self.settings.tick_rate}
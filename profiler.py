@@ -0,0 +1,231 @@
+"""
+Measure the time spent in each phase of the frames of the game.
+
+:class: Profiler()
+:class: ProfilerOverlay()
+"""
+
+import csv
+import json
+from collections import deque
+from time import perf_counter, perf_counter_ns
+import pygame.font
+
+
+class Profiler:
+    """
+    Accumulate the time of each phase of a frame and keep rolling averages.
+
+    A phase is timed by taking perf_counter_ns() before it and calling record() after
+    it. A phase can be recorded several times in a frame, once per simulation tick.
+
+    :method: __init__(self, window=120, trace=False)
+    :method: record(self, phase, start)
+    :method: take(self)
+    :method: merge(self, phases)
+    :method: end_frame(self, **counters)
+    :method: averages(self)
+    :method: export(self, path)
+    """
+
+    PHASES = ('events', 'ship', 'bullets', 'collisions', 'aliens', 'draw',
+              'flip')
+
+    def __init__(self, window=120, trace=False):
+        """
+        Initialize a profiler without any frame.
+
+        :param window int: The number of frames of the rolling averages.
+        :param trace bool: True to keep every frame for export(), false if not.
+        :var current dict: The nanoseconds spent in each phase of the current frame.
+        :var history deque: The last frames, as dictionaries of milliseconds and counters.
+        :var totals dict: The sum of each value over the frames of history.
+        :var frames list: Every frame if tracing, else None.
+        :var frame_count int: The number of frames ended.
+        :returns Profiler: Generates an instance of Profiler class.
+        """
+        self.current = dict.fromkeys(self.PHASES, 0)
+        self.history = deque(maxlen=window)
+        self.totals = {}
+        self.frames = [] if trace else None
+        self.frame_count = 0
+
+    def record(self, phase, start):
+        """
+        Add the time elapsed since start to a phase of the current frame.
+
+        :param phase str: The name of the phase.
+        :param start int: The value of perf_counter_ns() when the phase started.
+        :returns: None.
+        """
+        self.current[phase] += perf_counter_ns() - start
+
+    def take(self):
+        """
+        Give the time of each phase recorded since the last call, and start again.
+
+        :var phases dict: The nanoseconds spent in each phase.
+        :returns dict: The nanoseconds spent in each phase.
+        """
+        phases = self.current
+        self.current = dict.fromkeys(self.PHASES, 0)
+        return phases
+
+    def merge(self, phases):
+        """
+        Add the phases recorded by another profiler to the current frame.
+
+        :param phases dict: The nanoseconds spent in each phase, as given by take().
+        :returns: None.
+        """
+        for phase, duration in phases.items():
+            self.current[phase] += duration
+
+    def end_frame(self, **counters):
+        """
+        Close the current frame and start a new one.
+
+        :param counters dict: The counters of the frame, such as entity counts.
+        :var frame dict: The milliseconds of each phase and the counters of the frame.
+        :var oldest dict: The frame leaving the rolling window.
+        :returns: None.
+        """
+        frame = {'frame': self.frame_count}
+        for phase, duration in self.current.items():
+            frame[phase] = duration / 1e6
+            self.current[phase] = 0
+        frame['total'] = sum(frame[phase] for phase in self.PHASES)
+        frame.update(counters)
+
+        if len(self.history) == self.history.maxlen:
+            oldest = self.history[0]
+            for key, value in oldest.items():
+                self.totals[key] -= value
+        self.history.append(frame)
+        for key, value in frame.items():
+            self.totals[key] = self.totals.get(key, 0) + value
+
+        if self.frames is not None:
+            self.frames.append(frame)
+        self.frame_count += 1
+
+    def averages(self):
+        """
+        Give the rolling averages of the phases and the counters.
+
+        :returns dict: The average of each value over the last frames.
+        """
+        if not self.history:
+            return {}
+        return {key: value / len(self.history)
+                for key, value in self.totals.items() if key != 'frame'}
+
+    def export(self, path):
+        """
+        Write the traced frames to a CSV file, or a JSON file if the path ends with .json.
+
+        :param path str: The path of the trace file.
+        :var frames list: The frames to write.
+        :returns: None.
+        """
+        frames = self.frames if self.frames is not None else list(self.history)
+        if path.endswith('.json'):
+            with open(path, 'w') as file:
+                json.dump({'phases': self.PHASES, 'frames': frames}, file)
+            return
+
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(
+                file, fieldnames=list(frames[0]) if frames else ['frame'])
+            writer.writeheader()
+            writer.writerows(frames)
+
+
+class ProfilerOverlay:
+    """
+    Show the rolling averages of the profiler and the input latency under the lives of
+    the scoreboard.
+
+    :method: __init__(self, game, refresh=0.25)
+    :method: toggle(self)
+    :method: draw(self)
+    :method: blit_sequence(self)
+    :method: _prep_lines(self)
+    """
+
+    def __init__(self, game, refresh=0.25):
+        """
+        Initialize a hidden overlay.
+
+        :param game AlienInvasion: The current game.
+        :param refresh float: The number of seconds between two updates of the text.
+        :var visible bool: True if the overlay is shown, false if not.
+        :var images list: The (image, rect) of each line of the overlay.
+        :var refreshed float: The time of the last update of the text.
+        :returns ProfilerOverlay: Generates an instance of ProfilerOverlay class.
+        """
+        self.game = game
+        self.screen = game.screen
+        self.refresh = refresh
+        self.visible = False
+        self.text_color = (200, 0, 0)
+        self.font = pygame.font.SysFont(None, 22)
+        self.images = []
+        self.refreshed = None
+
+    def toggle(self):
+        """
+        Show the overlay if it is hidden, hide it if it is shown.
+
+        :returns: None.
+        """
+        self.visible = not self.visible
+        self.refreshed = None
+
+    def draw(self):
+        """
+        Draw the overlay if it is shown.
+
+        :returns: None.
+        """
+        self.screen.blits(self.blit_sequence(), False)
+
+    def blit_sequence(self):
+        """
+        Give the images of the lines of the overlay and where to draw them.
+
+        :returns list: The (image, rect) of each line, empty if the overlay is hidden.
+        """
+        if not self.visible:
+            return []
+        if self.refreshed is None or perf_counter() - self.refreshed > self.refresh:
+            self._prep_lines()
+        return self.images
+
+    def _prep_lines(self):
+        """
+        Render the rolling averages of the profiler and the input latency percentiles.
+
+        :var averages dict: The averages of the profiler.
+        :var latency LatencyTracker: The delays between the inputs and their frames.
+        :var lines list: The text of each line.
+        :var top int: The vertical position of the next line.
+        :returns: None.
+        """
+        averages = self.game.profiler.averages()
+        lines = [f"{phase:<10} {averages.get(phase, 0):6.2f} ms"
+                 for phase in Profiler.PHASES]
+        lines.append(f"total      {averages.get('total', 0):6.2f} ms")
+        for counter in ('bullet_count', 'alien_count', 'text_renders'):
+            lines.append(f"{counter:<12} {averages.get(counter, 0):7.1f}")
+        latency = self.game.latency
+        lines.append(f"input p50  {latency.percentile(0.50):6.0f} ms")
+        lines.append(f"input p95  {latency.percentile(0.95):6.0f} ms")
+
+        self.images = []
+        top = 80
+        for line in lines:
+            image = self.font.render(line, True, self.text_color)
+            self.images.append((image, image.get_rect(left=10, top=top)))
+            top += image.get_height()
+        self.refreshed = perf_counter()
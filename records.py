@@ -0,0 +1,162 @@
+"""
+Keep the high score and the stats of the last games on disk, away from the frame thread.
+
+The file is read once when the game starts. Afterwards the game only hands copies of the
+records to a writer thread, which keeps the most recent one and replaces the file
+atomically: the records are written to a temporary file in the same directory, flushed
+to the disk, then renamed over the previous file. A crash at any time leaves either the
+previous file or the new one, never a file written halfway.
+
+:class: RecordStore()
+"""
+
+import json
+import os
+import queue
+import tempfile
+import threading
+
+
+class RecordStore:
+    """
+    Load the records once and save them on a writer thread.
+
+    :method: __init__(self, path, max_sessions=100, batch_delay=0.5)
+    :method: add_session(self, session)
+    :method: save(self)
+    :method: close(self)
+    :method: _load(self)
+    :method: _write_loop(self)
+    :method: _write(self, records)
+    """
+
+    def __init__(self, path, max_sessions=100, batch_delay=0.5):
+        """
+        Load the records and start the writer thread.
+
+        :param path str: The JSON file of the records.
+        :param max_sessions int: The number of games whose stats are kept.
+        :param batch_delay float: The time in seconds the writer waits for more records
+        before writing, so a burst of saves only writes the file once.
+        :var high_score int: The highest score ever reached, 0 if no file was found.
+        :var sessions list: The stats of the last games, the oldest first.
+        :var pending SimpleQueue: The records waiting to be written, None to stop.
+        :var closing Event: Set to write the pending records without waiting.
+        :var writes int: The number of times the file was written.
+        :var writer Thread: The thread writing the file.
+        :returns RecordStore: Generates an instance of RecordStore class.
+        """
+        self.path = path
+        self.max_sessions = max_sessions
+        self.batch_delay = batch_delay
+        self.high_score = 0
+        self.sessions = []
+        self._load()
+
+        self.pending = queue.SimpleQueue()
+        self.closing = threading.Event()
+        self.writes = 0
+        self.writer = threading.Thread(target=self._write_loop, name='records',
+                                       daemon=True)
+        self.writer.start()
+
+    def add_session(self, session):
+        """
+        Keep the stats of a game and save the records.
+
+        :param session dict: The stats of the game, JSON serializable.
+        :returns: None.
+        """
+        self.sessions.append(session)
+        del self.sessions[:-self.max_sessions]
+        self.save()
+
+    def save(self):
+        """
+        Hand a copy of the records to the writer thread, without touching the disk.
+
+        :returns: None.
+        """
+        self.pending.put({'high_score': self.high_score,
+                          'sessions': list(self.sessions)})
+
+    def close(self):
+        """
+        Write the records still pending and stop the writer thread.
+
+        :returns: None.
+        """
+        self.closing.set()
+        self.pending.put(None)
+        self.writer.join()
+
+    def _load(self):
+        """
+        Read the records, keeping the defaults if the file is missing or unreadable.
+
+        :var records dict: The content of the file.
+        :returns: None.
+        """
+        try:
+            with open(self.path) as file:
+                records = json.load(file)
+            self.high_score = int(records.get('high_score', 0))
+            self.sessions = list(records.get('sessions', []))[-self.max_sessions:]
+        except (OSError, ValueError, TypeError, AttributeError):
+            # A missing or damaged file only costs the records, not the game.
+            self.high_score = 0
+            self.sessions = []
+
+    def _write_loop(self):
+        """
+        Write the most recent records handed over until the store is closed.
+
+        :var records dict: The records to write, None once the store is closed.
+        :var newer dict: Records handed over while waiting, None once the store is closed.
+        :var closed bool: True if the store was closed while waiting.
+        :returns: None.
+        """
+        while True:
+            records = self.pending.get()
+            if records is None:
+                return
+            # Let the saves following closely pile up, then only write the last one.
+            self.closing.wait(self.batch_delay)
+            closed = False
+            while not self.pending.empty():
+                newer = self.pending.get()
+                if newer is None:
+                    closed = True
+                else:
+                    records = newer
+            try:
+                self._write(records)
+            except OSError:
+                # Keep the game running, the next save tries again.
+                pass
+            if closed:
+                return
+
+    def _write(self, records):
+        """
+        Replace the file with the records, atomically.
+
+        :param records dict: The records to write.
+        :var directory str: The directory of the file, where the temporary file is made.
+        :var descriptor int: The descriptor of the temporary file.
+        :var temporary str: The path of the temporary file.
+        :returns: None.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary = tempfile.mkstemp(
+            dir=directory, prefix='.' + os.path.basename(self.path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w') as file:
+                json.dump(records, file, indent=1)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.writes += 1
@@ -0,0 +1,237 @@
+"""
+Draw the frames of the game from a single sequence of blits.
+
+:function: blit_all(surface, sequence)
+:class: DirtyRenderer()
+:class: ScaledPresenter()
+"""
+
+import pygame
+
+
+def blit_all(surface, sequence):
+    """
+    Draw a sequence of images in one call, with fblits() if pygame provides it.
+
+    :param surface Surface: The surface to draw on.
+    :param sequence list: The (image, rect or (x, y)) to draw, in drawing order.
+    :var fblits method: The blits of pygame-ce that returns no rectangle, or None.
+    :returns: None.
+    """
+    fblits = getattr(surface, 'fblits', None)
+    if fblits is not None:
+        fblits(sequence)
+    else:
+        surface.blits(sequence, False)
+
+
+class DirtyRenderer:
+    """
+    Compare the blits of a frame with the ones of the previous frame and redraw only
+    the regions where they differ.
+
+    :method: __init__(self, screen, bg_color, full_threshold=0.5)
+    :method: invalidate(self)
+    :method: render(self, sequence)
+    :method: stats(self)
+    :method: _redraw(self, rects, blits)
+    """
+
+    def __init__(self, screen, bg_color, full_threshold=0.5):
+        """
+        Initialize the renderer, the first frame being drawn entirely.
+
+        :param screen Surface: The surface to draw on.
+        :param bg_color (int, int, int): The color of the background.
+        :param full_threshold float: The fraction of the screen above which a dirty frame
+        is drawn entirely.
+        :var screen_rect Rect: The rectangular dimensions of the screen.
+        :var previous list: The (image, rect) blitted during the previous frame.
+        :var needs_full bool: True if the next frame has to be drawn entirely.
+        :var frames int: The number of frames rendered.
+        :var total_area int: The number of pixels updated since the beginning.
+        :var last_rects int: The number of dirty rectangles of the last frame.
+        :var last_area int: The number of pixels updated during the last frame.
+        :returns DirtyRenderer: Generates an instance of DirtyRenderer class.
+        """
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.bg_color = bg_color
+        self.full_threshold = full_threshold
+        self.previous = []
+        self.needs_full = True
+
+        self.frames = 0
+        self.total_area = 0
+        self.last_rects = 0
+        self.last_area = 0
+
+    def invalidate(self):
+        """
+        Draw the whole next frame, for instance after the window was uncovered.
+
+        :returns: None.
+        """
+        self.needs_full = True
+
+    def render(self, sequence):
+        """
+        Draw a frame and give the regions of the screen that changed.
+
+        An image is unchanged if the same surface is blitted at the same place as in the
+        previous frame. The images blitted must not be modified once blitted.
+
+        :param sequence list: The (image, rect or (x, y)) to blit, in drawing order.
+        :var blits list: The (image, Rect) of the frame.
+        :var old dict: The number of each (image, rect) in the previous frame.
+        :var rects list: The regions covered by an image that appeared or disappeared.
+        :var area int: The number of pixels of the dirty regions.
+        :returns list: The dirty rectangles to push with pygame.display.update().
+        """
+        blits = [(image, pygame.Rect(position[0], position[1],
+                                     *image.get_size()))
+                 for image, position in sequence]
+
+        rects = []
+        area = 0
+        if not self.needs_full:
+            old = {}
+            for image, rect in self.previous:
+                key = (id(image), tuple(rect))
+                old[key] = old.get(key, 0) + 1
+            for image, rect in blits:
+                key = (id(image), tuple(rect))
+                if old.get(key):
+                    old[key] -= 1
+                else:
+                    rects.append(rect)
+            for image, rect in self.previous:
+                key = (id(image), tuple(rect))
+                if old.get(key):
+                    old[key] -= 1
+                    rects.append(rect)
+            rects = [rect for rect in (rect.clip(self.screen_rect)
+                                       for rect in rects) if rect]
+            area = sum(rect.width * rect.height for rect in rects)
+
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        if self.needs_full or area > self.full_threshold * screen_area:
+            self.screen.fill(self.bg_color)
+            blit_all(self.screen, blits)
+            rects = [self.screen_rect.copy()]
+            area = screen_area
+            self.needs_full = False
+        elif rects:
+            self._redraw(rects, blits)
+
+        self.previous = blits
+        self.frames += 1
+        self.total_area += area
+        self.last_rects = len(rects)
+        self.last_area = area
+        return rects
+
+    def stats(self):
+        """
+        Report how much of the screen is redrawn.
+
+        :var screen_area int: The number of pixels of the screen.
+        :returns dict: The dirty rectangles and pixels of the last frame, and the fraction
+        of the screen updated during the last frame and on average.
+        """
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        return {'frames': self.frames,
+                'rects': self.last_rects,
+                'area': self.last_area,
+                'coverage': self.last_area / screen_area,
+                'mean_coverage': (self.total_area / (self.frames * screen_area)
+                                  if self.frames else 0.0)}
+
+    def _redraw(self, rects, blits):
+        """
+        Clear the dirty regions and blit again the images overlapping them.
+
+        :param rects list: The dirty regions.
+        :param blits list: The (image, Rect) of the frame, in drawing order.
+        :var targets list: The rectangles of the images of the frame.
+        :returns: None.
+        """
+        targets = [rect for image, rect in blits]
+        for dirty in rects:
+            self.screen.set_clip(dirty)
+            self.screen.fill(self.bg_color, dirty)
+            blit_all(self.screen, [blits[index] for index in
+                                   dirty.collidelistall(targets)])
+        self.screen.set_clip(None)
+
+
+class ScaledPresenter:
+    """
+    Show an offscreen canvas of a fixed size on a window of any size.
+
+    The canvas is scaled in one step to the largest area of the window with the same
+    aspect ratio, centered between black bars.
+
+    :method: __init__(self, window, canvas)
+    :method: resize(self, window)
+    :method: present(self)
+    :method: to_canvas(self, position)
+    """
+
+    def __init__(self, window, canvas):
+        """
+        Initialize the presenter for a window.
+
+        :param window Surface: The surface of the window.
+        :param canvas Surface: The surface the game is drawn on.
+        :var viewport Rect: The area of the window showing the canvas.
+        :var target Surface: The subsurface of the window showing the canvas.
+        :returns ScaledPresenter: Generates an instance of ScaledPresenter class.
+        """
+        self.canvas = canvas
+        self.viewport = None
+        self.target = None
+        self.resize(window)
+
+    def resize(self, window):
+        """
+        Fit the canvas to a new window size and paint the bars around it.
+
+        :param window Surface: The surface of the window.
+        :var canvas_width int: The width of the canvas.
+        :var canvas_height int: The height of the canvas.
+        :var scale float: The ratio between the viewport and the canvas.
+        :returns: None.
+        """
+        canvas_width, canvas_height = self.canvas.get_size()
+        window_rect = window.get_rect()
+        scale = min(window_rect.width / canvas_width,
+                    window_rect.height / canvas_height)
+        self.viewport = pygame.Rect(0, 0, round(canvas_width * scale),
+                                    round(canvas_height * scale))
+        self.viewport.center = window_rect.center
+        window.fill((0, 0, 0))
+        self.target = window.subsurface(self.viewport)
+
+    def present(self):
+        """
+        Scale the canvas onto the window.
+
+        :returns: None.
+        """
+        pygame.transform.scale(self.canvas, self.viewport.size, self.target)
+
+    def to_canvas(self, position):
+        """
+        Convert a position on the window, such as a click, into a position on the canvas.
+
+        :param position (int, int): The position on the window.
+        :var canvas_width int: The width of the canvas.
+        :var canvas_height int: The height of the canvas.
+        :returns (int, int): The position on the canvas.
+        """
+        canvas_width, canvas_height = self.canvas.get_size()
+        return ((position[0] - self.viewport.x) * canvas_width //
+                self.viewport.width,
+                (position[1] - self.viewport.y) * canvas_height //
+                self.viewport.height)
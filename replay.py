@@ -0,0 +1,610 @@
+"""
+Record the commands of the player and replay them to reproduce a game exactly.
+
+Every command changing the simulation is tagged with the tick it was applied before. As
+the simulation only advances by fixed ticks and draws no random number, applying the
+same commands before the same ticks, with the same settings, gives the same game.
+
+A replay file is a header with the settings the simulation depends on, the commands,
+and a footer with the number of ticks played and a digest of the final state of the
+game, all packed with struct. Every few seconds
+of game, a keyframe holding the whole state of the simulation is stored between the
+commands. The file ends with an index of the keyframes, so a replay read through mmap
+can start from the keyframe preceding any tick and only replay the ticks following it.
+
+Run ``python replay.py game.replay`` to replay a file as fast as possible, without
+drawing anything, and check that it ends on the same state, or
+``python replay.py game.replay --seek 36000`` to jump to a tick.
+
+:class: Replay()
+:class: ReplayFile()
+:function: simulation_settings(settings)
+:function: snapshot_state(game)
+:function: restore_state(game, data)
+:function: state_digest(game)
+:function: play_replay(path, settings=None, overrides=None)
+:function: seek_replay(path, tick, settings=None, overrides=None)
+:function: main(argv=None)
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+import zlib
+from game_state import GameState
+from settings import Settings
+
+# The commands of the player.
+LEFT_DOWN = 0
+LEFT_UP = 1
+RIGHT_DOWN = 2
+RIGHT_UP = 3
+FIRE = 4
+CLICK = 5
+START = 6
+
+# The commands given by pressing a key or a button.
+PRESSES = (LEFT_DOWN, RIGHT_DOWN, FIRE, CLICK)
+
+# The marker of a keyframe, in place of a command.
+KEYFRAME = 254
+# The marker of the footer, in place of a command.
+END = 255
+
+MAGIC = b'AIRP'
+VERSION = 3
+INDEX_MAGIC = b'AIDX'
+
+# Magic, version, seed and tick rate, followed from version 3 by the size of the
+# settings and the settings in JSON.
+HEADER = struct.Struct('<4sBqH')
+# Tick, command and the position of a click.
+COMMAND = struct.Struct('<IBhh')
+# Size of the settings following the header, or of the state following a keyframe marker.
+SIZE = struct.Struct('<I')
+# Number of ticks played and digest of the final state.
+FOOTER = struct.Struct('<II')
+# Tick of a keyframe and position of its marker in the file.
+INDEX_ENTRY = struct.Struct('<IQ')
+# Position of the index, number of keyframes, ticks between them and magic.
+TRAILER = struct.Struct('<QII4s')
+
+# Tick, score, level, ships left, high score, shots, hits and ticks of the game, state,
+# time remaining and next state, then the alien speed, bullet speed, ship speed, fleet
+# direction and alien points.
+STATS = struct.Struct('<IQHIQIIIBdBdddbQ')
+# Exact and previous position of the ship, its rect, its moving flags, then the offset of
+# the fleet and the number of aliens and bullets.
+BODIES = struct.Struct('<ddhh??diIH')
+# Exact and previous vertical position of a bullet and its rect.
+BULLET = struct.Struct('<ddhh')
+
+# The settings the simulation depends on, besides the seed and the tick rate. The speeds
+# are left out: every game starts them from the same values.
+SETTINGS = ('screen_width', 'screen_height', 'bullet_width', 'bullet_height',
+            'bullets_allowed', 'fleet_drop_speed', 'fleet_rows', 'fleet_columns',
+            'alien_scale', 'fleet_backend', 'collision_mode', 'ship_limit',
+            'respawn_time', 'level_transition_time', 'game_over_time',
+            'speedup_scale', 'score_scale')
+
+
+class Replay:
+    """
+    Keep the commands of a game, tagged with their simulation tick.
+
+    :method: __init__(self, seed, tick_rate, commands=None, keyframe_interval=0,
+    settings=None)
+    :method: record(self, tick, command, x=0, y=0)
+    :method: record_keyframe(self, tick, state)
+    :method: save(self, path, ticks, digest)
+    :method: load(path)
+    """
+
+    def __init__(self, seed, tick_rate, commands=None, keyframe_interval=0,
+                 settings=None):
+        """
+        Initialize a replay.
+
+        :param seed int: The seed of the game.
+        :param tick_rate int: The number of simulation ticks per second.
+        :param commands list: The (tick, command, x, y) already recorded.
+        :param keyframe_interval int: The number of ticks between two keyframes, 0 for
+        no keyframe.
+        :param settings dict: The settings the simulation depends on, as given by
+        simulation_settings(), empty if None.
+        :var keyframes list: The (tick, state) of the keyframes recorded.
+        :var ticks int: The number of ticks played, known once the replay is saved or loaded.
+        :var digest int: The digest of the final state, known once saved or loaded.
+        :returns Replay: Generates an instance of Replay class.
+        """
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.commands = commands if commands is not None else []
+        self.keyframe_interval = keyframe_interval
+        self.settings = settings if settings is not None else {}
+        self.keyframes = []
+        self.ticks = None
+        self.digest = None
+
+    def record(self, tick, command, x=0, y=0):
+        """
+        Add a command applied before a tick.
+
+        :param tick int: The number of ticks played when the command was applied.
+        :param command int: The command.
+        :param x int: The horizontal position of a click.
+        :param y int: The vertical position of a click.
+        :returns: None.
+        """
+        self.commands.append((tick, command, x, y))
+
+    def record_keyframe(self, tick, state):
+        """
+        Add the state of the simulation after a number of ticks, before their commands.
+
+        :param tick int: The number of ticks played.
+        :param state bytes: The state given by snapshot_state().
+        :returns: None.
+        """
+        self.keyframes.append((tick, state))
+
+    def save(self, path, ticks, digest):
+        """
+        Write the replay to a binary file.
+
+        A keyframe is written before the commands of its tick, and the index of the
+        keyframes after the footer.
+
+        :param path str: The path of the replay file.
+        :param ticks int: The number of ticks played.
+        :param digest int: The digest of the state of the game after the last tick.
+        :var settings bytes: The settings in JSON.
+        :var chunks list: The packed records of the file.
+        :var position int: The size of the records packed so far.
+        :var index list: The (tick, position) of each keyframe.
+        :returns: None.
+        """
+        self.ticks = ticks
+        self.digest = digest
+        settings = json.dumps(self.settings, sort_keys=True).encode()
+        chunks = [HEADER.pack(MAGIC, VERSION, self.seed, self.tick_rate),
+                  SIZE.pack(len(settings)), settings]
+        position = HEADER.size + SIZE.size + len(settings)
+        index = []
+        keyframes = iter(self.keyframes)
+        keyframe = next(keyframes, None)
+        for command in self.commands + [(ticks + 1, END, 0, 0)]:
+            while keyframe is not None and keyframe[0] <= command[0]:
+                tick, state = keyframe
+                index.append(INDEX_ENTRY.pack(tick, position))
+                chunks += [COMMAND.pack(tick, KEYFRAME, 0, 0), SIZE.pack(len(state)),
+                           state]
+                position += COMMAND.size + SIZE.size + len(state)
+                keyframe = next(keyframes, None)
+            if command[1] != END:
+                chunks.append(COMMAND.pack(*command))
+                position += COMMAND.size
+        chunks += [COMMAND.pack(ticks, END, 0, 0), FOOTER.pack(ticks, digest)]
+        position += COMMAND.size + FOOTER.size
+        chunks += index
+        chunks.append(TRAILER.pack(position, len(index), self.keyframe_interval,
+                                   INDEX_MAGIC))
+        with open(path, 'wb') as file:
+            file.write(b''.join(chunks))
+
+    @staticmethod
+    def load(path):
+        """
+        Read a replay from a binary file.
+
+        :param path str: The path of the replay file.
+        :var data bytes: The content of the file.
+        :var settings dict: The settings of the game, empty before version 3.
+        :var offset int: The position of the next command in data.
+        :raises ValueError: If the file is not a replay of a version up to this one.
+        :returns Replay: The replay read, without its keyframes.
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        magic, version, seed, tick_rate = HEADER.unpack_from(data)
+        if magic != MAGIC or not 1 <= version <= VERSION:
+            raise ValueError(f"{path} is not a replay of version {VERSION}")
+
+        settings, offset = _read_settings(data, version)
+        replay = Replay(seed, tick_rate, settings=settings)
+        while True:
+            command = COMMAND.unpack_from(data, offset)
+            offset += COMMAND.size
+            if command[1] == END:
+                break
+            if command[1] == KEYFRAME:
+                offset += SIZE.size + SIZE.unpack_from(data, offset)[0]
+                continue
+            replay.commands.append(command)
+        replay.ticks, replay.digest = FOOTER.unpack_from(data, offset)
+        return replay
+
+
+class ReplayFile:
+    """
+    Read a replay through mmap to start it from any tick.
+
+    The index of the keyframes is read once. Seeking then restores the keyframe preceding
+    the tick and replays the ticks following it, at most the ticks between two keyframes.
+
+    :method: __init__(self, path)
+    :method: close(self)
+    :method: keyframe(self, tick)
+    :method: commands(self, position, end)
+    :method: seek(self, game, tick)
+    """
+
+    def __init__(self, path):
+        """
+        Map a replay file and read its header and the index of its keyframes.
+
+        :param path str: The path of the replay file.
+        :var data mmap: The content of the file.
+        :var magic bytes: The magic of the header or the index.
+        :var version int: The version of the format of the file.
+        :var position int: The position of the index in the file.
+        :var count int: The number of keyframes.
+        :var index list: The (tick, position) of each keyframe, by tick.
+        :var settings dict: The settings of the game, empty before version 3.
+        :raises ValueError: If the file is not a replay with keyframes, of a version up
+        to this one, or has no keyframe.
+        :returns ReplayFile: Generates an instance of ReplayFile class.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.seed, self.tick_rate = HEADER.unpack_from(self.data)
+        position, count, self.keyframe_interval, index_magic = TRAILER.unpack_from(
+            self.data, len(self.data) - TRAILER.size)
+        if (magic != MAGIC or not 2 <= version <= VERSION or
+                index_magic != INDEX_MAGIC):
+            self.data.close()
+            raise ValueError(f"{path} is not a replay of version {VERSION}")
+        self.settings, _ = _read_settings(self.data, version)
+        if not count or not self.keyframe_interval:
+            self.data.close()
+            raise ValueError(f"{path} has no keyframe")
+        self.ticks, self.digest = FOOTER.unpack_from(self.data, position - FOOTER.size)
+        self.index = [INDEX_ENTRY.unpack_from(self.data,
+                                              position + i * INDEX_ENTRY.size)
+                      for i in range(count)]
+
+    def close(self):
+        """
+        Unmap the file.
+
+        :returns: None.
+        """
+        self.data.close()
+
+    def keyframe(self, tick):
+        """
+        Find the last keyframe at or before a tick.
+
+        Keyframes are recorded every keyframe_interval ticks, so the index is read at
+        the position of the tick instead of being searched.
+
+        :param tick int: The tick to reach.
+        :var slot int: The position of the keyframe in the index.
+        :var size int: The size of the state of the keyframe.
+        :returns (int, bytes, int): The tick and the state of the keyframe, and the
+        position of the record following it.
+        """
+        slot = min(tick // self.keyframe_interval, len(self.index) - 1)
+        while self.index[slot][0] > tick:
+            slot -= 1
+        tick, position = self.index[slot]
+        position += COMMAND.size
+        size, = SIZE.unpack_from(self.data, position)
+        position += SIZE.size
+        return tick, self.data[position:position + size], position + size
+
+    def commands(self, position, end):
+        """
+        Read the commands of the ticks before a tick, from a position of the file.
+
+        :param position int: The position of the first record to read.
+        :param end int: The tick at which reading stops.
+        :var command tuple: The (tick, command, x, y) read.
+        :returns generator: The (tick, command, x, y) of the commands.
+        """
+        while True:
+            command = COMMAND.unpack_from(self.data, position)
+            if command[1] == END or command[0] >= end:
+                return
+            position += COMMAND.size
+            if command[1] == KEYFRAME:
+                position += SIZE.size + SIZE.unpack_from(self.data, position)[0]
+                continue
+            yield command
+
+    def seek(self, game, tick):
+        """
+        Bring a game to the state it had after a number of ticks of the replay.
+
+        :param game AlienInvasion: A headless game with the settings of the replay.
+        :param tick int: The number of ticks to reach, at most the ticks of the replay.
+        :var start int: The tick of the keyframe restored.
+        :var state bytes: The state of the keyframe.
+        :var position int: The position of the commands following the keyframe.
+        :returns: None.
+        """
+        start, state, position = self.keyframe(tick)
+        restore_state(game, state)
+        commands = self.commands(position, tick)
+        command = next(commands, None)
+        while game.tick < tick:
+            while command is not None and command[0] == game.tick:
+                game.apply_command(*command[1:])
+                command = next(commands, None)
+            game.step(None)
+
+
+def simulation_settings(settings):
+    """
+    Give the settings a game depends on, to be recorded in its replay.
+
+    :param settings Settings: The settings of the game.
+    :returns dict: The value of each setting of SETTINGS.
+    """
+    return {name: getattr(settings, name) for name in SETTINGS}
+
+
+def _read_settings(data, version):
+    """
+    Read the settings following the header of a replay.
+
+    :param data bytes: The content of the replay file.
+    :param version int: The version of the format of the file.
+    :var size int: The size of the settings in JSON.
+    :returns (dict, int): The settings, empty before version 3, and the position of
+    the first command.
+    """
+    if version < 3:
+        return {}, HEADER.size
+    size, = SIZE.unpack_from(data, HEADER.size)
+    start = HEADER.size + SIZE.size
+    return json.loads(bytes(data[start:start + size])), start + size
+
+
+def _replay_settings(replay, settings, overrides):
+    """
+    Give the settings of a game replaying a file.
+
+    :param replay Replay: The replay, or the ReplayFile.
+    :param settings Settings: The settings to change, default settings if None.
+    :param overrides dict: The settings changed after the recorded ones, None for none.
+    :returns Settings: The settings of the recorded game.
+    """
+    settings = settings or Settings()
+    settings.seed = replay.seed
+    settings.tick_rate = replay.tick_rate
+    for name, value in {**replay.settings, **(overrides or {})}.items():
+        setattr(settings, name, value)
+    return settings
+
+
+def snapshot_state(game):
+    """
+    Pack the whole state of the simulation of a game.
+
+    :param game AlienInvasion: The game.
+    :var stats GameStats: The stats of the game.
+    :var offset (float, int): The offset of the fleet.
+    :var x list: The exact horizontal positions of the aliens.
+    :var prev_x list: The previous horizontal positions of the aliens.
+    :var y list: The vertical positions of the aliens.
+    :returns bytes: The state, for restore_state().
+    """
+    stats = game.stats
+    state = stats.state
+    settings = game.settings
+    ship = game.ship
+    bullets = game.bullets.sprites()
+    offset, x, prev_x, y = game.aliens.snapshot()
+    n = len(x)
+    return b''.join([
+        STATS.pack(game.tick, stats.score, stats.level, stats.ships_left,
+                   stats.high_score, stats.shots, stats.hits, stats.ticks,
+                   GameState.STATES.index(state.current), state.remaining,
+                   GameState.STATES.index(state.next_state)
+                   if state.next_state else 255,
+                   settings.alien_speed, settings.bullet_speed, settings.ship_speed,
+                   settings.fleet_direction, settings.alien_points),
+        BODIES.pack(ship.x, ship.prev_x, ship.rect.x, ship.rect.y,
+                    ship.moving_left, ship.moving_right, offset[0], offset[1], n,
+                    len(bullets)),
+        struct.pack(f'<{n}d{n}d{n}i', *x, *prev_x, *y),
+        b''.join(BULLET.pack(bullet.y, bullet.prev_y, *bullet.rect.topleft)
+                 for bullet in bullets),
+    ])
+
+
+def restore_state(game, data):
+    """
+    Bring a game to a state packed by snapshot_state().
+
+    The states of version 2 end with the state of a random generator the game no longer
+    has, which is ignored.
+
+    :param game AlienInvasion: The game, with the settings the state was taken with.
+    :param data bytes: The state.
+    :var values tuple: The values unpacked from a part of the state.
+    :var offset int: The position of the next part of the state in data.
+    :var bullet Bullet: A bullet restored.
+    :returns: None.
+    """
+    stats = game.stats
+    settings = game.settings
+    ship = game.ship
+    (game.tick, stats.score, stats.level, stats.ships_left, stats.high_score,
+     stats.shots, stats.hits, stats.ticks, current, remaining, next_state,
+     settings.alien_speed, settings.bullet_speed, settings.ship_speed,
+     settings.fleet_direction, settings.alien_points) = STATS.unpack_from(data)
+    stats.state.current = GameState.STATES[current]
+    stats.state.remaining = remaining
+    stats.state.next_state = (GameState.STATES[next_state]
+                              if next_state != 255 else None)
+    offset = STATS.size
+
+    (ship.x, ship.prev_x, ship.rect.x, ship.rect.y, ship.moving_left,
+     ship.moving_right, offset_x, offset_y, n, count) = BODIES.unpack_from(data, offset)
+    offset += BODIES.size
+
+    values = struct.unpack_from(f'<{n}d{n}d{n}i', data, offset)
+    offset += struct.calcsize(f'<{n}d{n}d{n}i')
+    game.aliens.restore((offset_x, offset_y), values[:n], values[n:2 * n],
+                        values[2 * n:])
+
+    game.bullets.empty()
+    for _ in range(count):
+        bullet = game.bullets.fire((0, 0))
+        bullet.y, bullet.prev_y, bullet.rect.x, bullet.rect.y = BULLET.unpack_from(
+            data, offset)
+        offset += BULLET.size
+
+    # Show the state restored.
+    game.sb.prep_score()
+    game.sb.prep_high_score()
+    game.sb.prep_level()
+    game.sb.prep_ships()
+    game._prep_banner()
+
+
+def state_digest(game):
+    """
+    Give a checksum of the state of the simulation of a game.
+
+    :param game AlienInvasion: The game.
+    :var state list: The values describing the simulation.
+    :returns int: The CRC-32 of the state.
+    """
+    stats = game.stats
+    state = [game.tick, stats.score, stats.level, stats.ships_left,
+             stats.state.current, stats.state.remaining, game.ship.x,
+             game.settings.fleet_direction, game.settings.alien_speed]
+    state += [bullet.y for bullet in game.bullets.sprites()]
+    state += [(position[0], position[1])
+              for _, position in game.aliens.blit_sequence()]
+    return zlib.crc32(repr(state).encode())
+
+
+def play_replay(path, settings=None, overrides=None):
+    """
+    Replay a file on a headless game, without drawing anything.
+
+    The game takes the settings recorded in the file.
+
+    :param path str: The path of the replay file.
+    :param settings Settings: The settings of the game, default settings if None.
+    :param overrides dict: The settings changed after the recorded ones, such as the
+    fleet backend, None for none.
+    :var replay Replay: The replay read.
+    :var game AlienInvasion: The game replaying the commands.
+    :var commands list: The commands of the replay.
+    :var index int: The position of the next command to apply.
+    :returns (AlienInvasion, Replay): The game after the last tick and the replay.
+    """
+    # Imported here as the game imports this module.
+    from alien_invasion import AlienInvasion
+
+    replay = Replay.load(path)
+    game = AlienInvasion(headless=True,
+                         settings=_replay_settings(replay, settings, overrides))
+
+    commands = replay.commands
+    index = 0
+    for tick in range(replay.ticks):
+        while index < len(commands) and commands[index][0] == tick:
+            game.apply_command(*commands[index][1:])
+            index += 1
+        game.step(None)
+    return game, replay
+
+
+def seek_replay(path, tick, settings=None, overrides=None):
+    """
+    Start a replay from any tick on a headless game, from the keyframe preceding it.
+
+    The game takes the settings recorded in the file.
+
+    :param path str: The path of the replay file.
+    :param tick int: The number of ticks to reach.
+    :param settings Settings: The settings of the game, default settings if None.
+    :param overrides dict: The settings changed after the recorded ones, such as the
+    fleet backend, None for none.
+    :var replay ReplayFile: The replay mapped.
+    :var game AlienInvasion: The game brought to the tick.
+    :returns (AlienInvasion, ReplayFile): The game after the tick and the replay, to be
+    closed once it is not needed.
+    """
+    # Imported here as the game imports this module.
+    from alien_invasion import AlienInvasion
+
+    replay = ReplayFile(path)
+    game = AlienInvasion(headless=True,
+                         settings=_replay_settings(replay, settings, overrides))
+    replay.seek(game, min(tick, replay.ticks))
+    return game, replay
+
+
+def main(argv=None):
+    """
+    Replay a file and report its speed and whether it ended on the recorded state.
+
+    :param argv list: The command line arguments, sys.argv if None.
+    :var overrides dict: The settings of the command line replacing the recorded ones.
+    :var start int: The time when the replay started, in nanoseconds.
+    :var seconds float: The duration of the replay in seconds.
+    :returns int: The exit status, 1 if the final state differs from the recorded one.
+    """
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded game of Alien Invasion without drawing it.")
+    parser.add_argument('path', help="the replay file")
+    parser.add_argument('--fleet-backend', choices=('sprite', 'numpy'),
+                        help="the backend of the fleet, the recorded one by default")
+    parser.add_argument('--seek', type=int, metavar='TICK',
+                        help="jump to a tick from the keyframe preceding it")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.fleet_backend:
+        overrides['fleet_backend'] = args.fleet_backend
+
+    if args.seek is not None:
+        start = time.perf_counter_ns()
+        game, replay = seek_replay(args.path, args.seek, overrides=overrides)
+        seconds = (time.perf_counter_ns() - start) / 1e9
+        replay.close()
+        print(f"tick {game.tick} reached in {seconds:.3f} s: score "
+              f"{game.stats.score}, level {game.stats.level}, "
+              f"ships left {game.stats.ships_left}, state {state_digest(game):08x}")
+        return 0
+
+    start = time.perf_counter_ns()
+    game, replay = play_replay(args.path, overrides=overrides)
+    seconds = (time.perf_counter_ns() - start) / 1e9
+    digest = state_digest(game)
+
+    simulated = replay.ticks / replay.tick_rate
+    print(f"{replay.ticks} ticks ({simulated:.1f} s of game) replayed in "
+          f"{seconds:.3f} s, {simulated / seconds:.0f}x real time")
+    print(f"score {game.stats.score}, level {game.stats.level}, "
+          f"ships left {game.stats.ships_left}")
+    if digest != replay.digest:
+        print(f"final state differs: {digest:08x} instead of {replay.digest:08x}")
+        return 1
+    print(f"final state matches: {digest:08x}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
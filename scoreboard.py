@@ -5,9 +5,9 @@ Manage the scoring informations of the game.
 """
 
 
-import pygame.font
 from pygame.sprite import Group
 from ship import Ship
+from text import glyph_atlas
 
 
 class Scoreboard:
@@ -18,9 +18,11 @@ class Scoreboard:
     :method: check_high_score(self)
     :method: prep_score(self)
     :method: show_score(self)
+    :method: blit_sequence(self)
     :method: prep_high_score(self)
     :method: prep_level(self)
     :method: prep_ships(self)
+    :method: prep_banner(self, text)
     """
 
     def __init__(self, game):
@@ -34,7 +36,13 @@ class Scoreboard:
         :var settings Settings: The settings of the game.
         :var stats GameStats: The statistics of the game.
         :var text_color (int, int, int): The color of the text of the scoring.
+        :var atlas GlyphAtlas: The glyphs of the scoring, rendered once.
         :var font Font: The font of the scoring.
+        :var shown_score int: The rounded score currently rendered.
+        :var shown_high_score int: The rounded high score currently rendered.
+        :var shown_level int: The level currently rendered.
+        :var banner_text str: The message shown in the middle of the screen, or None.
+        :var banner_image Surface: The rendered message, or None.
         :returns Scoreboard: Generates an instance of the Scoreboard class.
         """
         self.game = game
@@ -45,7 +53,14 @@ class Scoreboard:
 
         # Font settings for scoring information
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.atlas = glyph_atlas(None, 48, self.text_color,
+                                 self.settings.bg_color)
+        self.font = self.atlas.font
+        self.shown_score = None
+        self.shown_high_score = None
+        self.shown_level = None
+        self.banner_text = None
+        self.banner_image = None
 
         # Prepare the initial score image.
         self.prep_score()
@@ -55,7 +70,7 @@ class Scoreboard:
 
     def prep_score(self):
         """
-        Turn the score into a rendered image.
+        Turn the score into a rendered image, if the rounded score changed.
 
         :var rounded_score int: The score rounded.
         :var score_str str: The string of text containing the score.
@@ -64,9 +79,11 @@ class Scoreboard:
         :returns: None.
         """
         rounded_score = round(self.stats.score, -1)
+        if rounded_score == self.shown_score:
+            return
+        self.shown_score = rounded_score
         score_str = "{:,}".format(rounded_score)
-        self.score_image = self.font.render(
-            score_str, True, self.text_color, self.settings.bg_color)
+        self.score_image = self.atlas.render(score_str)
 
         # Display the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
@@ -83,10 +100,27 @@ class Scoreboard:
         self.screen.blit(self.high_score_image, self.high_score_rect)
         self.screen.blit(self.level_image, self.level_rect)
         self.ships.draw(self.screen)
+        if self.banner_image:
+            self.screen.blit(self.banner_image, self.banner_rect)
+
+    def blit_sequence(self):
+        """
+        Give the images of the score, the level and the ships and where to draw them.
+
+        :var sequence list: The (image, rect) of each element of the scoreboard.
+        :returns list: The (image, rect) of each element of the scoreboard.
+        """
+        sequence = [(self.score_image, self.score_rect),
+                    (self.high_score_image, self.high_score_rect),
+                    (self.level_image, self.level_rect)]
+        sequence += [(ship.image, ship.rect) for ship in self.ships.sprites()]
+        if self.banner_image:
+            sequence.append((self.banner_image, self.banner_rect))
+        return sequence
 
     def prep_high_score(self):
         """
-        Turn the high score into a rendered image.
+        Turn the high score into a rendered image, if the rounded high score changed.
 
         :var high_score int: Highest score in the game on this computer.
         :var high_score_str: Highest score converted into an image.
@@ -95,9 +129,11 @@ class Scoreboard:
         :returns: None.
         """
         high_score = round(self.stats.high_score, -1)
+        if high_score == self.shown_high_score:
+            return
+        self.shown_high_score = high_score
         high_score_str = "{:,}".format(high_score)
-        self.high_score_image = self.font.render(
-            high_score_str, True, self.text_color, self.settings.bg_color)
+        self.high_score_image = self.atlas.render(high_score_str)
 
         # Center the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
@@ -117,16 +153,18 @@ class Scoreboard:
 
     def prep_level(self):
         """
-        Turn the level into a rendered image.
+        Turn the level into a rendered image, if the level changed.
 
         :var level_str str: The current level of the user in the game.       
         :var level_image Surface: Rendered image of level_str var.
         :var level_rect Rect: Rectangular dimensions of level_image var.
         :returns: None.
         """
+        if self.stats.level == self.shown_level:
+            return
+        self.shown_level = self.stats.level
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(
-            level_str, True, self.text_color, self.settings.bg_color)
+        self.level_image = self.atlas.render(level_str)
 
         # Position the level below the score.
         self.level_rect = self.level_image.get_rect()
@@ -148,3 +186,22 @@ class Scoreboard:
             ship.rect.x = 10 + ship_number * ship.rect.width
             ship.rect.y = 10
             self.ships.add(ship)
+
+    def prep_banner(self, text):
+        """
+        Turn a message shown in the middle of the screen into an image, if it changed.
+
+        :param text str: The message, None to hide the banner.
+        :var banner_rect Rect: The rectangular dimensions of the banner.
+        :returns: None.
+        """
+        if text == self.banner_text:
+            return
+        self.banner_text = text
+        if text is None:
+            self.banner_image = None
+            return
+        self.banner_image = self.font.render(
+            text, True, self.text_color, self.settings.bg_color)
+        self.banner_rect = self.banner_image.get_rect()
+        self.banner_rect.center = self.screen_rect.center
@@ -21,12 +21,57 @@ class Settings:
         :var screen_width int: The width of the screen.
         :var screen_height int: The height of the screen.
         :var bg_color (int, int, int): The color of the background of the game.
-        :var ship_speed int: The speed of the ship.
-        :var bullet_speed float: The speed of the bullet.
+        :var display_size (int, int): The size of the window, None for the size of the
+        screen of the game. The game is then drawn at its own size and scaled.
+        :var fullscreen bool: True to scale the game to the whole display, false if not.
+        :var scale_mode str: 'transform' to scale an offscreen canvas with
+        pygame.transform.scale, 'sdl' to let SDL scale the window with the SCALED flag.
+        SDL chooses the size of the window then, so display_size must stay None.
+        :var tick_rate int: The number of simulation ticks per second.
+        :var max_fps int: The maximum number of frames drawn per second, 0 for no cap.
+        :var max_frame_time float: The longest time in seconds simulated after a single frame.
+        :var low_latency bool: True to read the arrow keys right before each simulation
+        tick instead of waiting for their events.
+        :var latency_report_path str: The JSON file where the input latency histogram is
+        written when the game exits, None for no report.
+        :var threaded bool: True to run the simulation on its own thread, the main thread
+        drawing its latest snapshot, false to run both on the main thread.
+        :var snapshot_buffers int: The number of snapshots buffered between the threads.
+        :var render_mode str: 'full' to redraw the whole screen each frame, 'dirty' to
+        redraw only the regions that changed.
+        :var dirty_full_threshold float: The fraction of the screen above which a dirty
+        frame is redrawn entirely.
+        :var seed int: The seed of the game, recorded in its replay. The simulation draws
+        no random number, the seed only tells games apart.
+        :var replay_path str: The file where the commands of the player are written
+        when the game exits, None for no replay file.
+        :var replay_keyframe_interval int: The number of ticks between two keyframes of
+        the replay, from which it can be started, 0 for no keyframe.
+        :var records_path str: The JSON file keeping the high score and the stats of the
+        last games between launches, None to keep nothing. Headless games never use it.
+        :var spectate_address (str, int) or str: The host and port, or the path of the
+        Unix socket, where the game is streamed to spectators, None for no stream.
+        :var spectate_keyframe_interval int: The greatest number of ticks between two
+        keyframes of the stream.
+        :var profile_window int: The number of frames of the averages of the overlay.
+        :var profile_trace_path str: The CSV or JSON file where every frame of the
+        profiler is written when the game exits, None for no trace.
         :var bullet_width int: The width of a bullet.
         :var bullet_height int: The height of a bullet.
         :var bullet_color (int, int, int): The color of the bullet.
         :var bullets_allowed int: The number of bullets allowed in the screen.
+        :var fleet_rows int: The number of rows of aliens, as many as fit if None.
+        :var fleet_columns int: The number of aliens in a row, as many as fit if None.
+        :var alien_scale float: The scale of the image of the aliens.
+        :var fleet_backend str: 'sprite' for a group of Alien sprites, 'numpy' for
+        a fleet stored in NumPy arrays.
+        :var collision_cell_size int: The size in pixels of a cell of the collision grid
+        of the sprite fleet, the NumPy fleet sizing its cells to the aliens.
+        :var collision_mode str: 'rect' to collide the rectangles of the sprites, 'mask'
+        to collide their pixels once their rectangles overlap.
+        :var respawn_time float: The pause after the ship is hit.
+        :var level_transition_time float: The pause before a new level starts.
+        :var game_over_time float: The pause before the menu once the game is lost.
         :var score_scale float: How quickly the alien point values increase.
         :var speedup_scale float: How quickly the game speeds up.
         :returns: Settings instance.
@@ -35,6 +80,38 @@ class Settings:
         self.screen_height = 540
         self.bg_color = (230, 230, 230)
 
+        # Display settings, the game keeps its screen size whatever the display.
+        self.display_size = None
+        self.fullscreen = False
+        self.scale_mode = 'transform'
+
+        # Loop settings
+        self.tick_rate = 120
+        self.max_fps = 60
+        self.max_frame_time = 0.25
+        self.low_latency = False
+        self.latency_report_path = None
+        self.threaded = False
+        self.snapshot_buffers = 3
+        self.render_mode = 'full'
+        self.dirty_full_threshold = 0.5
+
+        # Replay settings
+        self.seed = 0
+        self.replay_path = None
+        self.replay_keyframe_interval = 600
+
+        # Records settings
+        self.records_path = 'records.json'
+
+        # Spectator settings
+        self.spectate_address = None
+        self.spectate_keyframe_interval = 120
+
+        # Profiler settings
+        self.profile_window = 120
+        self.profile_trace_path = None
+
         # Bullet settings
         self.bullet_width = 3
         self.bullet_height = 15
@@ -43,10 +120,21 @@ class Settings:
 
         # Alien settings
         self.fleet_drop_speed = 10
+        self.fleet_rows = None
+        self.fleet_columns = None
+        self.alien_scale = 1.0
+        self.fleet_backend = 'sprite'
+        self.collision_cell_size = 64
+        self.collision_mode = 'rect'
 
         # Ship settings
         self.ship_limit = 3
 
+        # Durations of the pauses of the game, in seconds.
+        self.respawn_time = 1.0
+        self.level_transition_time = 0.75
+        self.game_over_time = 1.5
+
         self.speedup_scale = 1.1
 
         self.score_scale = 1.5
@@ -57,6 +145,8 @@ class Settings:
         """
         Initialize the settings that change throughout the game.
 
+        Speeds are in pixels per second so the game behaves the same on every machine.
+
         :var ship_speed float: The speed of the ship.
         :var bullet_speed float: The speed of the bullets.
         :var alien_speed float: The speed of an alien.
@@ -64,9 +154,9 @@ class Settings:
         :var alien_points int: The number of points earned by alien eliminated.
         :returns: None.
         """
-        self.alien_speed = 1.0
-        self.bullet_speed = 1.0
-        self.ship_speed = 1.5
+        self.alien_speed = 200.0
+        self.bullet_speed = 200.0
+        self.ship_speed = 300.0
         self.fleet_direction = 1
 
         # Scoring
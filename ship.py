@@ -5,7 +5,6 @@ Contain the description of the ship of the player in the Alien Invasion game.
 """
 
 
-import pygame
 from pygame.sprite import Sprite
 
 
@@ -14,8 +13,9 @@ class Ship(Sprite):
     Manage all the functionalities of the ship of the player.
 
     :method: __init__(self, game)
-    :method: blitme(self)
-    :method: update(self)
+    :method: blitme(self, alpha=1.0)
+    :method: interpolated_rect(self, alpha)
+    :method: update(self, dt)
     :method: center_ship(self)
     """
 
@@ -26,12 +26,14 @@ class Ship(Sprite):
         :param game AlienInvasion: The current game.
         :var screen Surface: The screen of the game var.
         :var screen_rect Rect: The rectangular coordinates of the ship.
-        :var image Surface: Loads the image of the ship.
+        :var image Surface: The image of the ship, shared with the lives of the scoreboard.
+        :var mask Mask: The pixels of the ship that collide, shared like its image.
         :var rect Rect: The rectangular coordinates of the image of the ship.
         :var moving_left Bool: True if the ship is moving left, false if not. Default at False.
         :var moving_right Bool: True if the ship is moving right, false if not. Default at False.
         :var settings Settings: The settings of the game.
         :var x float: The horizontal coordinate of the ship.
+        :var prev_x float: The horizontal coordinate of the ship before the last update.
         :returns Ship: Generates a Ship instance.
         """
         super().__init__()
@@ -40,8 +42,9 @@ class Ship(Sprite):
         self.screen_rect = game.screen.get_rect()
         self.settings = game.settings
 
-        # Load the ship image and gettings its coordinates.
-        self.image = pygame.image.load('images/ship.bmp')
+        # Get the shared ship image, its mask and its coordinates.
+        self.image = game.assets.image('images/ship.bmp')
+        self.mask = game.assets.mask('images/ship.bmp')
         self.rect = self.image.get_rect()
 
         # Display the ship at the bottom center of the screen.
@@ -49,34 +52,50 @@ class Ship(Sprite):
 
         # Store a decimal value for the ship's horizontal position.
         self.x = float(self.rect.x)
+        self.prev_x = self.x
 
         # Movement flag.
         self.moving_right = False
         self.moving_left = False
 
-    def update(self):
+    def update(self, dt):
         """
         Update the ship's position based on the movement flag.
 
+        :param dt float: The duration of the simulation tick in seconds.
         :var x int: The X coordinate of the ship.
         :returns: None.
         """
         # Update the ship's x value, not the rect.
+        self.prev_x = self.x
         if self.moving_right and (self.rect.right < self.screen_rect.right):
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and (self.rect.left > 0):
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         # Update rect object from self.x.
         self.rect.x = self.x
 
-    def blitme(self):
+    def blitme(self, alpha=1.0):
         """
-        Draw the ship at its current location.
+        Draw the ship between its previous and its current location.
 
+        :param alpha float: The fraction of the tick elapsed since the last update.
         :returns: None.
         """
-        self.screen.blit(self.image, self.rect)
+        self.screen.blit(self.image, self.interpolated_rect(alpha))
+
+    def interpolated_rect(self, alpha):
+        """
+        Give the position of the ship between its previous and its current location.
+
+        :param alpha float: The fraction of the tick elapsed since the last update.
+        :var rect Rect: The interpolated position of the ship.
+        :returns Rect: The position where the ship has to be drawn.
+        """
+        rect = self.rect.copy()
+        rect.x = self.prev_x + (self.x - self.prev_x) * alpha
+        return rect
 
     def center_ship(self):
         """
@@ -86,3 +105,4 @@ class Ship(Sprite):
         """
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.prev_x = self.x
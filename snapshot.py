@@ -0,0 +1,80 @@
+"""
+Hand the state of the simulation to the thread drawing it.
+
+:class: Snapshot(tuple)
+:class: SnapshotBuffer()
+"""
+
+import threading
+from collections import namedtuple
+from time import perf_counter
+
+
+class Snapshot(namedtuple('Snapshot', ('tick', 'published', 'sequence'))):
+    """
+    Keep what a frame shows after a simulation tick, without any reference to the game.
+
+    The sequence only holds shared images and (x, y) tuples, so the simulation can go on
+    while the snapshot is drawn.
+
+    :var tick int: The number of simulation ticks played.
+    :var published float: The value of perf_counter() when the snapshot was taken.
+    :var sequence tuple: The (image, (x, y)) of the frame, in drawing order.
+    """
+
+    __slots__ = ()
+
+
+class SnapshotBuffer:
+    """
+    Keep the last snapshots published by the simulation thread for the render thread.
+
+    The simulation never waits for the render: publishing a snapshot replaces the oldest
+    slot of the buffer, and the render always takes the most recent one.
+
+    :method: __init__(self, size=3)
+    :method: publish(self, tick, sequence)
+    :method: latest(self)
+    """
+
+    def __init__(self, size=3):
+        """
+        Initialize an empty buffer.
+
+        :param size int: The number of snapshots kept, 2 for double, 3 for triple buffering.
+        :var slots list: The snapshots kept, None for the slots not used yet.
+        :var index int: The slot of the most recent snapshot.
+        :var published int: The number of snapshots published.
+        :var lock Lock: The lock guarding the slots and the index.
+        :returns SnapshotBuffer: Generates an instance of SnapshotBuffer class.
+        """
+        self.slots = [None] * size
+        self.index = 0
+        self.published = 0
+        self.lock = threading.Lock()
+
+    def publish(self, tick, sequence):
+        """
+        Store a new snapshot in the next slot of the buffer.
+
+        :param tick int: The number of simulation ticks played.
+        :param sequence list: The (image, rect or (x, y)) of the frame.
+        :var snapshot Snapshot: The snapshot published.
+        :returns: None.
+        """
+        snapshot = Snapshot(tick, perf_counter(),
+                            tuple((image, (position[0], position[1]))
+                                  for image, position in sequence))
+        with self.lock:
+            self.index = (self.index + 1) % len(self.slots)
+            self.slots[self.index] = snapshot
+            self.published += 1
+
+    def latest(self):
+        """
+        Give the most recent snapshot.
+
+        :returns Snapshot: The most recent snapshot, None if none was published.
+        """
+        with self.lock:
+            return self.slots[self.index]
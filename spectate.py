@@ -0,0 +1,618 @@
+"""
+Stream the state of a game to spectators over a local socket.
+
+Every simulation tick is packed with struct and array into a binary frame. A keyframe
+holds the whole state: the stats, the ship, the bullets and the position of every
+alien. The frames following it are deltas: as the whole fleet moves together, a delta
+only holds how far the fleet moved since the keyframe, which aliens were killed since
+the previous frame and the few aliens rounded to the next pixel, on top of the stats,
+the ship and the few bullets. Most frames then cost a few dozen bytes, whatever the
+size of the fleet.
+
+The server runs an asyncio event loop on its own thread: the game only encodes the
+frame and hands it over, so no viewer can stall it. A viewer too slow to keep up loses
+its backlog and resumes at the next keyframe.
+
+Run ``python spectate.py 127.0.0.1:8765`` to watch a game streaming to this address.
+
+:class: SnapshotEncoder()
+:class: SnapshotDecoder()
+:class: SpectatorServer()
+:function: split_frames(buffer)
+:function: parse_address(text)
+:function: main(argv=None)
+"""
+
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import threading
+from array import array
+from collections import Counter
+from game_state import GameState
+from settings import Settings
+
+# The kinds of frame.
+KEYFRAME = 0
+DELTA = 1
+
+# Length of the frame following, in bytes.
+LENGTH = struct.Struct('<I')
+# Kind, tick, score, level, ships left, state and horizontal position of the ship.
+FRAME = struct.Struct('<BIQHIBh')
+# Number of bullets or aliens, followed by their (x, y) as int16.
+COUNT = struct.Struct('<I')
+# Offset of the fleet from the keyframe, number of aliens killed since the last frame and
+# number of aliens off the offset by a pixel. They are followed by the index in the
+# keyframe of the aliens killed and of the aliens off the offset as uint32, then by how
+# far they are off the offset as (x, y) int8.
+FLEET = struct.Struct('<hhII')
+# Number of aliens killed at the front of the fleet in one tick up to which a delta is
+# looked for, a keyframe being sent past it.
+MATCH_ATTEMPTS = 16
+
+
+def _pack(typecode, values):
+    """
+    Pack numbers into little-endian bytes.
+
+    :param typecode str: The type of the numbers, as for array.
+    :param values list: The numbers.
+    :var packed array: The numbers in an array.
+    :returns bytes: The packed numbers.
+    """
+    packed = array(typecode, values)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(typecode, data, offset, count):
+    """
+    Read little-endian numbers packed by _pack().
+
+    :param typecode str: The type of the numbers, as for array.
+    :param data bytes: The frame.
+    :param offset int: The position of the first number in data.
+    :param count int: The number of numbers.
+    :var unpacked array: The numbers read.
+    :returns (array, int): The numbers and the position following them.
+    """
+    unpacked = array(typecode)
+    end = offset + count * unpacked.itemsize
+    unpacked.frombytes(data[offset:end])
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked, end
+
+
+class SnapshotEncoder:
+    """
+    Turn the state of a game into keyframes and deltas.
+
+    :method: __init__(self, keyframe_interval=120)
+    :method: encode(self, game)
+    :method: _match(self, positions)
+    """
+
+    def __init__(self, keyframe_interval=120):
+        """
+        Initialize an encoder starting with a keyframe.
+
+        :param keyframe_interval int: The greatest number of ticks between two keyframes.
+        :var keyframe_tick int: The tick of the last keyframe, None before the first one.
+        :var origin list: The (x, y) of the aliens in the last keyframe.
+        :var alive list: The indices in origin of the aliens still alive, in order.
+        :var frames int: The number of frames encoded.
+        :var keyframes int: The number of keyframes encoded.
+        :var size int: The number of bytes encoded.
+        :returns SnapshotEncoder: Generates an instance of SnapshotEncoder class.
+        """
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_tick = None
+        self.origin = []
+        self.alive = []
+        self.frames = 0
+        self.keyframes = 0
+        self.size = 0
+
+    def encode(self, game):
+        """
+        Encode the state of a game after a tick.
+
+        A keyframe is encoded for the first frame, every keyframe_interval ticks, and
+        when the aliens cannot be told from the ones of the last keyframe, such as
+        when a new fleet appears.
+
+        :param game AlienInvasion: The game.
+        :var positions list: The (x, y) of the aliens.
+        :var bullets list: The x and y of the bullets, one after the other.
+        :var matched tuple: The offset of the fleet, the aliens killed, the aliens still
+        alive and the aliens off the offset, None if a keyframe is needed.
+        :returns (bytes, bool): The frame, and true if it is a keyframe.
+        """
+        stats = game.stats
+        positions = [(position[0], position[1])
+                     for _, position in game.aliens.blit_sequence()]
+        bullets = [value for bullet in game.bullets.sprites()
+                   for value in bullet.rect.topleft]
+
+        matched = None
+        if (self.keyframe_tick is not None and
+                game.tick - self.keyframe_tick < self.keyframe_interval):
+            matched = self._match(positions)
+        keyframe = matched is None
+
+        frame = [FRAME.pack(KEYFRAME if keyframe else DELTA, game.tick, stats.score,
+                            stats.level, stats.ships_left,
+                            GameState.STATES.index(stats.state.current),
+                            game.ship.rect.x),
+                 COUNT.pack(len(bullets) // 2), _pack('h', bullets)]
+        if keyframe:
+            self.keyframe_tick = game.tick
+            self.origin = positions
+            self.alive = list(range(len(positions)))
+            frame += [COUNT.pack(len(positions)),
+                      _pack('h', [value for position in positions
+                                  for value in position])]
+            self.keyframes += 1
+        else:
+            (dx, dy), killed, self.alive, nudges = matched
+            frame += [FLEET.pack(dx, dy, len(killed), len(nudges)), _pack('I', killed),
+                      _pack('I', [nudge[0] for nudge in nudges]),
+                      _pack('b', [value for nudge in nudges for value in nudge[1:]])]
+
+        frame = b''.join(frame)
+        self.frames += 1
+        self.size += len(frame)
+        return frame, keyframe
+
+    def _match(self, positions):
+        """
+        Find the aliens of the last keyframe that are still alive and how far they moved.
+
+        The aliens keep their order and all move by the same offset, so the first alien
+        is one of the first aliens of the last frame still alive, moved by the offset. As
+        each alien is rounded to the pixel on its own, an alien may be a pixel off.
+
+        An offset is dropped as soon as it misses more aliens than were killed, and only
+        MATCH_ATTEMPTS first aliens are tried, so a tick costs at most MATCH_ATTEMPTS
+        passes over the fleet however many aliens were killed.
+
+        :param positions list: The (x, y) of the aliens.
+        :var kills int: The number of aliens killed since the last frame.
+        :var survivors list: The indices in origin of the aliens matched.
+        :var killed list: The indices in origin of the aliens not matched.
+        :var errors list: How far each alien matched is off the offset.
+        :var nudges list: The (index, x, y) of the aliens off the offset most of them
+        moved by.
+        :returns tuple: The (dx, dy) offset, the aliens killed, the aliens still alive and
+        the aliens off the offset, None if the aliens do not match.
+        """
+        origin = self.origin
+        alive = self.alive
+        kills = len(alive) - len(positions)
+        if kills < 0:
+            return None
+        if not positions:
+            return (0, 0), alive, [], []
+
+        for first in range(min(kills + 1, MATCH_ATTEMPTS)):
+            x, y = origin[alive[first]]
+            dx = positions[0][0] - x
+            dy = positions[0][1] - y
+            survivors = []
+            killed = []
+            errors = []
+            for index in alive:
+                if len(survivors) < len(positions):
+                    x, y = positions[len(survivors)]
+                    error = (x - origin[index][0] - dx, y - origin[index][1] - dy)
+                    if -1 <= error[0] <= 1 and -1 <= error[1] <= 1:
+                        survivors.append(index)
+                        errors.append(error)
+                        continue
+                killed.append(index)
+                if len(killed) > kills:
+                    break
+            if len(survivors) == len(positions):
+                break
+        else:
+            return None
+
+        # Take the offset most aliens moved by, the others are nudged.
+        (ex, ey), _ = Counter(errors).most_common(1)[0]
+        nudges = [(index, error[0] - ex, error[1] - ey)
+                  for index, error in zip(survivors, errors)
+                  if error != (ex, ey)]
+        return (dx + ex, dy + ey), killed, survivors, nudges
+
+
+class SnapshotDecoder:
+    """
+    Rebuild the state of a game from the frames of a SnapshotEncoder.
+
+    :method: __init__(self)
+    :method: feed(self, frame)
+    :method: aliens(self)
+    """
+
+    def __init__(self):
+        """
+        Initialize a decoder waiting for a keyframe.
+
+        :var tick int: The tick of the last frame, None before the first keyframe.
+        :var score int: The score of the game.
+        :var level int: The level of the game.
+        :var ships_left int: The number of ships left.
+        :var state str: The state of the game.
+        :var ship_x int: The horizontal position of the ship.
+        :var bullets list: The (x, y) of the bullets.
+        :var origin array: The x and y of the aliens in the last keyframe.
+        :var alive bytearray: 1 for each alien of the last keyframe still alive, else 0.
+        :var offset (int, int): How far the fleet moved since the last keyframe.
+        :var nudges dict: How far the aliens off the offset are off, by index.
+        :returns SnapshotDecoder: Generates an instance of SnapshotDecoder class.
+        """
+        self.tick = None
+        self.score = 0
+        self.level = 1
+        self.ships_left = 0
+        self.state = GameState.MENU
+        self.ship_x = 0
+        self.bullets = []
+        self.origin = array('h')
+        self.alive = bytearray()
+        self.offset = (0, 0)
+        self.nudges = {}
+
+    def feed(self, frame):
+        """
+        Apply a frame to the state.
+
+        :param frame bytes: The frame, without its length.
+        :var offset int: The position of the next value in frame.
+        :var values array: The numbers read.
+        :returns bool: True if the frame was applied, false if it is a delta received
+        before any keyframe.
+        """
+        kind, tick, score, level, ships_left, state, ship_x = FRAME.unpack_from(frame)
+        if kind == DELTA and self.tick is None:
+            return False
+        self.tick = tick
+        self.score = score
+        self.level = level
+        self.ships_left = ships_left
+        self.state = GameState.STATES[state]
+        self.ship_x = ship_x
+
+        offset = FRAME.size
+        count, = COUNT.unpack_from(frame, offset)
+        values, offset = _unpack('h', frame, offset + COUNT.size, count * 2)
+        self.bullets = list(zip(values[::2], values[1::2]))
+
+        if kind == KEYFRAME:
+            count, = COUNT.unpack_from(frame, offset)
+            self.origin, offset = _unpack('h', frame, offset + COUNT.size, count * 2)
+            self.alive = bytearray(b'\x01') * count
+            self.offset = (0, 0)
+            self.nudges = {}
+        else:
+            dx, dy, count, nudged = FLEET.unpack_from(frame, offset)
+            killed, offset = _unpack('I', frame, offset + FLEET.size, count)
+            for index in killed:
+                self.alive[index] = 0
+            self.offset = (dx, dy)
+            indices, offset = _unpack('I', frame, offset, nudged)
+            values, offset = _unpack('b', frame, offset, nudged * 2)
+            self.nudges = dict(zip(indices, zip(values[::2], values[1::2])))
+        return True
+
+    def aliens(self):
+        """
+        Give the positions of the aliens alive.
+
+        :var dx int: How far the fleet moved right since the last keyframe.
+        :var dy int: How far the fleet moved down since the last keyframe.
+        :var positions list: The (x, y) of each alien alive.
+        :returns list: The (x, y) of each alien alive.
+        """
+        dx, dy = self.offset
+        origin = self.origin
+        positions = []
+        for index, alive in enumerate(self.alive):
+            if alive:
+                nx, ny = self.nudges.get(index, (0, 0))
+                positions.append((origin[2 * index] + dx + nx,
+                                  origin[2 * index + 1] + dy + ny))
+        return positions
+
+
+def split_frames(buffer):
+    """
+    Take the complete frames out of the bytes received from the stream.
+
+    :param buffer bytearray: The bytes received and not decoded yet, the frames taken
+    are removed from it.
+    :var offset int: The position of the next frame in buffer.
+    :returns list: The complete frames, without their length.
+    """
+    frames = []
+    offset = 0
+    while len(buffer) - offset >= LENGTH.size:
+        length, = LENGTH.unpack_from(buffer, offset)
+        if len(buffer) - offset - LENGTH.size < length:
+            break
+        offset += LENGTH.size
+        frames.append(bytes(buffer[offset:offset + length]))
+        offset += length
+    del buffer[:offset]
+    return frames
+
+
+class SpectatorServer:
+    """
+    Send the frames of a game to every spectator connected to a local socket.
+
+    The event loop of the server runs on its own thread. Only publish() and close()
+    are called from the game, every other method runs on the thread of the server.
+
+    :method: __init__(self, address, keyframe_interval=120, backlog=256)
+    :method: publish(self, game)
+    :method: close(self)
+    :method: _serve(self)
+    :method: _broadcast(self, data, keyframe)
+    :method: _handle(self, reader, writer)
+    """
+
+    def __init__(self, address, keyframe_interval=120, backlog=256):
+        """
+        Start the server and wait for it to listen.
+
+        :raises OSError: If the server cannot listen to the address, for instance if it is
+        already in use.
+
+        :param address (str, int) or str: The host and port of a TCP socket, or the path
+        of a Unix socket.
+        :param keyframe_interval int: The greatest number of ticks between two keyframes.
+        :param backlog int: The number of frames a spectator can fall behind before it
+        waits for the next keyframe.
+        :var encoder SnapshotEncoder: The encoder of the frames.
+        :var keyframe bytes: The last keyframe sent, with its length, None before it.
+        :var chain list: The deltas sent since the last keyframe, with their length.
+        :var clients dict: The frames waiting for each spectator, by queue, and whether
+        the spectator waits for the next keyframe.
+        :var loop AbstractEventLoop: The event loop of the server.
+        :var ready Event: Set once the server listens, or failed to.
+        :var error Exception: The error raised when starting to listen, None if none.
+        :var thread Thread: The thread running the event loop.
+        :returns SpectatorServer: Generates an instance of SpectatorServer class.
+        """
+        self.address = address
+        self.backlog = backlog
+        self.encoder = SnapshotEncoder(keyframe_interval)
+        self.keyframe = None
+        self.chain = []
+        self.clients = {}
+        self.server = None
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._serve, name='spectators',
+                                       daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            self.thread.join()
+            raise self.error
+
+    def publish(self, game):
+        """
+        Encode the state of a game and hand it to the server.
+
+        :param game AlienInvasion: The game, after a tick.
+        :var frame bytes: The frame encoded.
+        :var keyframe bool: True if the frame is a keyframe.
+        :returns: None.
+        """
+        frame, keyframe = self.encoder.encode(game)
+        self.loop.call_soon_threadsafe(self._broadcast,
+                                       LENGTH.pack(len(frame)) + frame, keyframe)
+
+    def close(self):
+        """
+        Disconnect the spectators and stop the server.
+
+        :returns: None.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def _serve(self):
+        """
+        Listen to the socket and run the event loop until the server is closed.
+
+        :var tasks set: The tasks still sending frames when the server is closed.
+        :returns: None.
+        """
+        asyncio.set_event_loop(self.loop)
+        try:
+            if isinstance(self.address, str):
+                start = asyncio.start_unix_server(self._handle, self.address)
+            else:
+                start = asyncio.start_server(self._handle, *self.address)
+            self.server = self.loop.run_until_complete(start)
+        except Exception as error:
+            # Hand the error to the game instead of leaving it waiting.
+            self.error = error
+            self.loop.close()
+            return
+        finally:
+            self.ready.set()
+        self.loop.run_forever()
+
+        self.server.close()
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(
+            asyncio.gather(*tasks, self.server.wait_closed(), return_exceptions=True))
+        self.loop.close()
+
+    def _broadcast(self, data, keyframe):
+        """
+        Queue a frame for every spectator.
+
+        :param data bytes: The frame, with its length.
+        :param keyframe bool: True if the frame is a keyframe.
+        :returns: None.
+        """
+        if keyframe:
+            self.keyframe = data
+            self.chain = []
+        else:
+            self.chain.append(data)
+
+        for frames, waiting in self.clients.items():
+            if waiting and not keyframe:
+                continue
+            if frames.full():
+                # The spectator is too slow: drop its backlog, it resumes at a keyframe.
+                while not frames.empty():
+                    frames.get_nowait()
+                if not keyframe:
+                    self.clients[frames] = True
+                    continue
+            self.clients[frames] = False
+            frames.put_nowait(data)
+
+    async def _handle(self, reader, writer):
+        """
+        Send the frames to a spectator until it disconnects.
+
+        A new spectator first receives the last keyframe and the deltas following it.
+
+        :param reader StreamReader: The stream from the spectator, not read.
+        :param writer StreamWriter: The stream to the spectator.
+        :var frames Queue: The frames waiting to be sent.
+        :returns: None.
+        """
+        frames = asyncio.Queue(self.backlog)
+        self.clients[frames] = self.keyframe is None
+        if self.keyframe is not None:
+            frames.put_nowait(b''.join([self.keyframe] + self.chain))
+        try:
+            while True:
+                writer.write(await frames.get())
+                await writer.drain()
+        except (OSError, asyncio.CancelledError):
+            # The spectator disconnected or the server is closed.
+            pass
+        finally:
+            del self.clients[frames]
+            writer.close()
+
+
+def parse_address(text):
+    """
+    Read a TCP address as host:port, or the path of a Unix socket.
+
+    :param text str: The address.
+    :var host str: The host of a TCP address.
+    :var port str: The port of a TCP address.
+    :returns (str, int) or str: The host and port, or the path.
+    """
+    host, _, port = text.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return text
+
+
+def main(argv=None):
+    """
+    Watch a game streamed by a SpectatorServer in a window.
+
+    :param argv list: The command line arguments, sys.argv if None.
+    :var settings Settings: The settings of the game watched.
+    :var decoder SnapshotDecoder: The state of the game watched.
+    :var buffer bytearray: The bytes received and not decoded yet.
+    :var received int: The number of bytes received.
+    :var frames int: The number of frames decoded.
+    :var running bool: False once the window is closed.
+    :returns int: The exit status.
+    """
+    # Imported here so that the server does not need a display.
+    import pygame
+    from assets import AssetManager
+
+    parser = argparse.ArgumentParser(description="Watch a game of Alien Invasion.")
+    parser.add_argument('address', nargs='?', default='127.0.0.1:8765',
+                        help="host:port of the game, or the path of a Unix socket")
+    parser.add_argument('--frames', type=int,
+                        help="stop after this number of frames")
+    args = parser.parse_args(argv)
+
+    address = parse_address(args.address)
+    if isinstance(address, str):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    connection.connect(address)
+    connection.setblocking(False)
+
+    settings = Settings()
+    pygame.init()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+    pygame.display.set_caption("Alien Invasion - spectator")
+    assets = AssetManager()
+    ship = assets.image('images/ship.bmp')
+    alien = assets.image('images/alien.bmp')
+    font = pygame.font.SysFont(None, 36)
+    clock = pygame.time.Clock()
+
+    decoder = SnapshotDecoder()
+    buffer = bytearray()
+    received = 0
+    frames = 0
+    running = True
+    while running and (args.frames is None or frames < args.frames):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        try:
+            data = connection.recv(1 << 16)
+            if not data:
+                break
+            buffer += data
+            received += len(data)
+        except BlockingIOError:
+            pass
+        for frame in split_frames(buffer):
+            frames += decoder.feed(frame)
+
+        screen.fill(settings.bg_color)
+        if decoder.tick is not None:
+            screen.blit(ship, (decoder.ship_x,
+                               settings.screen_height - ship.get_height()))
+            for x, y in decoder.bullets:
+                screen.fill(settings.bullet_color, (x, y, settings.bullet_width,
+                                                    settings.bullet_height))
+            screen.blits([(alien, position) for position in decoder.aliens()], False)
+            screen.blit(font.render(
+                f"score {decoder.score}  level {decoder.level}  "
+                f"ships {decoder.ships_left}  {decoder.state}",
+                True, (30, 30, 30)), (10, 10))
+        pygame.display.flip()
+        clock.tick(settings.max_fps)
+
+    connection.close()
+    pygame.quit()
+    print(f"{frames} frames, {received} bytes, "
+          f"{received / max(frames, 1):.1f} bytes per frame")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Run the tests on headless games from the root of the project.
+
+:function: new_game()
+:function: play(game, ticks, seed=0)
+"""
+
+import os
+import random
+import sys
+
+# Keep pygame off any real display and audio device.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from alien_invasion import AlienInvasion
+from settings import Settings
+from benchmarks.scenarios import FiringPlayer
+
+
+@pytest.fixture
+def new_game():
+    """
+    Give a factory of started headless games.
+
+    :returns function: Builds a game from keyword settings, e.g. fleet_backend='numpy'.
+    """
+    def build(**values):
+        settings = Settings()
+        settings.records_path = None
+        for name, value in values.items():
+            setattr(settings, name, value)
+        game = AlienInvasion(headless=True, settings=settings)
+        game.reset()
+        return game
+    return build
+
+
+def play(game, ticks, seed=0):
+    """
+    Play a game with a seeded firing player, yielding after each tick.
+
+    :param game AlienInvasion: The headless game.
+    :param ticks int: The number of ticks to play.
+    :param seed int: The seed of the player.
+    :var player FiringPlayer: The scripted player.
+    :returns generator: The tick numbers played.
+    """
+    player = FiringPlayer(random.Random(seed))
+    for tick in range(ticks):
+        game.step(player(game, tick))
+        yield tick
@@ -0,0 +1,43 @@
+"""
+Check the counters of the cache of images and masks.
+"""
+
+import os
+from assets import AssetManager
+
+ALIEN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     'images', 'alien.bmp')
+
+
+def test_scaled_image_counts_its_own_request():
+    """
+    A scaled image missing counts a miss, as does the image it is scaled from.
+    """
+    assets = AssetManager()
+    scaled = assets.image(ALIEN, scale=0.5)
+    assert (assets.hits, assets.misses) == (0, 2)
+    assert assets.image(ALIEN, scale=0.5) is scaled
+    assert assets.image(ALIEN).get_width() // 2 == scaled.get_width()
+    assert (assets.hits, assets.misses) == (2, 2)
+    assert assets.stats() == {'hits': 2, 'misses': 2, 'cached': 2, 'masks': 0}
+
+
+def test_every_request_counts_once():
+    """
+    Each request is either a hit or a miss, whatever it asks for.
+    """
+    assets = AssetManager()
+    requests = [lambda: assets.image(ALIEN),
+                lambda: assets.image(ALIEN, scale=0.3),
+                lambda: assets.mask(ALIEN, scale=0.3),
+                lambda: assets.solid((3, 15), (60, 60, 60)),
+                lambda: assets.solid_mask((3, 15))]
+    for request in requests:
+        request()
+    # The scaled image and its mask also requested the images they are made from.
+    assert assets.hits + assets.misses == len(requests) + 2
+    misses = assets.misses
+    for request in requests:
+        request()
+    assert assets.misses == misses
+    assert assets.hits + assets.misses == 2 * len(requests) + 2
@@ -0,0 +1,15 @@
+"""
+Check the games played by the batch runner.
+"""
+
+import batch
+
+
+def test_seeds_give_different_games():
+    """
+    The games of a policy differ by their seed, and are the same for a seed.
+    """
+    jobs = batch.make_jobs({}, ['tracking'], 4, 3000)
+    results = [batch.play_game(job) for job in jobs]
+    assert len({(result['score'], result['level']) for result in results}) > 1
+    assert batch.play_game(jobs[1])['score'] == results[1]['score']
@@ -0,0 +1,63 @@
+"""
+Check the pool of bullets.
+"""
+
+from bullet import BulletPool
+
+
+def fired(new_game, number):
+    """
+    Give a pool holding bullets fired from left to right.
+
+    :param new_game function: The factory of headless games.
+    :param number int: The number of bullets fired, also the size of the pool.
+    :var pool BulletPool: The pool.
+    :returns BulletPool: The pool.
+    """
+    game = new_game(bullets_allowed=number)
+    pool = BulletPool(game)
+    for x in range(number):
+        pool.fire((10 * x + 10, 500))
+    return pool
+
+
+def test_kills_keep_the_order_of_the_others(new_game):
+    """
+    Bullets killed, even twice, leave the others in the order they were fired.
+    """
+    pool = fired(new_game, 10)
+    bullets = pool.sprites()
+    for bullet in bullets[1::3]:
+        bullet.kill()
+        bullet.kill()
+    assert len(pool) == 7
+    assert pool.sprites() == [bullet for index, bullet in enumerate(bullets)
+                              if index % 3 != 1]
+    assert len(pool.blit_sequence()) == 7
+
+
+def test_update_leaves_out_the_bullets_killed(new_game):
+    """
+    An update compacts the pool and only moves the bullets still in flight.
+    """
+    pool = fired(new_game, 6)
+    bullets = pool.sprites()
+    bullets[0].kill()
+    bullets[4].kill()
+    pool.update(0.01)
+    assert pool.count == 4 and pool.dead == 0
+    assert pool.sprites() == [bullets[1], bullets[2], bullets[3], bullets[5]]
+    assert all(bullet.y < 500 for bullet in pool.sprites())
+
+
+def test_fire_reuses_the_records_of_the_bullets_killed(new_game):
+    """
+    Firing after every bullet was killed reuses their records instead of growing the pool.
+    """
+    pool = fired(new_game, 8)
+    for bullet in pool.sprites():
+        bullet.kill()
+    assert not pool
+    for x in range(8):
+        pool.fire((x, 500))
+    assert len(pool) == 8 and len(pool.items) == 8
@@ -0,0 +1,23 @@
+"""
+Check the measure of the input latency.
+"""
+
+from time import perf_counter
+import replay
+
+
+def test_press_is_shown_by_the_next_tick(new_game):
+    """
+    A press is measured up to the first frame flipped after the tick that applies it.
+    """
+    game = new_game()
+    game._command(replay.FIRE)
+    timed, = game.latency.pending
+    assert timed.shown_from == game.tick + 1
+
+    # A frame flipped before the next tick does not show the press yet.
+    game.latency.presented(game.tick, perf_counter())
+    assert game.latency.pending == [timed]
+    game.step()
+    game.latency.presented(game.tick, perf_counter())
+    assert game.latency.pending == [] and game.latency.count == 1
@@ -0,0 +1,19 @@
+"""
+Check the display modes of a game with a window.
+"""
+
+import pytest
+from alien_invasion import AlienInvasion
+from settings import Settings
+
+
+def test_sdl_scaling_refuses_a_display_size():
+    """
+    SDL sizes its scaled window itself, so a display size is refused, not ignored.
+    """
+    settings = Settings()
+    settings.records_path = None
+    settings.scale_mode = 'sdl'
+    settings.display_size = (1920, 1080)
+    with pytest.raises(ValueError):
+        AlienInvasion(settings=settings)
@@ -0,0 +1,135 @@
+"""
+Check that the fleet backends play the same games.
+"""
+
+import pytest
+from conftest import play
+from replay import state_digest
+
+pytest.importorskip('numpy')
+
+
+def test_backends_agree_tick_by_tick(new_game):
+    """
+    Both backends reach the same state after every tick of a game.
+    """
+    games = [new_game(fleet_backend='sprite'), new_game(fleet_backend='numpy')]
+    players = [play(game, 3000) for game in games]
+    for _ in zip(*players):
+        assert state_digest(games[0]) == state_digest(games[1])
+    assert games[0].stats.level == games[1].stats.level
+
+
+@pytest.mark.parametrize('mode', ['rect', 'mask'])
+def test_backends_agree_on_collision_mode(new_game, mode):
+    """
+    Both backends end a game in the same state in each collision mode.
+    """
+    games = [new_game(fleet_backend=backend, collision_mode=mode)
+             for backend in ('sprite', 'numpy')]
+    for _ in zip(*(play(game, 1500, seed=3) for game in games)):
+        pass
+    assert state_digest(games[0]) == state_digest(games[1])
+
+
+def clear_level(game):
+    """
+    Destroy every alien of the fleet and play the tick clearing the level.
+
+    :param game AlienInvasion: The headless game.
+    :returns: None.
+    """
+    fleet = game.aliens
+    if hasattr(fleet, 'alive'):
+        fleet.alive[:fleet.count] = False
+        fleet.alive_count = 0
+        fleet.bounds = None
+    else:
+        for alien in fleet.sprites():
+            alien.kill()
+            fleet.grid.remove(alien)
+            fleet.pool.append(alien)
+        fleet.bounds = None
+    game.step()
+
+
+def test_sprite_fleet_reuses_aliens_across_fleets(new_game):
+    """
+    Every new fleet of the sprite backend is made of the aliens of the first one.
+    """
+    game = new_game(fleet_backend='sprite', level_transition_time=0.0)
+    first = {id(alien) for alien in game.aliens.sprites()}
+    for _ in range(5):
+        clear_level(game)
+        assert {id(alien) for alien in game.aliens.sprites()} == first
+
+
+def test_array_fleet_reuses_arrays_across_fleets(new_game):
+    """
+    Every new fleet of the array backend is stored in the arrays of the first one.
+    """
+    game = new_game(fleet_backend='numpy', level_transition_time=0.0)
+    fleet = game.aliens
+    arrays = (fleet.x, fleet.prev_x, fleet.y, fleet.alive)
+    size = fleet.count
+    for _ in range(5):
+        clear_level(game)
+        assert all(new is old for new, old in
+                   zip((fleet.x, fleet.prev_x, fleet.y, fleet.alive), arrays))
+        assert fleet.count == size
+
+
+def test_array_fleet_reuses_slots_across_levels(new_game):
+    """
+    Clearing levels reclaims the slots of the array backend instead of growing it.
+    """
+    game = new_game(fleet_backend='numpy', level_transition_time=0.0)
+    fleet = game.aliens
+    size = fleet.count
+    capacity = len(fleet.x)
+    for level in range(2, 12):
+        clear_level(game)
+        assert game.stats.level == level
+        assert fleet.count == size == len(fleet)
+    assert len(fleet.x) == capacity
+
+
+@pytest.mark.parametrize('mode', ['rect', 'mask'])
+def test_backends_agree_when_bullets_share_aliens(new_game, mode):
+    """
+    Wide bullets over a dense fleet: each alien goes to the first bullet touching it.
+    """
+    settings = dict(collision_mode=mode, bullet_width=40, bullets_allowed=40,
+                    alien_scale=0.2, fleet_rows=30, fleet_columns=60)
+    games = [new_game(fleet_backend=backend, **settings)
+             for backend in ('sprite', 'numpy')]
+    for _ in zip(*(play(game, 600, seed=5) for game in games)):
+        assert state_digest(games[0]) == state_digest(games[1])
+    assert games[0].stats.hits == games[1].stats.hits > 0
+
+
+def test_grid_finds_the_items_of_the_cells_around_each_rectangle():
+    """
+    The batched search gives, for each rectangle, the items of the cells where an item
+    overlapping it may start, in the order of the cells.
+    """
+    import numpy as np
+    from pygame import Rect
+    from collision import ArrayGrid
+    generator = np.random.default_rng(7)
+    x, y = generator.integers(-50, 400, (2, 500))
+    grid = ArrayGrid(16)
+    grid.build(x, y)
+    rects = [Rect(*generator.integers(-60, 400, 2), *generator.integers(1, 40, 2))
+             for _ in range(200)]
+    left, top, width, height = np.array(rects, dtype=np.int64).T
+    owners, items = grid.query_many(left, top, left + width, top + height)
+    expected = []
+    for owner, rect in enumerate(rects):
+        cells = sorted((row, column, item) for item, (column, row) in
+                       enumerate(zip((x // 16).tolist(), (y // 16).tolist()))
+                       if rect.left // 16 - 1 <= column <= (rect.right - 1) // 16
+                       and rect.top // 16 - 1 <= row <= (rect.bottom - 1) // 16)
+        expected += [(owner, item) for _, _, item in cells]
+        assert grid.query(rect).tolist() == [item for _, _, item in cells]
+    assert list(zip(owners.tolist(), items.tolist())) == expected
@@ -0,0 +1,35 @@
+"""
+Check the profiler and its overlay.
+"""
+
+from time import perf_counter_ns
+from profiler import Profiler
+
+
+def test_take_hands_over_the_phases():
+    """
+    The phases taken from a profiler are merged in the frame of another one.
+    """
+    ticks = Profiler(1)
+    frames = Profiler()
+    ticks.record('aliens', perf_counter_ns() - 2_000_000)
+    phases = ticks.take()
+    assert phases['aliens'] >= 2_000_000
+    assert ticks.current['aliens'] == 0
+
+    frames.merge(phases)
+    frames.merge(phases)
+    frames.end_frame()
+    assert frames.averages()['aliens'] >= 4.0
+
+
+def test_overlay_is_left_out_of_the_state(new_game):
+    """
+    The sequence of the state, published by the simulation, never holds the overlay.
+    """
+    game = new_game()
+    game.overlay.toggle()
+    overlay = game.overlay.blit_sequence()
+    assert overlay
+    sequence = game._blit_sequence()
+    assert not any(item in sequence for item in overlay)
@@ -0,0 +1,76 @@
+"""
+Check the records kept on disk.
+"""
+
+import json
+import os
+from records import RecordStore
+
+
+def test_records_are_written_and_loaded(tmp_path):
+    """
+    The high score and the last sessions written are loaded back, with no file left over.
+    """
+    path = str(tmp_path / 'records.json')
+    store = RecordStore(path, max_sessions=2, batch_delay=0.01)
+    store.high_score = 1500
+    for score in (100, 200, 300):
+        store.add_session({'score': score})
+    store.close()
+    assert os.listdir(tmp_path) == ['records.json']
+
+    store = RecordStore(path)
+    store.close()
+    assert store.high_score == 1500
+    assert store.sessions == [{'score': 200}, {'score': 300}]
+
+
+def test_saves_close_together_are_written_once(tmp_path):
+    """
+    Saves within the batch delay are written once, with the last values.
+    """
+    path = str(tmp_path / 'records.json')
+    store = RecordStore(path, batch_delay=60)
+    for score in range(50):
+        store.high_score = score
+        store.save()
+    store.close()
+    assert store.writes == 1
+    with open(path) as file:
+        assert json.load(file)['high_score'] == 49
+
+
+def test_damaged_file_keeps_the_defaults(tmp_path):
+    """
+    A damaged file loads as the defaults and is left as it is.
+    """
+    path = tmp_path / 'records.json'
+    path.write_text('{"high_score": 12')
+    store = RecordStore(str(path))
+    store.close()
+    assert (store.high_score, store.sessions) == (0, [])
+    assert path.read_text() == '{"high_score": 12'
+
+
+def test_failed_write_leaves_the_previous_file(tmp_path, monkeypatch):
+    """
+    A write whose rename fails leaves the previous file and no temporary one.
+    """
+    path = str(tmp_path / 'records.json')
+    store = RecordStore(path, batch_delay=0.01)
+    store.high_score = 10
+    store.save()
+    store.close()
+
+    def fail(source, destination):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', fail)
+    store = RecordStore(path, batch_delay=0.01)
+    store.high_score = 20
+    store.save()
+    store.close()
+    assert store.writes == 0
+    assert os.listdir(tmp_path) == ['records.json']
+    with open(path) as file:
+        assert json.load(file)['high_score'] == 10
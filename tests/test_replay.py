@@ -0,0 +1,128 @@
+"""
+Check that replays play the recorded game again, from its start or from any tick.
+"""
+
+import pytest
+from conftest import play
+from replay import Replay, play_replay, seek_replay, state_digest
+
+
+def record(new_game, path, ticks=2500, interval=300, **values):
+    """
+    Play a game recording its replay, and write it as the game does when it exits.
+
+    :param new_game function: The factory of headless games.
+    :param path Path: The replay file.
+    :param ticks int: The number of ticks played.
+    :param interval int: The number of ticks between two keyframes.
+    :param values dict: The settings of the game.
+    :var digests list: The digest of the state after each number of ticks, the first
+    one taken once the game started.
+    :returns list: The digests.
+    """
+    game = new_game(replay_path=str(path), replay_keyframe_interval=interval,
+                    **values)
+    digests = [state_digest(game)]
+    for _ in play(game, ticks):
+        digests.append(state_digest(game))
+    game.replay.save(str(path), game.tick, state_digest(game))
+    return digests
+
+
+@pytest.fixture(params=['sprite', 'numpy'])
+def backend(request):
+    """
+    Give each fleet backend, skipping numpy when it is not installed.
+    """
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    return request.param
+
+
+def test_replay_round_trip(new_game, tmp_path, backend):
+    """
+    A replay played from its start ends in the state of the game recorded.
+    """
+    path = tmp_path / 'game.replay'
+    digests = record(new_game, path, fleet_backend=backend)
+    game, replay = play_replay(str(path))
+    assert replay.ticks == len(digests) - 1
+    assert state_digest(game) == replay.digest == digests[-1]
+
+
+@pytest.mark.parametrize('tick', [1, 299, 300, 301, 1234, 2400, 2500])
+def test_seek_matches_the_play_through(new_game, tmp_path, backend, tick):
+    """
+    Seeking to a tick, on or between keyframes, gives the state of the game at that tick.
+    """
+    path = tmp_path / 'game.replay'
+    digests = record(new_game, path, fleet_backend=backend)
+    game, replay = seek_replay(str(path), tick)
+    try:
+        assert game.tick == tick
+        assert state_digest(game) == digests[tick]
+    finally:
+        replay.close()
+
+
+def test_keyframes_only_for_a_replay_file(new_game, tmp_path):
+    """
+    Keyframes are only kept when the replay is written to a file.
+    """
+    game = new_game(replay_keyframe_interval=10)
+    for _ in play(game, 100):
+        pass
+    assert game.replay.keyframes == []
+
+    game = new_game(replay_keyframe_interval=10,
+                    replay_path=str(tmp_path / 'game.replay'))
+    for _ in play(game, 100):
+        pass
+    assert [tick for tick, _ in game.replay.keyframes] == list(range(0, 101, 10))
+
+
+def test_replay_load_keeps_the_commands(new_game, tmp_path):
+    """
+    A replay loaded has the commands, the seed, the tick rate and the ticks saved.
+    """
+    path = tmp_path / 'game.replay'
+    game = new_game(replay_path=str(path))
+    for _ in play(game, 600):
+        pass
+    game.replay.save(str(path), game.tick, state_digest(game))
+    loaded = Replay.load(str(path))
+    assert loaded.commands == game.replay.commands
+    assert (loaded.seed, loaded.tick_rate, loaded.ticks) == (
+        game.settings.seed, game.settings.tick_rate, game.tick)
+
+
+CUSTOM = {'fleet_rows': 3, 'fleet_columns': 7, 'alien_scale': 0.5, 'bullets_allowed': 6,
+          'fleet_drop_speed': 25, 'collision_mode': 'mask', 'ship_limit': 1}
+
+
+def test_replay_keeps_the_settings_of_the_game(new_game, tmp_path):
+    """
+    A game with settings of the command line replays and seeks on default settings.
+    """
+    path = tmp_path / 'game.replay'
+    digests = record(new_game, path, **CUSTOM)
+    game, replay = play_replay(str(path))
+    assert replay.settings == {**replay.settings, **CUSTOM}
+    assert all(getattr(game.settings, name) == value for name, value in CUSTOM.items())
+    assert state_digest(game) == digests[-1]
+
+    game, replay = seek_replay(str(path), 1500)
+    replay.close()
+    assert state_digest(game) == digests[1500]
+
+
+def test_overrides_replace_the_recorded_settings(new_game, tmp_path):
+    """
+    The fleet backend of the replay can be changed, the game stays the same.
+    """
+    pytest.importorskip('numpy')
+    path = tmp_path / 'game.replay'
+    digests = record(new_game, path, 1000, fleet_backend='sprite')
+    game, _ = play_replay(str(path), overrides={'fleet_backend': 'numpy'})
+    assert game.settings.fleet_backend == 'numpy'
+    assert state_digest(game) == digests[-1]
@@ -0,0 +1,107 @@
+"""
+Check the spectator stream: the server and the encoding of the frames.
+"""
+
+import socket
+import pytest
+from conftest import play
+from spectate import SnapshotDecoder, SnapshotEncoder, SpectatorServer
+
+
+def test_server_reports_an_address_in_use():
+    """
+    A server on an address in use raises the error of its thread instead of hanging.
+    """
+    with socket.socket() as taken:
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        with pytest.raises(OSError):
+            SpectatorServer(taken.getsockname())
+
+
+def test_server_listens_and_closes():
+    """
+    A server accepts a viewer and its thread ends once closed.
+    """
+    server = SpectatorServer(('127.0.0.1', 0))
+    port = server.server.sockets[0].getsockname()[1]
+    with socket.create_connection(('127.0.0.1', port), timeout=5):
+        pass
+    server.close()
+    assert not server.thread.is_alive()
+
+
+def alien_positions(game):
+    """
+    Give the sorted positions where the aliens of a game are drawn.
+
+    :param game AlienInvasion: The game.
+    :returns list: The (x, y) of each alien.
+    """
+    return sorted((position[0], position[1])
+                  for _, position in game.aliens.blit_sequence())
+
+
+def check_round_trip(game, ticks, keyframe_interval):
+    """
+    Play a game and check that every frame decodes to the state of the game.
+
+    :param game AlienInvasion: The started headless game.
+    :param ticks int: The number of ticks to play.
+    :param keyframe_interval int: The greatest number of ticks between two keyframes.
+    :returns: None.
+    """
+    encoder = SnapshotEncoder(keyframe_interval)
+    decoder = SnapshotDecoder()
+    for tick in play(game, ticks):
+        frame, _ = encoder.encode(game)
+        assert decoder.feed(frame)
+        assert decoder.tick == game.tick
+        assert decoder.score == game.stats.score
+        assert decoder.ships_left == game.stats.ships_left
+        assert decoder.ship_x == game.ship.rect.x
+        assert sorted(decoder.bullets) == sorted(
+            (bullet.rect.x, bullet.rect.y) for bullet in game.bullets.sprites())
+        assert sorted(decoder.aliens()) == alien_positions(game)
+
+
+@pytest.mark.parametrize('backend', ['sprite', 'numpy'])
+def test_frames_decode_to_the_game(new_game, backend):
+    """
+    Each frame of a game decodes to its state, with either fleet backend.
+    """
+    if backend == 'numpy':
+        pytest.importorskip('numpy')
+    check_round_trip(new_game(fleet_backend=backend), 1500, 120)
+
+
+def test_frames_hold_more_aliens_than_uint16(new_game):
+    """
+    A fleet of more than 65535 aliens is counted and indexed without overflowing.
+    """
+    pytest.importorskip('numpy')
+    game = new_game(fleet_backend='numpy', fleet_rows=300, fleet_columns=250,
+                    alien_scale=0.05)
+    assert len(game.aliens) > 65535
+    check_round_trip(game, 20, 10)
+
+
+@pytest.mark.parametrize('front, keyframe', [(3, False), (30, True)])
+def test_aliens_killed_at_the_front_of_the_fleet(new_game, front, keyframe):
+    """
+    A few aliens killed at the front still give a delta, many give a keyframe.
+    """
+    pytest.importorskip('numpy')
+    game = new_game(fleet_backend='numpy', fleet_rows=4, fleet_columns=50,
+                    alien_scale=0.2)
+    encoder = SnapshotEncoder(120)
+    decoder = SnapshotDecoder()
+    decoder.feed(encoder.encode(game)[0])
+    fleet = game.aliens
+    fleet.alive[:front] = False
+    fleet.alive_count -= front
+    fleet.bounds = None
+    frame, is_keyframe = encoder.encode(game)
+    assert is_keyframe == keyframe
+    decoder.feed(frame)
+    assert sorted(decoder.aliens()) == alien_positions(game)
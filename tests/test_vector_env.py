@@ -0,0 +1,50 @@
+"""
+Check that the vector environment plays by the rules of AlienInvasion.
+"""
+
+import random
+import pytest
+from benchmarks.scenarios import FiringPlayer
+
+np = pytest.importorskip('numpy')
+from vector_env import VectorEnv
+
+
+def flags(actions):
+    """
+    Turn the actions of a headless game into the flags of the vector environment.
+
+    :param actions iterable: The names of the actions.
+    :returns int: The LEFT, RIGHT and FIRE flags.
+    """
+    return ((VectorEnv.LEFT if 'left' in actions else 0) |
+            (VectorEnv.RIGHT if 'right' in actions else 0) |
+            (VectorEnv.FIRE if 'fire' in actions else 0))
+
+
+def test_vector_env_matches_the_game(new_game):
+    """
+    Every game of the vector environment plays like a headless game on the same actions.
+    """
+    game = new_game()
+    env = VectorEnv(2, new_game().settings)
+    player = FiringPlayer(random.Random(1))
+    for tick in range(12000):
+        actions = player(game, tick)
+        active = game.step(actions)
+        observation, _, done, _ = env.step(np.full(2, flags(actions)))
+        if not active:
+            assert done.all()
+            break
+        if tick % 10:
+            continue
+        for row in range(2):
+            assert observation['score'][row] == game.stats.score
+            assert observation['level'][row] == game.stats.level
+            assert observation['ships_left'][row] == game.stats.ships_left
+            assert observation['ship_x'][row] == game.ship.x
+            aliens = observation['aliens'][row][observation['alien_alive'][row]]
+            assert sorted(map(tuple, aliens.tolist())) == sorted(
+                (position[0], position[1])
+                for _, position in game.aliens.blit_sequence())
+    assert game.stats.level > 2
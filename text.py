@@ -0,0 +1,103 @@
+"""
+Render the numbers of the game from glyphs rasterized once per font, size and color.
+
+:class: GlyphAtlas()
+:function: glyph_atlas(name, size, color, background)
+"""
+
+import pygame.font
+
+
+class GlyphAtlas:
+    """
+    Keep the glyphs of a font rendered in one color and compose text by blitting them.
+
+    :method: __init__(self, font, color, background, characters='0123456789,')
+    :method: glyph(self, character)
+    :method: render(self, text)
+    """
+
+    def __init__(self, font, color, background, characters='0123456789,'):
+        """
+        Initialize the atlas and render the glyphs used by the numbers.
+
+        :param font Font: The font of the text.
+        :param color (int, int, int): The color of the text in RGB.
+        :param background (int, int, int): The color behind the text in RGB.
+        :param characters str: The characters to render right away.
+        :var glyphs dict: The rendered glyph of each character.
+        :var height int: The height of the rendered text.
+        :var renders int: The number of glyphs rasterized by the font.
+        :var compositions int: The number of texts composed from the glyphs.
+        :returns GlyphAtlas: Generates an instance of GlyphAtlas class.
+        """
+        self.font = font
+        self.color = color
+        self.background = background
+        self.glyphs = {}
+        self.height = font.get_height()
+        self.renders = 0
+        self.compositions = 0
+        for character in characters:
+            self.glyph(character)
+
+    def glyph(self, character):
+        """
+        Give the rendered glyph of a character, rasterizing it only the first time.
+
+        :param character str: The character to render.
+        :var image Surface: The rendered glyph.
+        :returns Surface: The rendered glyph.
+        """
+        image = self.glyphs.get(character)
+        if image is None:
+            image = self.font.render(character, True, self.color,
+                                     self.background)
+            self.glyphs[character] = image
+            self.renders += 1
+        return image
+
+    def render(self, text):
+        """
+        Compose a text from the glyphs of the atlas.
+
+        :param text str: The text to render.
+        :var images list: The glyphs of the text.
+        :var image Surface: The rendered text.
+        :var x int: The horizontal position of the next glyph.
+        :returns Surface: The rendered text.
+        """
+        images = [self.glyph(character) for character in text]
+        image = pygame.Surface(
+            (sum(glyph.get_width() for glyph in images), self.height))
+        image.fill(self.background)
+        x = 0
+        for glyph in images:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        self.compositions += 1
+        return image
+
+
+# The atlases already built, indexed by (name, size, color, background).
+_atlases = {}
+
+
+def glyph_atlas(name, size, color, background):
+    """
+    Give the atlas of a system font, building it only the first time.
+
+    :param name str: The name of the system font, None for the default font.
+    :param size int: The size of the font.
+    :param color (int, int, int): The color of the text in RGB.
+    :param background (int, int, int): The color behind the text in RGB.
+    :var key tuple: The key of the atlas.
+    :var atlas GlyphAtlas: The atlas of the font.
+    :returns GlyphAtlas: The atlas of the font.
+    """
+    key = (name, size, tuple(color), tuple(background))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = GlyphAtlas(pygame.font.SysFont(name, size), color, background)
+        _atlases[key] = atlas
+    return atlas
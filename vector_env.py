@@ -0,0 +1,409 @@
+"""
+Step many independent games of Alien Invasion in lockstep, for training agents.
+
+The state of every game lives in NumPy arrays with one row per game, and each rule of
+AlienInvasion is applied to all the games at once, without any loop over the games, the
+aliens or the bullets.
+
+:class: VectorEnv()
+"""
+
+from assets import AssetManager
+from fleet import formation
+from settings import Settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _rect_round(x):
+    """
+    Round exact positions the way a pygame Rect does, half away from zero.
+
+    :param x ndarray: The exact positions.
+    :returns ndarray: The positions as integers.
+    """
+    return np.trunc(x + np.copysign(0.5, x)).astype(np.int64)
+
+
+class VectorEnv:
+    """
+    Run N games of Alien Invasion in lockstep, like a Gym vector environment.
+
+    An action is a combination of the LEFT, RIGHT and FIRE flags, the keys held during
+    the tick. The rules are the ones of AlienInvasion, pauses after a hit or a cleared
+    level included; a lost game is reported as done and restarted right away.
+
+    :method: __init__(self, num_envs, settings=None)
+    :method: reset(self, mask=None)
+    :method: step(self, actions)
+    :method: observe(self)
+    :method: _new_fleet(self, mask)
+    :method: _center_ship(self, mask)
+    :method: _pause(self, mask, duration, respawn)
+    :method: _fire_bullets(self, mask)
+    :method: _compact_bullets(self)
+    :method: _update_ship(self, active, left, right)
+    :method: _update_bullets(self, active)
+    :method: _check_bullet_alien_collisions(self, active)
+    :method: _update_aliens(self, active)
+    """
+
+    LEFT = 1
+    RIGHT = 2
+    FIRE = 4
+
+    def __init__(self, num_envs, settings=None):
+        """
+        Initialize the games and start them.
+
+        :param num_envs int: The number of games.
+        :param settings Settings: The settings of every game, default settings if None.
+        :var alien_size (int, int): The width and the height of an alien.
+        :var ship_size (int, int): The width and the height of the ship.
+        :var bullet_size (int, int): The width and the height of a bullet.
+        :var positions tuple: The (x, y) of each alien of a new fleet.
+        :var formation_x ndarray: The horizontal positions of the aliens of a new fleet.
+        :var formation_y ndarray: The vertical positions of the aliens of a new fleet.
+        :var ship_x ndarray: The exact horizontal position of each ship.
+        :var bullet_x ndarray: The horizontal positions of the bullets, by game.
+        :var bullet_y ndarray: The exact vertical positions of the bullets, by game.
+        :var bullet_alive ndarray: True for the bullets in flight, first fired first.
+        :var alien_x ndarray: The exact horizontal positions of the aliens, by game.
+        :var alien_y ndarray: The vertical positions of the aliens, by game.
+        :var alien_alive ndarray: True for the aliens still in the fleet, by game.
+        :var paused ndarray: True for the games pausing after a hit or a cleared level.
+        :var respawning ndarray: True for the pauses after a hit.
+        :var remaining ndarray: The seconds left in the pause of each game.
+        :var ticks ndarray: The number of ticks played in the current game of each row.
+        :returns VectorEnv: Generates an instance of VectorEnv class.
+        """
+        if np is None:
+            raise ImportError("The vector environment requires NumPy.")
+        self.num_envs = num_envs
+        self.settings = settings or Settings()
+        self.dt = 1 / self.settings.tick_rate
+
+        assets = AssetManager()
+        self.alien_size = assets.image(
+            'images/alien.bmp', scale=self.settings.alien_scale).get_size()
+        self.ship_size = assets.image('images/ship.bmp').get_size()
+        self.bullet_size = (self.settings.bullet_width,
+                            self.settings.bullet_height)
+
+        # The fleet of AlienInvasion._create_fleet().
+        positions = formation(
+            (self.settings.screen_width, self.settings.screen_height),
+            self.alien_size, self.ship_size[1],
+            self.settings.fleet_rows, self.settings.fleet_columns)
+        self.formation_x = np.array([x for x, _ in positions], dtype=float)
+        self.formation_y = np.array([y for _, y in positions], dtype=np.int64)
+
+        n = num_envs
+        aliens = len(self.formation_x)
+        bullets = self.settings.bullets_allowed
+        self.ship_x = np.zeros(n)
+        self.bullet_x = np.zeros((n, bullets), dtype=np.int64)
+        self.bullet_y = np.zeros((n, bullets))
+        self.bullet_alive = np.zeros((n, bullets), dtype=bool)
+        self.alien_x = np.zeros((n, aliens))
+        self.alien_y = np.zeros((n, aliens), dtype=np.int64)
+        self.alien_alive = np.zeros((n, aliens), dtype=bool)
+
+        # The dynamic settings and the stats of each game.
+        self.ship_speed = np.zeros(n)
+        self.bullet_speed = np.zeros(n)
+        self.alien_speed = np.zeros(n)
+        self.fleet_direction = np.zeros(n, dtype=np.int64)
+        self.alien_points = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.ships_left = np.zeros(n, dtype=np.int64)
+
+        self.paused = np.zeros(n, dtype=bool)
+        self.respawning = np.zeros(n, dtype=bool)
+        self.remaining = np.zeros(n)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """
+        Start new games, like the play button of AlienInvasion.
+
+        :param mask ndarray: True for the games to start, every game if None.
+        :var settings Settings: The settings, giving the speeds of a new game.
+        :returns dict: The observations of every game.
+        """
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        settings = self.settings
+        settings.initialize_dynamic_settings()
+        self.ship_speed[mask] = settings.ship_speed
+        self.bullet_speed[mask] = settings.bullet_speed
+        self.alien_speed[mask] = settings.alien_speed
+        self.fleet_direction[mask] = settings.fleet_direction
+        self.alien_points[mask] = settings.alien_points
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.ships_left[mask] = self.settings.ship_limit
+        self.paused[mask] = False
+        self.ticks[mask] = 0
+        self.bullet_alive[mask] = False
+        self._new_fleet(mask)
+        self._center_ship(mask)
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Advance every game by one simulation tick.
+
+        :param actions ndarray: The LEFT, RIGHT and FIRE flags held in each game.
+        :var active ndarray: True for the games being played during this tick.
+        :var leaving ndarray: True for the games whose pause ends during this tick.
+        :var points ndarray: The points earned in each game during this tick.
+        :var hit ndarray: True for the games whose ship was hit during this tick.
+        :var done ndarray: True for the games lost during this tick.
+        :returns (dict, ndarray, ndarray, dict): The observations, the rewards, the done
+        flags and the final score and level of the games lost.
+        """
+        actions = np.asarray(actions)
+        left = (actions & self.LEFT) != 0
+        right = (actions & self.RIGHT) != 0
+
+        # Bullets are fired before the tick, and not during a pause.
+        self._fire_bullets(((actions & self.FIRE) != 0) & ~self.paused)
+
+        # Count down the pauses and restore the fleet when a respawn is over.
+        self.remaining[self.paused] -= self.dt
+        leaving = self.paused & (self.remaining <= 1e-9)
+        respawned = leaving & self.respawning
+        self.bullet_alive[respawned] = False
+        self._new_fleet(respawned)
+        self._center_ship(respawned)
+        self.paused &= ~leaving
+        active = ~self.paused
+
+        self._update_ship(active, left, right)
+        self._update_bullets(active)
+        points = self._check_bullet_alien_collisions(active)
+        hit = self._update_aliens(active & ~self.paused)
+
+        # A hit costs a ship, and the game when no ship is left.
+        done = hit & (self.ships_left == 0)
+        hit &= ~done
+        self.ships_left[hit] -= 1
+        self._pause(hit, self.settings.respawn_time, True)
+
+        self.ticks += 1
+        infos = {'score': self.score[done], 'level': self.level[done],
+                 'ticks': self.ticks[done]}
+        if done.any():
+            self.reset(done)
+        return self.observe(), points, done, infos
+
+    def observe(self):
+        """
+        Give the state of every game.
+
+        :returns dict: The arrays of the ship position, the bullets and the aliens of
+        each game, with their alive flags, and the score, level and ships left.
+        """
+        return {
+            'ship_x': self.ship_x.copy(),
+            'bullets': np.stack((self.bullet_x, _rect_round(self.bullet_y)),
+                                axis=-1),
+            'bullet_alive': self.bullet_alive.copy(),
+            'aliens': np.stack((_rect_round(self.alien_x), self.alien_y),
+                               axis=-1),
+            'alien_alive': self.alien_alive.copy(),
+            'score': self.score.copy(),
+            'level': self.level.copy(),
+            'ships_left': self.ships_left.copy(),
+        }
+
+    def _new_fleet(self, mask):
+        """
+        Replace the fleet of some games with a new full fleet.
+
+        :param mask ndarray: True for the games getting a new fleet.
+        :returns: None.
+        """
+        self.alien_x[mask] = self.formation_x
+        self.alien_y[mask] = self.formation_y
+        self.alien_alive[mask] = True
+
+    def _center_ship(self, mask):
+        """
+        Center the ship of some games at the bottom of the screen.
+
+        :param mask ndarray: True for the games whose ship is centered.
+        :returns: None.
+        """
+        self.ship_x[mask] = (self.settings.screen_width // 2 -
+                             self.ship_size[0] // 2)
+
+    def _pause(self, mask, duration, respawn):
+        """
+        Pause some games, the way the timed states of AlienInvasion do.
+
+        :param mask ndarray: True for the games to pause.
+        :param duration float: The length of the pause in seconds.
+        :param respawn bool: True to restore the fleet and the ship after the pause.
+        :returns: None.
+        """
+        self.paused |= mask
+        self.respawning[mask] = respawn
+        self.remaining[mask] = duration
+
+    def _fire_bullets(self, mask):
+        """
+        Fire a bullet from the ship of some games if one more bullet is allowed.
+
+        :param mask ndarray: True for the games firing.
+        :var count ndarray: The number of bullets in flight in each game.
+        :var games ndarray: The indices of the games firing a bullet.
+        :var slots ndarray: The first free slot of each of these games.
+        :returns: None.
+        """
+        count = self.bullet_alive.sum(axis=1)
+        games = np.nonzero(mask & (count < self.bullet_alive.shape[1]))[0]
+        slots = count[games]
+        centerx = _rect_round(self.ship_x[games]) + self.ship_size[0] // 2
+        self.bullet_alive[games, slots] = True
+        self.bullet_x[games, slots] = centerx - self.bullet_size[0] // 2
+        self.bullet_y[games, slots] = (self.settings.screen_height -
+                                       self.ship_size[1])
+
+    def _compact_bullets(self):
+        """
+        Move the bullets in flight to the first slots, keeping the order they were fired.
+
+        :var order ndarray: The slots sorted with the bullets in flight first.
+        :returns: None.
+        """
+        order = np.argsort(~self.bullet_alive, axis=1, kind='stable')
+        self.bullet_alive = np.take_along_axis(self.bullet_alive, order, 1)
+        self.bullet_x = np.take_along_axis(self.bullet_x, order, 1)
+        self.bullet_y = np.take_along_axis(self.bullet_y, order, 1)
+
+    def _update_ship(self, active, left, right):
+        """
+        Move the ships of the games being played, like Ship.update().
+
+        :param active ndarray: True for the games being played.
+        :param left ndarray: True for the games moving their ship left.
+        :param right ndarray: True for the games moving their ship right.
+        :var x ndarray: The positions of the ships on the screen.
+        :var distance ndarray: The distance each ship can cover during the tick.
+        :returns: None.
+        """
+        x = _rect_round(self.ship_x)
+        distance = self.ship_speed * self.dt
+        right = active & right & (x + self.ship_size[0] <
+                                  self.settings.screen_width)
+        left = active & left & (x > 0)
+        self.ship_x[right] += distance[right]
+        self.ship_x[left] -= distance[left]
+
+    def _update_bullets(self, active):
+        """
+        Move the bullets of the games being played and drop the ones off the screen.
+
+        :param active ndarray: True for the games being played.
+        :var distance ndarray: The distance each bullet covers during the tick.
+        :returns: None.
+        """
+        distance = np.where(active, self.bullet_speed * self.dt, 0.0)
+        self.bullet_y -= distance[:, None]
+        self.bullet_alive &= (_rect_round(self.bullet_y) +
+                              self.bullet_size[1] > 0)
+        self._compact_bullets()
+
+    def _check_bullet_alien_collisions(self, active):
+        """
+        Destroy the bullets and the aliens that collide and start the next level of the
+        games whose fleet is destroyed.
+
+        An alien touched by several bullets is claimed by the first one fired, the
+        argmax along the bullet axis, so the next bullets go on, like in the game.
+
+        :param active ndarray: True for the games being played.
+        :var overlap ndarray: True for each bullet and alien that overlap, by game.
+        :var killed ndarray: True for the aliens destroyed, by game.
+        :var first ndarray: The first bullet overlapping each alien, by game.
+        :var used ndarray: True for the bullets that destroyed at least one alien.
+        :var points ndarray: The points earned in each game.
+        :var cleared ndarray: True for the games whose fleet is destroyed.
+        :returns ndarray: The points earned in each game.
+        """
+        bullet_w, bullet_h = self.bullet_size
+        alien_w, alien_h = self.alien_size
+        bx = self.bullet_x[:, :, None]
+        by = _rect_round(self.bullet_y)[:, :, None]
+        ax = _rect_round(self.alien_x)[:, None, :]
+        ay = self.alien_y[:, None, :]
+        overlap = ((self.bullet_alive & active[:, None])[:, :, None] &
+                   self.alien_alive[:, None, :] &
+                   (bx < ax + alien_w) & (ax < bx + bullet_w) &
+                   (by < ay + alien_h) & (ay < by + bullet_h))
+
+        killed = overlap.any(axis=1)
+        first = overlap.argmax(axis=1)
+        used = np.zeros_like(self.bullet_alive)
+        games, aliens = np.nonzero(killed)
+        used[games, first[games, aliens]] = True
+
+        self.alien_alive &= ~killed
+        self.bullet_alive &= ~used
+        self._compact_bullets()
+        points = self.alien_points * killed.sum(axis=1)
+        self.score += points
+
+        # Destroy existing bullets, create a new fleet and pause before the next level.
+        cleared = active & ~self.alien_alive.any(axis=1)
+        self.bullet_alive[cleared] = False
+        self._new_fleet(cleared)
+        scale = self.settings.speedup_scale
+        self.ship_speed[cleared] *= scale
+        self.bullet_speed[cleared] *= scale
+        self.alien_speed[cleared] *= scale
+        self.alien_points[cleared] = (self.alien_points[cleared] *
+                                      self.settings.score_scale).astype(np.int64)
+        self.level[cleared] += 1
+        self._pause(cleared, self.settings.level_transition_time, False)
+        return points
+
+    def _update_aliens(self, active):
+        """
+        Drop and turn the fleets at an edge, move the fleets and check if the ships are
+        hit or the aliens reached the bottom of the screen.
+
+        :param active ndarray: True for the games being played.
+        :var x ndarray: The positions of the aliens on the screen.
+        :var edge ndarray: True for the fleets touching an edge.
+        :var ship_x ndarray: The positions of the ships on the screen.
+        :var ship_top int: The top of the ships.
+        :var touching ndarray: True for the aliens over a ship or the bottom.
+        :returns ndarray: True for the games whose ship is hit.
+        """
+        alien_w, alien_h = self.alien_size
+        x = _rect_round(self.alien_x)
+        edge = active & (self.alien_alive & (
+            (x + alien_w >= self.settings.screen_width) | (x <= 0))).any(axis=1)
+        self.alien_y[edge] += self.settings.fleet_drop_speed
+        self.fleet_direction[edge] *= -1
+
+        distance = self.alien_speed * self.fleet_direction * self.dt
+        self.alien_x[active] += distance[active, None]
+
+        x = _rect_round(self.alien_x)
+        ship_x = _rect_round(self.ship_x)[:, None]
+        ship_w, ship_h = self.ship_size
+        ship_top = self.settings.screen_height - ship_h
+        touching = self.alien_alive & (
+            ((x < ship_x + ship_w) & (ship_x < x + alien_w) &
+             (self.alien_y < ship_top + ship_h) & (ship_top < self.alien_y + alien_h)) |
+            (self.alien_y + alien_h >= self.settings.screen_height))
+        return active & touching.any(axis=1)